@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# diimport setelah Django siap
+from event.live import LiveLeaderboardApp  # noqa: E402
+
+application = LiveLeaderboardApp(django_application)
@@ -58,19 +58,83 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'dj_rest_auth.jwt_auth.JWTCookieAuthentication',
+        'event.authentication.ClaimsJWTAuthentication',
     ],
-    'EXCEPTION_HANDLER': 'event.exception_handler.handle_exception'
+    'DEFAULT_RENDERER_CLASSES': [
+        'event.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'event.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'EXCEPTION_HANDLER': 'event.exception_handler.handle_exception',
+    'DEFAULT_PAGINATION_CLASS': 'event.pagination.EnvelopeCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
+# jumlah maksimal peserta yang ditampilkan di dalam data event
+EVENT_NESTED_LIST_LIMIT = 50
+
+# broker untuk push leaderboard (SSE) di config/asgi.py
+EVENT_LIVE_BROKER = 'event.broker.LocalBroker'
+
+# Cache response GET per event (EventDetail, ParticipantsList, JuryDetail).
+# Contoh EVENT_CACHE_URL: locmemcache://event, filecache:///var/tmp/tsukuyomi-cache,
+# rediscache://127.0.0.1:6379/1. locmem hanya berlaku per proses, gunakan
+# backend bersama jika menjalankan lebih dari satu worker.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+    'event': env.cache_url('EVENT_CACHE_URL', default='locmemcache://event'),
+}
+EVENT_CACHE_ALIAS = 'event'
+EVENT_CACHE_TIMEOUT = env.int('EVENT_CACHE_TIMEOUT', default=60)
+# Role dan penugasan jury per user, dihapus setiap kali penugasan berubah
+EVENT_ACCESS_CACHE_TIMEOUT = env.int('EVENT_ACCESS_CACHE_TIMEOUT', default=30)
+
 REST_USE_JWT = True
+REST_AUTH_SERIALIZERS = {
+    'JWT_TOKEN_CLAIMS_SERIALIZER': 'event.authentication.TokenClaimsSerializer',
+}
+# Daftar JTI token yang dicabut dibaca ulang dari DB setelah timeout ini
+EVENT_REVOKED_CACHE_TIMEOUT = env.int('EVENT_REVOKED_CACHE_TIMEOUT', default=300)
+
+# Request lebih lambat dari ini (ms) dicatat dengan level WARNING di logger event.performance
+EVENT_SLOW_REQUEST_MS = env.int('EVENT_SLOW_REQUEST_MS', default=500)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'event.performance': {
+            'handlers': ['console'],
+            'level': env.str('EVENT_PERFORMANCE_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Snapshot ledger nilai hanya mencakup entry yang lebih tua dari ini (detik),
+# supaya entry dari transaksi yang belum commit tidak terlewat
+EVENT_LEDGER_SNAPSHOT_LAG = env.int('EVENT_LEDGER_SNAPSHOT_LAG', default=60)
+
+# Process pool untuk hash password onboarding massal (0 = jumlah CPU),
+# dibuat sekali per proses dan dipakai ulang; batch lebih kecil dari threshold
+# di-hash langsung di thread request
+EVENT_ONBOARDING_WORKERS = env.int('EVENT_ONBOARDING_WORKERS', default=0)
+EVENT_ONBOARDING_POOL_THRESHOLD = env.int('EVENT_ONBOARDING_POOL_THRESHOLD', default=8)
+
 JWT_AUTH_COOKIE = 'event-auth'
 JWT_AUTH_REFRESH_COOKIE = 'event-refresh-token'
 
 from datetime import timedelta
 
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
+    'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=20),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -97,6 +161,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'event.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -105,6 +170,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'event.exception_handler.ExceptionMiddleware',
+    'event.replicas.ReadReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -138,11 +204,24 @@ DATABASES = {
         'USER': env('DATABASE_USER'),
         'PASSWORD': env('DATABASE_PASSWORD'),
         'HOST': env('DATABASE_HOST'),
-        'PORT': env('DATABASE_PORT')
-,
+        'PORT': env('DATABASE_PORT'),
+        # view async menjalankan query di thread pool, koneksi per thread
+        # dipakai ulang selama CONN_MAX_AGE detik
+        'CONN_MAX_AGE': env.int('DATABASE_CONN_MAX_AGE', default=0),
     }
 }
 
+# Read replica: satu alias per host di DATABASE_REPLICA_HOSTS (replica, replica1, ...).
+# Tanpa host replica, alias "replica" tetap ada (menunjuk ke primary) tetapi
+# tidak dipakai karena EVENT_READ_DATABASES kosong.
+DATABASE_REPLICA_HOSTS = env.list('DATABASE_REPLICA_HOSTS', default=[])
+for index, host in enumerate(DATABASE_REPLICA_HOSTS or [DATABASES['default']['HOST']]):
+    DATABASES['replica%s' % (index or '')] = dict(DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'})
+EVENT_READ_DATABASES = [alias for alias in DATABASES if alias != 'default'] if DATABASE_REPLICA_HOSTS else []
+DATABASE_ROUTERS = ['event.replicas.ReadReplicaRouter']
+# setelah client menulis, request client tsb. membaca dari primary selama ini (detik)
+EVENT_STICKY_PRIMARY_SECONDS = env.int('EVENT_STICKY_PRIMARY_SECONDS', default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
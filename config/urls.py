@@ -18,6 +18,7 @@ from django.urls import path, include
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view 
 from drf_yasg import openapi 
+from event.views import TokenRefresh
 
 schema_view = get_schema_view( 
     openapi.Info(
@@ -34,6 +35,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('event.urls')),
     path('api-auth/', include('rest_framework.urls')),
+    # menggantikan token/refresh/ bawaan dj-rest-auth agar role dibaca ulang
+    path('api/v1/dj-rest-auth/token/refresh/', TokenRefresh.as_view(), name='token_refresh'),
     path('api/v1/dj-rest-auth/', include('dj_rest_auth.urls')),
     path('redoc/', schema_view.with_ui( 
         'redoc', cache_timeout=0), name='schema-redoc'),
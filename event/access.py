@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import transaction
+
+from .models import Jury
+from .response_cache import get_cache
+
+
+class Access:
+    """
+    Role dan penugasan pemanggil: id jury milik user beserta peserta
+    yang boleh dinilai oleh masing-masing jury.
+    """
+
+    def __init__(self, is_staff=False, is_committee=False, is_jury=False, assignments=None):
+        self.is_staff = is_staff
+        self.is_committee = is_committee
+        self.is_jury = is_jury
+        self.assignments = assignments or {}
+        self.participant_ids = set()
+        for pids in self.assignments.values():
+            self.participant_ids |= pids
+
+    @property
+    def is_admin_or_committee(self):
+        return self.is_staff or self.is_committee
+
+    @property
+    def jury_ids(self):
+        return set(self.assignments)
+
+    def can_score(self, participant_id, jury_id=None):
+        if jury_id is None:
+            return participant_id in self.participant_ids
+        return participant_id in self.assignments.get(jury_id, ())
+
+    def jury_for(self, participant_id):
+        for jury_id, pids in self.assignments.items():
+            if participant_id in pids:
+                return jury_id
+        return None
+
+
+ANONYMOUS = Access()
+
+
+def cache_key(user_id):
+    return 'event-access:%s' % user_id
+
+
+def load(user):
+    """
+    Satu query untuk seluruh penugasan jury milik user
+    """
+    assignments = {}
+    if user.is_jury:
+        rows = Jury.objects.filter(user_id=user.pk).values_list('id', 'participants')
+        for jury_id, participant_id in rows:
+            pids = assignments.setdefault(jury_id, set())
+            if participant_id is not None:
+                pids.add(participant_id)
+    return Access(is_staff=user.is_staff, is_committee=user.is_committee,
+                  is_jury=user.is_jury, assignments=assignments)
+
+
+def get_access(request):
+    """
+    Access dihitung sekali per request, lalu disimpan di cache
+    selama EVENT_ACCESS_CACHE_TIMEOUT detik
+    """
+    access = getattr(request, '_event_access', None)
+    if access is not None:
+        return access
+
+    user = request.user
+    if not user or not user.is_authenticated:
+        access = ANONYMOUS
+    else:
+        cache = get_cache()
+        access = cache.get(cache_key(user.pk))
+        if access is None:
+            access = load(user)
+            cache.set(cache_key(user.pk), access, settings.EVENT_ACCESS_CACHE_TIMEOUT)
+    request._event_access = access
+    return access
+
+
+def invalidate_users(user_ids):
+    keys = [cache_key(user_id) for user_id in set(user_ids)]
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+def invalidate_juries(jury_ids):
+    invalidate_users(Jury.objects.filter(pk__in=list(jury_ids)).values_list('user_id', flat=True))
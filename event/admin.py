@@ -1,9 +1,10 @@
 from django.contrib import admin
-from .models import Event, Committee, Jury, Participants, User
+from .models import Event, Committee, Jury, Participants, User, Score
 
 admin.site.register(Event)
 admin.site.register(Committee)
 admin.site.register(Jury)
 admin.site.register(Participants)
 admin.site.register(User)
+admin.site.register(Score)
 
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class EventConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'event'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import pre_save
+
+        from . import authentication, instrumentation
+        instrumentation.install()
+        pre_save.connect(authentication.track_claims, sender=settings.AUTH_USER_MODEL,
+                         dispatch_uid='event.authentication.track_claims')
@@ -0,0 +1,51 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from rest_framework import permissions
+
+from .instrumentation import measure
+
+
+def _call(view, request, args, kwargs):
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        with measure('render'):
+            response.render()
+    return response
+
+
+def _call_in_pool(view, request, args, kwargs):
+    """
+    Thread pool tidak melewati signal request_started/request_finished,
+    koneksi DB yang kedaluwarsa ditutup sendiri sebelum dan sesudahnya
+    """
+    close_old_connections()
+    try:
+        return _call(view, request, args, kwargs)
+    finally:
+        close_old_connections()
+
+
+def async_read(view_class, **initkwargs):
+    """
+    Membungkus view DRF menjadi view async. Di bawah ASGI request baca
+    dijalankan di thread pool (thread_sensitive=False) sehingga query yang
+    lambat tidak mengantrikan request lain di satu thread sync Django.
+    Request tulis dan request WSGI tetap berjalan di thread sync biasa.
+    """
+    view = view_class.as_view(**initkwargs)
+    concurrent = sync_to_async(_call_in_pool, thread_sensitive=False)
+    serial = sync_to_async(_call)
+
+    async def async_view(request, *args, **kwargs):
+        if isinstance(request, ASGIRequest) and request.method in permissions.SAFE_METHODS:
+            return await concurrent(view, request, args, kwargs)
+        return await serial(view, request, args, kwargs)
+
+    # atribut yang dibaca DRF/drf_yasg dari hasil as_view()
+    async_view.cls = async_view.view_class = view_class
+    async_view.initkwargs = async_view.view_initkwargs = initkwargs
+    async_view.csrf_exempt = True
+    async_view.__doc__ = view_class.__doc__
+    async_view.__name__ = view_class.__name__
+    return async_view
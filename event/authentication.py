@@ -0,0 +1,215 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer, JWTCookieAuthentication
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import access
+from .models import RevokedToken
+from .response_cache import get_cache
+
+ROLE_CLAIMS = ('is_staff', 'is_committee', 'is_jury')
+TRACKED_FIELDS = ('is_active',) + ROLE_CLAIMS
+ISSUED_CLAIM = 'claims_at'
+REVOKED_CACHE_KEY = 'event-revoked-jti'
+STALE_CACHE_KEY = 'event-stale-claims'
+
+
+def stamp_claims(token, user):
+    """
+    Mengisi role user dan waktu role tsb. dibaca ke claim token
+    """
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[ISSUED_CLAIM] = timezone.now().timestamp()
+    return token
+
+
+class TokenClaimsSerializer(TokenObtainPairSerializer):
+    """
+    Menambahkan role dan waktu terbitnya ke claim token
+    (dipakai dj-rest-auth lewat JWT_TOKEN_CLAIMS_SERIALIZER)
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        return stamp_claims(super().get_token(user), user)
+
+
+class TokenClaimsRefreshSerializer(CookieTokenRefreshSerializer):
+    """
+    Refresh token membaca ulang role dari DB, sehingga access token baru
+    (dan refresh token hasil rotasi) tidak mewarisi role lama
+    """
+
+    def validate(self, attrs):
+        refresh = RefreshToken(self.extract_refresh_token())
+        lookup = {jwt_settings.USER_ID_FIELD: refresh.get(jwt_settings.USER_ID_CLAIM)}
+        user = get_user_model().objects.filter(**lookup).first()
+        if user is None or not user.is_active:
+            raise InvalidToken('User not found or inactive')
+        stamp_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION and hasattr(refresh, 'blacklist'):
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class ClaimsUser:
+    """
+    User ringan yang dibangun dari claim access token. Atribut lain
+    (username, email, ...) memuat User dari DB saat pertama kali dibaca.
+    Hanya dibuat untuk token yang claim-nya tidak basi (lihat stale_claims),
+    jadi user masih aktif sejak token terbit.
+    """
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.token = token
+        self.pk = self.id = token[jwt_settings.USER_ID_CLAIM]
+        self.is_staff = bool(token['is_staff'])
+        self.is_committee = bool(token['is_committee'])
+        self.is_jury = bool(token['is_jury'])
+
+    def __str__(self):
+        return 'ClaimsUser %s' % self.pk
+
+    @cached_property
+    def user(self):
+        try:
+            return get_user_model().objects.get(**{jwt_settings.USER_ID_FIELD: self.pk})
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+    def __getattr__(self, name):
+        # hanya dipanggil untuk atribut yang tidak tersedia dari claim
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.pk and isinstance(other, (ClaimsUser, get_user_model()))
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+def revoked_jtis():
+    """
+    JTI access token yang dicabut dan belum kedaluwarsa, disimpan di cache
+    sebagai satu frozenset
+    """
+    cache = get_cache()
+    jtis = cache.get(REVOKED_CACHE_KEY)
+    if jtis is None:
+        rows = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        jtis = frozenset(rows.values_list('jti', flat=True))
+        cache.set(REVOKED_CACHE_KEY, jtis, settings.EVENT_REVOKED_CACHE_TIMEOUT)
+    return jtis
+
+
+def is_revoked(token):
+    """
+    True jika JTI token ada di daftar token yang dicabut
+    """
+    return token.get(jwt_settings.JTI_CLAIM) in revoked_jtis()
+
+
+def stale_claims():
+    """
+    {user_id: timestamp} user yang is_active atau role-nya berubah dalam
+    ACCESS_TOKEN_LIFETIME terakhir, disimpan di cache seperti revoked_jtis.
+    Claim yang lebih tua dari itu tidak pernah dipercaya (has_stale_claims).
+    """
+    cache = get_cache()
+    changed = cache.get(STALE_CACHE_KEY)
+    if changed is None:
+        since = timezone.now() - jwt_settings.ACCESS_TOKEN_LIFETIME
+        rows = get_user_model().objects.filter(claims_changed_at__gt=since)
+        changed = {pk: at.timestamp() for pk, at in rows.values_list('pk', 'claims_changed_at')}
+        cache.set(STALE_CACHE_KEY, changed, settings.EVENT_REVOKED_CACHE_TIMEOUT)
+    return changed
+
+
+def has_stale_claims(token):
+    """
+    True jika role di token dibaca sebelum is_active atau role user berubah,
+    atau lebih lama dari ACCESS_TOKEN_LIFETIME (login dan refresh selalu
+    membaca ulang role). Token tanpa waktu terbit selalu dianggap basi.
+    """
+    issued = token.get(ISSUED_CLAIM, 0)
+    if issued < (timezone.now() - jwt_settings.ACCESS_TOKEN_LIFETIME).timestamp():
+        return True
+    changed_at = stale_claims().get(token.get(jwt_settings.USER_ID_CLAIM))
+    return changed_at is not None and issued < changed_at
+
+
+def track_claims(sender, instance, update_fields=None, **kwargs):
+    """
+    pre_save User: mencatat claims_changed_at jika is_active atau role berubah.
+    QuerySet.update() tidak melewati receiver ini.
+    """
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(TRACKED_FIELDS)):
+        return
+    stored = sender.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    if stored is None or all(stored[field] == getattr(instance, field) for field in TRACKED_FIELDS):
+        return
+    instance.claims_changed_at = timezone.now()
+    if update_fields is not None:
+        # kolom di luar update_fields tidak ikut disimpan oleh save()
+        sender.objects.filter(pk=instance.pk).update(claims_changed_at=instance.claims_changed_at)
+    access.invalidate_users([instance.pk])
+    transaction.on_commit(lambda: get_cache().delete(STALE_CACHE_KEY))
+
+
+def revoke(token):
+    """
+    Mencabut access token sampai waktu exp-nya habis
+    """
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    RevokedToken.objects.get_or_create(jti=token[jwt_settings.JTI_CLAIM], defaults={'expires_at': expires_at})
+    # baris yang sudah kedaluwarsa tidak perlu ikut dimuat ke cache
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    transaction.on_commit(lambda: get_cache().delete(REVOKED_CACHE_KEY))
+
+
+class ClaimsJWTAuthentication(JWTCookieAuthentication):
+    """
+    Autentikasi JWT tanpa query User untuk request baca: role diambil dari
+    claim token. Request tulis, token lama tanpa claim role dan token yang
+    terbit sebelum is_active atau role user berubah tetap memuat User dari DB.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return validated_token
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        stateless = all(claim in validated_token for claim in ROLE_CLAIMS)
+        if stateless and self.request.method in permissions.SAFE_METHODS and not has_stale_claims(validated_token):
+            if jwt_settings.USER_ID_CLAIM not in validated_token:
+                raise AuthenticationFailed('Token contained no recognizable user identification',
+                                           code='token_not_valid')
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
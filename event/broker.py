@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    """
+    Antrian pesan milik satu penonton. Dipakai dari event loop asyncio.
+    """
+
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        # penonton yang lambat kehilangan pesan terlama, bukan memblokir publisher
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """
+    Antarmuka broker. Backend lain (mis. Redis pub/sub) cukup
+    mengimplementasikan subscribe/unsubscribe/publish.
+    """
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def has_subscribers(self, channel):
+        # backend terdistribusi tidak tahu jumlah penonton di proses lain
+        return True
+
+
+class LocalBroker(BaseBroker):
+    """
+    Broker in-process: publish bisa dipanggil dari thread mana saja
+    (view sync), pesan diteruskan ke event loop masing-masing subscriber.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.maxsize)
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # event loop subscriber sudah ditutup
+                self.unsubscribe(subscription)
+        return len(subscriptions)
+
+    def has_subscribers(self, channel):
+        return bool(self.subscriptions.get(channel))
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENT_LIVE_BROKER)()
+    return _broker
@@ -0,0 +1,108 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Event, Committee, Jury, Participants, StatisticCounter
+
+TOTAL_EVENT = 'total_event'
+TOTAL_PARTICIPANTS = 'total_participants'
+TOTAL_JURY = 'total_jury'
+TOTAL_COMMITTEE = 'total_committee'
+
+TOTALS = {
+    TOTAL_EVENT: Event,
+    TOTAL_PARTICIPANTS: Participants,
+    TOTAL_JURY: Jury,
+    TOTAL_COMMITTEE: Committee,
+}
+
+# nama counter per event -> (model, field M2M di Event, kolom counter, kolom kapasitas)
+EVENT_COUNTERS = {
+    'participants': (Participants, 'peserta', 'participants_count', 'max_participants'),
+    'jury': (Jury, 'juri', 'jury_count', 'num_jury'),
+    'committee': (Committee, 'panitia', 'committee_count', 'num_committee'),
+}
+
+
+def _initialize(key):
+    """
+    Counter yang belum ada diisi dari hasil count() sekali saja
+    """
+    value = TOTALS[key].objects.count()
+    try:
+        with transaction.atomic():
+            StatisticCounter.objects.create(key=key, value=value)
+    except IntegrityError:
+        value = StatisticCounter.objects.get(key=key).value
+    return value
+
+
+def increment(key, delta=1):
+    """
+    Dipanggil setelah perubahan data, dalam transaksi yang sama
+    """
+    updated = StatisticCounter.objects.filter(key=key).update(value=F('value') + delta)
+    if not updated:
+        _initialize(key)
+
+
+def decrement(key, delta=1):
+    increment(key, -delta)
+
+
+def get_counts(keys):
+    values = dict(StatisticCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+    for key in keys:
+        if key not in values:
+            values[key] = _initialize(key)
+    return {key: values[key] for key in keys}
+
+
+def get_event_counts(eid):
+    columns = {name: column for name, (_, _, column, _) in EVENT_COUNTERS.items()}
+    values = Event.objects.filter(pk=eid).values(*columns.values()).first() or {}
+    return {name: values.get(column, 0) for name, column in columns.items()}
+
+
+def reserve(eid, name, amount=1):
+    """
+    Menambah counter event hanya jika kapasitas masih cukup.
+    Satu UPDATE bersyarat, aman dipanggil bersamaan dari banyak request.
+    """
+    _, _, column, capacity = EVENT_COUNTERS[name]
+    reserved = Event.objects.filter(pk=eid, **{column + '__lte': F(capacity) - amount})
+    return bool(reserved.update(**{column: F(column) + amount}))
+
+
+def reserve_up_to(eid, name, amount):
+    """
+    Seperti reserve, tetapi mengambil sisa kapasitas jika tidak cukup
+    untuk seluruh amount. Mengembalikan jumlah yang berhasil dipesan.
+    """
+    _, _, column, capacity = EVENT_COUNTERS[name]
+    values = Event.objects.select_for_update().filter(pk=eid).values(column, capacity).first()
+    if values is None:
+        return 0
+    granted = max(min(amount, values[capacity] - values[column]), 0)
+    if granted:
+        Event.objects.filter(pk=eid).update(**{column: F(column) + granted})
+    return granted
+
+
+def increment_events(name, event_ids, delta=1):
+    _, _, column, _ = EVENT_COUNTERS[name]
+    Event.objects.filter(pk__in=list(event_ids)).update(**{column: F(column) + delta})
+
+
+@transaction.atomic
+def rebuild():
+    rows = [StatisticCounter(key=key, value=model.objects.count()) for key, model in TOTALS.items()]
+    StatisticCounter.objects.all().delete()
+    StatisticCounter.objects.bulk_create(rows, batch_size=1000)
+
+    columns = {}
+    for name, (_, field, column, _) in EVENT_COUNTERS.items():
+        through = getattr(Event, field).through
+        counts = through.objects.filter(event_id=OuterRef('pk')).order_by().values('event_id').annotate(n=Count('pk'))
+        columns[column] = Coalesce(Subquery(counts.values('n')), 0)
+    return len(rows) + Event.objects.update(**columns)
@@ -0,0 +1,82 @@
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from .models import Event, EventParticipant, Score
+
+TOP_SIZE = 3
+EVENT_FIELDS = ('id', 'title', 'start_date', 'end_date', 'start_time', 'end_time', 'event_level',
+                'max_participants', 'num_jury', 'num_committee',
+                'participants_count', 'jury_count', 'committee_count')
+# urutan yang sama dengan leaderboard.ORDERING, dibaca dari event_leaderboard_idx
+LEADER_ORDERING = (F('total_score').desc(), F('participants_id').asc())
+
+
+def count_links(*conditions, **filters):
+    """
+    Jumlah baris EventParticipant event (OuterRef) yang memenuhi filter,
+    sebagai subquery supaya beberapa hitungan tidak saling menggandakan join
+    """
+    links = (EventParticipant.objects.filter(*conditions, event_id=OuterRef('pk'), **filters).order_by()
+             .values('event_id').annotate(n=Count('pk')).values('n'))
+    return Coalesce(Subquery(links, output_field=IntegerField()), Value(0))
+
+
+def leaders(event_ids, size=TOP_SIZE):
+    """
+    {event_id: [peserta teratas]}: `size` peserta teratas setiap event diambil
+    dengan subquery berkorelasi (LIMIT per event), rank diberi window function
+    """
+    top = (EventParticipant.objects.filter(event_id=OuterRef('event_id'), total_score__isnull=False)
+           .order_by(*LEADER_ORDERING).values('pk')[:size])
+    rows = (EventParticipant.objects.filter(event_id__in=event_ids, pk__in=Subquery(top))
+            .annotate(rank=Window(RowNumber(), partition_by=[F('event_id')], order_by=LEADER_ORDERING))
+            .order_by('event_id', 'rank')
+            .values_list('event_id', 'rank', 'participants_id', 'participants__code', 'participants__full_name',
+                         'participants__institute', 'total_score'))
+    result = {eid: [] for eid in event_ids}
+    for eid, rank, pid, code, full_name, institute, total in rows:
+        result[eid].append({'rank': rank, 'id': pid, 'code': code, 'full_name': full_name,
+                            'institute': institute, 'total_score': total})
+    return result
+
+
+def build(events, extra=()):
+    """
+    Satu query untuk event beserta hitungannya, satu query untuk peserta teratas
+    """
+    rows = list(events.annotate(scored=count_links(total_score__isnull=False))
+                .order_by('start_date', 'pk').values(*EVENT_FIELDS, 'scored', *extra))
+    top = leaders([row['id'] for row in rows]) if rows else {}
+    for row in rows:
+        total = row['participants_count']
+        row['unscored'] = max(total - row['scored'], 0)
+        row['progress'] = round(row['scored'] * 100 / total, 1) if total else 0.0
+        row['leaders'] = top[row['id']]
+    return rows
+
+
+def committee_events(committee_id, user_id=None):
+    events = Event.objects.filter(panitia__pk=committee_id)
+    if user_id is not None:
+        events = Event.objects.filter(panitia__pk=committee_id, panitia__user_id=user_id)
+    return build(events)
+
+
+def jury_events(jury_id, user_id=None):
+    """
+    Seperti committee_events, ditambah progres penilaian juri tsb.:
+    assigned (peserta event yang diassign ke juri), assigned_scored
+    (yang sudah diberi nilai oleh juri tsb.) dan assigned_unscored
+    """
+    events = Event.objects.filter(juri__pk=jury_id)
+    if user_id is not None:
+        events = Event.objects.filter(juri__pk=jury_id, juri__user_id=user_id)
+    scored_by_jury = Score.objects.filter(jury_id=jury_id, participant_id=OuterRef('participants_id'))
+    events = events.annotate(
+        assigned=count_links(participants__jury__pk=jury_id),
+        assigned_scored=count_links(Exists(scored_by_jury), participants__jury__pk=jury_id),
+    )
+    rows = build(events, extra=('assigned', 'assigned_scored'))
+    for row in rows:
+        row['assigned_unscored'] = row['assigned'] - row['assigned_scored']
+    return rows
@@ -1,3 +1,5 @@
+import asyncio
+
 from rest_framework.views import exception_handler
 from rest_framework.views import exception_handler
 from django.http import JsonResponse
@@ -49,13 +51,24 @@ def handle_exception(exc, context):
    return error_response
  
 class ExceptionMiddleware(object):
+   # di bawah ASGI dipanggil langsung tanpa adapter sync_to_async
+   sync_capable = True
+   async_capable = True
+
    def __init__(self, get_response):
        self.get_response = get_response
+       if asyncio.iscoroutinefunction(get_response):
+           self._is_coroutine = asyncio.coroutines._is_coroutine
  
    def __call__(self, request):
- 
-       response = self.get_response(request)
- 
+       if asyncio.iscoroutinefunction(self.get_response):
+           return self.__acall__(request)
+       return self.envelope(self.get_response(request))
+
+   async def __acall__(self, request):
+       return self.envelope(await self.get_response(request))
+
+   def envelope(self, response):
        if response.status_code == 500:
            response = get_response(
                message="Internal server error, please try again later",
@@ -69,4 +82,4 @@ class ExceptionMiddleware(object):
                status_code=response.status_code
            )
            return JsonResponse(response, status=response['status_code'])
-       return response
\ No newline at end of file
+       return response
@@ -0,0 +1,65 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Sum
+
+from . import leaderboard
+from .models import Jury
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+COLUMNS = ('id', 'code', 'full_name', 'age', 'email', 'institute', 'total_score', 'photo_url', 'created_at', 'updated_at')
+# total_score di export adalah total berbobot per event, sama dengan urutan rank
+SOURCES = tuple(leaderboard.SCORE if column == 'total_score' else column for column in COLUMNS)
+
+
+class Echo:
+    """
+    Buffer semu untuk csv.writer, nilai yang ditulis langsung dikembalikan
+    """
+    def write(self, value):
+        return value
+
+
+def jury_columns(eid):
+    return ['jury_%s' % pk for pk in Jury.objects.filter(event__pk=eid).order_by('pk').values_list('pk', flat=True)]
+
+
+def iter_results(eid, columns=(), chunk_size=2000):
+    """
+    Menghasilkan dict per peserta dalam urutan leaderboard dari server-side cursor.
+    `columns` berisi kolom jury_<id> untuk nilai per jury.
+    """
+    queryset = leaderboard.event_participants(eid)
+    if columns:
+        queryset = queryset.annotate(**{
+            column: Sum('scores__value', filter=Q(scores__jury_id=int(column[len('jury_'):])))
+            for column in columns
+        })
+    rows = queryset.order_by(*leaderboard.ORDERING).values_list(*SOURCES, *columns)
+    header = ('rank',) + COLUMNS + tuple(columns)
+    for rank, row in enumerate(rows.iterator(chunk_size=chunk_size), start=1):
+        yield dict(zip(header, (rank,) + row))
+
+
+def stream_csv(rows, columns=()):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('rank',) + COLUMNS + tuple(columns))
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+def stream_ndjson(rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def stream(eid, output='csv', with_scores=False, chunk_size=2000):
+    columns = jury_columns(eid) if with_scores else []
+    rows = iter_results(eid, columns, chunk_size=chunk_size)
+    if output == 'ndjson':
+        return stream_ndjson(rows)
+    return stream_csv(rows, columns)
@@ -0,0 +1,153 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from . import access, counters, response_cache
+from .exception_handler import get_error_message
+from .models import Event, Jury, Participants
+from .serializers import ParticipantImportSerializer
+
+FORMATS = ('csv', 'ndjson')
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(name='', content_type=''):
+    name = (name or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return 'csv'
+
+
+def iter_rows(stream, file_format='csv'):
+    """
+    Membaca file baris per baris, menghasilkan (nomor baris, dict atau pesan error).
+    File yang tidak bisa didekode atau CSV yang rusak berhenti dibaca dan
+    dilaporkan sebagai error pada baris berikutnya.
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    line = 0 if file_format == 'ndjson' else 1
+    try:
+        if file_format == 'ndjson':
+            for line, raw in enumerate(text, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    row = json.loads(raw)
+                except ValueError:
+                    yield line, 'Format JSON tidak valid'
+                    continue
+                yield line, row if isinstance(row, dict) else 'Baris harus berupa object'
+        else:
+            for line, row in enumerate(csv.DictReader(text), start=2):
+                yield line, {key.strip(): value for key, value in row.items() if key and value not in ('', None)}
+    except UnicodeDecodeError:
+        yield line + 1, 'File harus berupa teks UTF-8'
+    except csv.Error as e:
+        yield line + 1, 'Format CSV tidak valid: %s' % e
+
+
+class ParticipantImporter:
+    """
+    Import peserta ke event dalam batch: validasi per chunk, kuota dicek
+    sekali per chunk, peserta dan relasi event/jury dibuat dengan bulk_create.
+    """
+
+    def __init__(self, event_id, jury_id=None, chunk_size=500):
+        self.event_id = event_id
+        self.jury_id = jury_id
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+    def run(self, rows):
+        if not Event.objects.filter(pk=self.event_id).exists():
+            raise Event.DoesNotExist
+        if self.jury_id and not Jury.objects.filter(pk=self.jury_id, event__pk=self.event_id).exists():
+            raise Jury.DoesNotExist
+
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            created, failed, errors = self.created, self.failed, len(self.errors)
+            try:
+                self.import_chunk(chunk)
+            except IntegrityError:
+                # kode yang sama didaftarkan bersamaan oleh request lain
+                self.created, self.failed = created, failed
+                del self.errors[errors:]
+                for line, _ in chunk:
+                    self.error(line, 'Gagal menyimpan batch, kode peserta bentrok')
+        return self.summary()
+
+    def summary(self):
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+    def validate_chunk(self, chunk):
+        valid = {}
+        for line, row in chunk:
+            if isinstance(row, str):
+                self.error(line, row)
+                continue
+            serializer = ParticipantImportSerializer(data=row)
+            if not serializer.is_valid():
+                self.error(line, get_error_message(serializer.errors))
+                continue
+            code = serializer.validated_data['code']
+            if code in valid:
+                self.error(line, 'Kode peserta duplikat di dalam file')
+                continue
+            valid[code] = (line, serializer.validated_data)
+
+        existing = Participants.objects.filter(code__in=valid).values_list('code', flat=True)
+        for code in existing:
+            line, _ = valid.pop(code)
+            self.error(line, 'Kode peserta sudah terdaftar')
+        return list(valid.values())
+
+    @transaction.atomic
+    def import_chunk(self, chunk):
+        valid = self.validate_chunk(chunk)
+        if not valid:
+            return
+
+        remaining = counters.reserve_up_to(self.event_id, 'participants', len(valid))
+        for line, _ in valid[remaining:]:
+            self.error(line, 'Jumlah peserta sudah penuh')
+        valid = valid[:remaining]
+        if not valid:
+            return
+
+        peserta = Participants.objects.bulk_create([Participants(**data) for _, data in valid])
+        if any(p.pk is None for p in peserta):
+            ids = dict(Participants.objects.filter(code__in=[p.code for p in peserta]).values_list('code', 'pk'))
+            for p in peserta:
+                p.pk = ids[p.code]
+
+        Event.peserta.through.objects.bulk_create([
+            Event.peserta.through(event_id=self.event_id, participants_id=p.pk) for p in peserta
+        ])
+        if self.jury_id:
+            Jury.participants.through.objects.bulk_create([
+                Jury.participants.through(jury_id=self.jury_id, participants_id=p.pk) for p in peserta
+            ])
+            access.invalidate_juries([self.jury_id])
+
+        counters.increment(counters.TOTAL_PARTICIPANTS, len(peserta))
+        response_cache.invalidate([self.event_id])
+        self.created += len(peserta)
@@ -0,0 +1,272 @@
+import asyncio
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('event.performance')
+
+_current = contextvars.ContextVar('event_request_metrics', default=None)
+
+# batas atas bucket histogram latency (ms), bucket terakhir tak terbatas
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PHASES = ('db', 'serialize', 'render')
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.view = None
+
+    def add(self, phase, seconds):
+        self.durations[phase] += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.add('db', time.perf_counter() - started)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def measure(phase):
+    """
+    Menambahkan durasi blok ke fase `phase` request yang sedang berjalan.
+    Waktu query DB di dalam blok tidak dihitung dua kali.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    db_before = metrics.durations['db']
+    try:
+        yield
+    finally:
+        spent = time.perf_counter() - started - (metrics.durations['db'] - db_before)
+        metrics.add(phase, max(spent, 0.0))
+
+
+def serialize(serializer):
+    """
+    serializer.data dengan waktunya dicatat ke fase serialize, dipanggil
+    view di tempat data response dibentuk
+    """
+    with measure('serialize'):
+        return serializer.data
+
+
+def install():
+    connection_created.connect(install_query_recorder, weak=False, dispatch_uid='event-query-recorder')
+    for connection in connections.all():
+        install_query_recorder(connection)
+
+
+class RollingHistogram:
+    """
+    Histogram per view dalam jendela waktu bergulir: `window` detik dibagi
+    menjadi slot `resolution` detik, slot lama dibuang saat dibaca/ditulis.
+    """
+
+    def __init__(self, window=900, resolution=60):
+        self.window = window
+        self.resolution = resolution
+        self.lock = threading.Lock()
+        self.slots = {}
+
+    def slot(self, now):
+        return int(now // self.resolution)
+
+    def expire(self, now):
+        oldest = self.slot(now) - self.window // self.resolution
+        for key in [key for key in self.slots if key[1] <= oldest]:
+            del self.slots[key]
+
+    def observe(self, view, total_ms, queries, durations_ms, size, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            self.expire(now)
+            entry = self.slots.get((view, self.slot(now)))
+            if entry is None:
+                entry = self.slots[(view, self.slot(now))] = {
+                    'count': 0, 'buckets': [0] * (len(BUCKETS) + 1), 'total_ms': 0.0,
+                    'queries': 0, 'bytes': 0, 'phases_ms': dict.fromkeys(PHASES, 0.0),
+                }
+            entry['count'] += 1
+            entry['buckets'][bisect.bisect_left(BUCKETS, total_ms)] += 1
+            entry['total_ms'] += total_ms
+            entry['queries'] += queries
+            entry['bytes'] += size or 0
+            for phase, value in durations_ms.items():
+                entry['phases_ms'][phase] += value
+
+    def snapshot(self, now=None):
+        now = time.time() if now is None else now
+        merged = {}
+        with self.lock:
+            self.expire(now)
+            for (view, _), entry in self.slots.items():
+                target = merged.setdefault(view, {
+                    'count': 0, 'buckets': [0] * (len(BUCKETS) + 1), 'total_ms': 0.0,
+                    'queries': 0, 'bytes': 0, 'phases_ms': dict.fromkeys(PHASES, 0.0),
+                })
+                target['count'] += entry['count']
+                target['buckets'] = [a + b for a, b in zip(target['buckets'], entry['buckets'])]
+                target['total_ms'] += entry['total_ms']
+                target['queries'] += entry['queries']
+                target['bytes'] += entry['bytes']
+                for phase in PHASES:
+                    target['phases_ms'][phase] += entry['phases_ms'][phase]
+        return {view: self.summarize(entry) for view, entry in sorted(merged.items())}
+
+    def summarize(self, entry):
+        count = entry['count']
+        return {
+            'count': count,
+            'p50_ms': self.quantile(entry['buckets'], count, 0.50),
+            'p95_ms': self.quantile(entry['buckets'], count, 0.95),
+            'p99_ms': self.quantile(entry['buckets'], count, 0.99),
+            'mean_ms': round(entry['total_ms'] / count, 3),
+            'mean_queries': round(entry['queries'] / count, 2),
+            'mean_bytes': round(entry['bytes'] / count),
+            'mean_phases_ms': {phase: round(value / count, 3) for phase, value in entry['phases_ms'].items()},
+            'histogram': {
+                ('le_%s' % bound if bound is not None else 'inf'): n
+                for bound, n in zip(BUCKETS + (None,), entry['buckets'])
+            },
+        }
+
+    def quantile(self, buckets, count, q):
+        """
+        Batas atas bucket yang memuat kuantil q (None jika di bucket tak terbatas)
+        """
+        target = q * count
+        seen = 0
+        for bound, n in zip(BUCKETS + (None,), buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return None
+
+
+histograms = RollingHistogram()
+
+
+def response_size(response):
+    if getattr(response, 'streaming', False):
+        return None
+    return len(response.content)
+
+
+def server_timing(metrics, total):
+    parts = ['db;dur=%.2f;desc="%d queries"' % (metrics.durations['db'] * 1000, metrics.queries)]
+    parts += ['%s;dur=%.2f' % (phase, metrics.durations[phase] * 1000) for phase in ('serialize', 'render')]
+    parts.append('total;dur=%.2f' % (total * 1000))
+    return ', '.join(parts)
+
+
+class PerformanceMiddleware:
+    """
+    Mencatat jumlah & durasi query, waktu serialisasi, render dan ukuran
+    response per view. Hasilnya dikirim sebagai header Server-Timing,
+    log terstruktur di logger `event.performance`, dan histogram
+    yang bisa dibaca admin di /api/v1/metrics/.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # di bawah ASGI middleware dan hook-nya tidak perlu pindah ke thread sync
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.async_hook(self.process_view)
+            self.process_template_response = self.async_hook(self.process_template_response)
+
+    def async_hook(self, method):
+        # Django membaca __self__ dari hook, jadi hasilnya tetap bound method
+        async def hook(self, *args):
+            return method(*args)
+        return types.MethodType(hook, self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = metrics.elapsed()
+        view = metrics.view or 'unresolved'
+        size = response_size(response)
+        response['Server-Timing'] = server_timing(metrics, total)
+
+        durations_ms = {phase: value * 1000 for phase, value in metrics.durations.items()}
+        histograms.observe(view, total * 1000, metrics.queries, durations_ms, size)
+        record = {
+            'view': view, 'method': request.method, 'path': request.path, 'status': response.status_code,
+            'total_ms': round(total * 1000, 3), 'queries': metrics.queries, 'bytes': size,
+        }
+        record.update({'%s_ms' % phase: round(value, 3) for phase, value in durations_ms.items()})
+        slow = record['total_ms'] >= settings.EVENT_SLOW_REQUEST_MS
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record), extra={'metrics': record})
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            match = request.resolver_match
+            metrics.view = match.url_name if match and match.url_name else view_func.__name__
+
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        if metrics is not None and not response.is_rendered:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: metrics.add('render', time.perf_counter() - started)
+            )
+        return response
@@ -0,0 +1,89 @@
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Participants
+
+# total_score per event dibaca dari tabel relasi (EventParticipant) supaya
+# memakai index event_leaderboard_idx
+SCORE = 'event_score'
+
+# total_score tertinggi di atas, peserta tanpa nilai di bawah,
+# nilai yang sama diurutkan berdasarkan id supaya ranking stabil
+ORDERING = (F(SCORE).desc(nulls_last=True), F('id').asc())
+REVERSE_ORDERING = (F(SCORE).asc(nulls_first=True), F('id').desc())
+
+
+def event_participants(eid):
+    return Participants.objects.filter(event_links__event_id=eid).annotate(**{SCORE: F('event_links__total_score')})
+
+
+def score_of(participant):
+    if isinstance(participant, dict):
+        return participant[SCORE]
+    return getattr(participant, SCORE)
+
+
+def pk_of(participant):
+    """
+    pk peserta, baik berupa instance maupun baris values() (lihat ValuesSerializer)
+    """
+    if isinstance(participant, dict):
+        return participant['pk']
+    return participant.pk
+
+
+def after(queryset, score, pk):
+    """
+    Peserta yang posisinya di bawah (score, pk)
+    """
+    if score is None:
+        return queryset.filter(**{SCORE + '__isnull': True, 'pk__gt': pk})
+    return queryset.filter(
+        Q(**{SCORE + '__lt': score}) | Q(**{SCORE: score, 'pk__gt': pk}) | Q(**{SCORE + '__isnull': True})
+    )
+
+
+def before(queryset, score, pk):
+    """
+    Peserta yang posisinya di atas (score, pk)
+    """
+    if score is None:
+        return queryset.filter(Q(**{SCORE + '__isnull': False}) | Q(pk__lt=pk))
+    return queryset.filter(Q(**{SCORE + '__gt': score}) | Q(**{SCORE: score, 'pk__lt': pk}))
+
+
+def rank_of(queryset, participant):
+    return before(queryset, score_of(participant), pk_of(participant)).count() + 1
+
+
+def ranks(queryset, participants, lookup_limit=20):
+    """
+    Ranking beberapa peserta sekaligus: hitung per peserta jika sedikit,
+    satu query window function jika banyak
+    """
+    if len(participants) <= lookup_limit:
+        return {p.pk: rank_of(queryset, p) for p in participants}
+    wanted = {p.pk for p in participants}
+    ranked = queryset.annotate(rank=Window(RowNumber(), order_by=ORDERING)).values_list('pk', 'rank')
+    return {pk: rank for pk, rank in ranked.iterator() if pk in wanted}
+
+
+def around(queryset, participant, size):
+    """
+    Mengembalikan `size` peserta di atas dan di bawah participant,
+    masing-masing sudah diberi atribut rank
+    """
+    rank = rank_of(queryset, participant)
+    above = list(before(queryset, score_of(participant), participant.pk).order_by(*REVERSE_ORDERING)[:size])
+    below = list(after(queryset, score_of(participant), participant.pk).order_by(*ORDERING)[:size])
+    rows = above[::-1] + [participant] + below
+    return assign_ranks(rows, rank - len(above))
+
+
+def assign_ranks(rows, start):
+    for offset, row in enumerate(rows):
+        if isinstance(row, dict):
+            row['rank'] = start + offset
+        else:
+            row.rank = start + offset
+    return rows
@@ -0,0 +1,223 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, F, FloatField, Max, OuterRef, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Event, EventParticipant, Participants, ScoreEntry, ScoreSnapshot, ScoreSnapshotRow
+
+
+class HistoryCompacted(ValueError):
+    """
+    Nilai pada waktu yang diminta sudah tidak bisa dihitung karena
+    entry ledger sebelum snapshot tertua sudah dipadatkan
+    """
+
+
+def weight_of(rubric, criterion):
+    """
+    Bobot kriteria: nama lengkap ("gaya.kostum"), lalu induknya ("gaya"), default 1
+    """
+    if criterion in rubric:
+        return rubric[criterion]
+    return rubric.get(criterion.split('.', 1)[0], 1.0)
+
+
+def changes_between(participant_id, old_rows, new_rows):
+    """
+    Delta (nilai, jumlah) per (peserta, kriteria) dari baris Score lama ke baru
+    """
+    changes = defaultdict(lambda: [0.0, 0])
+    for criterion, value in old_rows:
+        changes[(participant_id, criterion)][0] -= value
+        changes[(participant_id, criterion)][1] -= 1
+    for criterion, value in new_rows:
+        changes[(participant_id, criterion)][0] += value
+        changes[(participant_id, criterion)][1] += 1
+    return changes
+
+
+def record(jury_id, changes, participant_ids):
+    """
+    Menambahkan delta ke ledger untuk setiap event peserta dan menaikkan
+    EventParticipant.total_score sebesar delta berbobot, tanpa membaca
+    ulang nilai lain. Participants.total_score harus sudah diperbarui
+    (NULL berarti peserta tidak punya nilai sama sekali).
+    """
+    changes = {key: delta for key, delta in changes.items() if delta[0] or delta[1]}
+    links = EventParticipant.objects.filter(participants_id__in=list(participant_ids)).values_list(
+        'pk', 'event_id', 'participants_id', 'event__rubric')
+    by_participant = defaultdict(list)
+    for (pid, criterion), (value, count) in changes.items():
+        by_participant[pid].append((criterion, value, count))
+
+    entries = []
+    increments = {}
+    for link_id, eid, pid, rubric in links:
+        increments[link_id] = 0.0
+        for criterion, value, count in by_participant.get(pid, ()):
+            entries.append(ScoreEntry(event_id=eid, participant_id=pid, jury_id=jury_id,
+                                      criterion=criterion, delta=value, count=count))
+            increments[link_id] += weight_of(rubric or {}, criterion) * value
+    if not increments:
+        return 0
+    ScoreEntry.objects.bulk_create(entries, batch_size=1000)
+
+    unscored = Participants.objects.filter(pk=OuterRef('participants_id'), total_score__isnull=True)
+    increment = Case(*[When(pk=pk, then=Value(inc)) for pk, inc in increments.items()],
+                     default=Value(0.0), output_field=FloatField())
+    return EventParticipant.objects.filter(pk__in=list(increments)).update(total_score=Case(
+        When(Exists(unscored), then=Value(None)),
+        default=Coalesce(F('total_score'), Value(0.0)) + increment,
+        output_field=FloatField(),
+    ))
+
+
+def latest_snapshot(eid, as_of=None):
+    snapshots = ScoreSnapshot.objects.filter(event_id=eid)
+    if as_of is not None:
+        snapshots = snapshots.filter(taken_at__lte=as_of)
+    snapshot = snapshots.order_by('-ledger_id').first()
+    if snapshot is None and as_of is not None and ScoreSnapshot.objects.filter(event_id=eid, compacted=True).exists():
+        raise HistoryCompacted('Riwayat nilai sebelum snapshot tertua sudah dipadatkan')
+    return snapshot
+
+
+def criterion_sums(eid, as_of=None, participant_ids=None):
+    """
+    {(peserta, kriteria): [nilai, jumlah]} dari snapshot terakhir (sebelum
+    as_of) ditambah entry ledger setelahnya
+    """
+    snapshot = latest_snapshot(eid, as_of)
+    sums = defaultdict(lambda: [0.0, 0])
+    entries = ScoreEntry.objects.filter(event_id=eid)
+    if snapshot is not None:
+        rows = snapshot.rows.all()
+        if participant_ids is not None:
+            rows = rows.filter(participant_id__in=participant_ids)
+        for pid, criterion, value, count in rows.values_list('participant_id', 'criterion', 'value', 'count').iterator():
+            sums[(pid, criterion)] = [value, count]
+        entries = entries.filter(id__gt=snapshot.ledger_id)
+    if as_of is not None:
+        entries = entries.filter(created_at__lte=as_of)
+    if participant_ids is not None:
+        entries = entries.filter(participant_id__in=participant_ids)
+    deltas = (entries.order_by().values('participant_id', 'criterion')
+              .annotate(value=Sum('delta'), count=Sum('count'))
+              .values_list('participant_id', 'criterion', 'value', 'count'))
+    for pid, criterion, value, count in deltas.iterator():
+        sums[(pid, criterion)][0] += value
+        sums[(pid, criterion)][1] += count
+    return sums
+
+
+def totals(eid, as_of=None, participant_ids=None, rubric=None):
+    """
+    Total berbobot per peserta {participant_id: total}. Peserta yang belum
+    punya nilai pada waktu tsb. tidak ada di hasil.
+    """
+    if rubric is None:
+        rubric = Event.objects.filter(pk=eid).values_list('rubric', flat=True).first() or {}
+    result = {}
+    for (pid, criterion), (value, count) in criterion_sums(eid, as_of, participant_ids).items():
+        if count <= 0:
+            continue
+        result[pid] = result.get(pid, 0.0) + weight_of(rubric, criterion) * value
+    return result
+
+
+def leaderboard(eid, as_of=None, limit=50):
+    """
+    Leaderboard event pada waktu as_of: list (rank, participant_id, total)
+    """
+    ranked = sorted(totals(eid, as_of).items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(rank, pid, total) for rank, (pid, total) in enumerate(ranked, start=1)]
+
+
+def recompute(eid, rubric=None, batch_size=1000):
+    """
+    Menghitung ulang EventParticipant.total_score seluruh peserta event
+    dari snapshot terakhir + delta, dipakai setelah rubric berubah
+    """
+    current = totals(eid, rubric=rubric)
+    links = list(EventParticipant.objects.filter(event_id=eid).only('pk', 'participants_id', 'total_score'))
+    changed = []
+    for link in links:
+        total = current.get(link.participants_id)
+        if link.total_score != total:
+            link.total_score = total
+            changed.append(link)
+    EventParticipant.objects.bulk_update(changed, ['total_score'], batch_size=batch_size)
+    return len(changed)
+
+
+@transaction.atomic
+def set_rubric(eid, rubric):
+    Event.objects.filter(pk=eid).update(rubric=rubric)
+    return recompute(eid, rubric=rubric)
+
+
+@transaction.atomic
+def take_snapshot(eid, lag=None):
+    """
+    Membuat snapshot dari snapshot sebelumnya + entry ledger yang dibuat
+    lebih dari `lag` detik lalu (EVENT_LEDGER_SNAPSHOT_LAG), supaya entry
+    dari transaksi yang belum commit tidak terlewat. taken_at snapshot
+    adalah waktu watermark dibaca. Tidak membuat snapshot baru jika tidak
+    ada entry baru.
+    """
+    lag = settings.EVENT_LEDGER_SNAPSHOT_LAG if lag is None else lag
+    cutoff = timezone.now() - datetime.timedelta(seconds=lag)
+    previous = ScoreSnapshot.objects.select_for_update().filter(event_id=eid).order_by('-ledger_id').first()
+    entries = ScoreEntry.objects.filter(event_id=eid)
+    if previous is not None:
+        entries = entries.filter(id__gt=previous.ledger_id)
+    watermark = entries.filter(created_at__lte=cutoff).aggregate(watermark=Max('id'))['watermark']
+    if watermark is None:
+        return previous
+    # entry dengan id <= watermark bisa saja dibuat setelah cutoff, jadi
+    # snapshot baru berlaku sejak watermark dibaca, bukan sejak cutoff
+    taken_at = timezone.now()
+
+    sums = defaultdict(lambda: [0.0, 0])
+    if previous is not None:
+        for pid, criterion, value, count in previous.rows.values_list('participant_id', 'criterion', 'value', 'count').iterator():
+            sums[(pid, criterion)] = [value, count]
+    deltas = (entries.filter(id__lte=watermark).order_by().values('participant_id', 'criterion')
+              .annotate(value=Sum('delta'), count=Sum('count'))
+              .values_list('participant_id', 'criterion', 'value', 'count'))
+    for pid, criterion, value, count in deltas.iterator():
+        sums[(pid, criterion)][0] += value
+        sums[(pid, criterion)][1] += count
+
+    snapshot = ScoreSnapshot.objects.create(event_id=eid, ledger_id=watermark, taken_at=taken_at)
+    ScoreSnapshotRow.objects.bulk_create([
+        ScoreSnapshotRow(snapshot=snapshot, participant_id=pid, criterion=criterion, value=value, count=count)
+        for (pid, criterion), (value, count) in sums.items() if count > 0
+    ], batch_size=1000)
+    return snapshot
+
+
+@transaction.atomic
+def compact(eid, keep=2, lag=None):
+    """
+    Membuat snapshot baru lalu hanya menyimpan `keep` snapshot terbaru.
+    Entry ledger yang sudah tercakup snapshot tertua yang disimpan dihapus,
+    sehingga ukuran ledger terbatas pada delta sejak snapshot tsb.
+    """
+    keep = max(keep, 1)
+    take_snapshot(eid, lag)
+    snapshots = list(ScoreSnapshot.objects.filter(event_id=eid).order_by('-ledger_id'))
+    if not snapshots:
+        return {'snapshots': 0, 'deleted_entries': 0, 'deleted_snapshots': 0}
+    base = snapshots[:keep][-1]
+    deleted_entries, _ = ScoreEntry.objects.filter(event_id=eid, id__lte=base.ledger_id).delete()
+    deleted_snapshots = ScoreSnapshot.objects.filter(pk__in=[s.pk for s in snapshots[keep:]]).delete()[1].get(
+        ScoreSnapshot._meta.label, 0)
+    if deleted_entries or deleted_snapshots:
+        ScoreSnapshot.objects.filter(pk=base.pk).update(compacted=True)
+    return {'snapshots': min(len(snapshots), keep), 'deleted_entries': deleted_entries,
+            'deleted_snapshots': deleted_snapshots}
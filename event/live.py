@@ -0,0 +1,145 @@
+import asyncio
+import json
+import re
+from http.cookies import SimpleCookie
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from . import leaderboard
+from .broker import get_broker
+from .exception_handler import get_response
+from .models import Event
+
+LIVE_PATH = re.compile(r'^/api/v1/event/(?P<eid>\d+)/live/$')
+
+
+def channel_name(eid):
+    return 'leaderboard.%s' % eid
+
+
+def publish_scores(participant_ids):
+    """
+    Dipanggil setelah nilai disimpan; delta dikirim setelah transaksi commit
+    """
+    participant_ids = list(participant_ids)
+    transaction.on_commit(lambda: publish_now(participant_ids))
+
+
+def publish_now(participant_ids):
+    broker = get_broker()
+    by_event = {}
+    rows = Event.peserta.through.objects.filter(participants_id__in=participant_ids)
+    for eid, pid in rows.values_list('event_id', 'participants_id'):
+        by_event.setdefault(eid, []).append(pid)
+
+    for eid, pids in by_event.items():
+        channel = channel_name(eid)
+        # tidak ada penonton, tidak perlu membaca ranking
+        if not broker.has_subscribers(channel):
+            continue
+        queryset = leaderboard.event_participants(eid)
+        participants = list(queryset.filter(pk__in=pids))
+        ranks = leaderboard.ranks(queryset, participants)
+        broker.publish(channel, {
+            "type": "score",
+            "event": eid,
+            "participants": [
+                {"id": p.pk, "total_score": leaderboard.score_of(p), "rank": ranks.get(p.pk)} for p in participants
+            ],
+        })
+
+
+def authenticate(scope):
+    """
+    Validasi access token JWT dari cookie atau header Authorization. Token
+    yang dicabut (TokenRevoke) ditolak, daftar JTI-nya dibaca dari cache
+    seperti ClaimsJWTAuthentication.
+    """
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from .authentication import is_revoked
+
+    headers = dict(scope.get('headers', []))
+    raw = None
+    authorization = headers.get(b'authorization', b'').decode('latin-1').split()
+    if len(authorization) == 2 and authorization[0] == 'Bearer':
+        raw = authorization[1]
+    else:
+        cookie = SimpleCookie(headers.get(b'cookie', b'').decode('latin-1'))
+        if settings.JWT_AUTH_COOKIE in cookie:
+            raw = cookie[settings.JWT_AUTH_COOKIE].value
+    if not raw:
+        return None
+    try:
+        token = AccessToken(raw)
+    except TokenError:
+        return None
+    if is_revoked(token):
+        return None
+    return token
+
+
+class LiveLeaderboardApp:
+    """
+    ASGI app untuk Server-Sent Events leaderboard pada /api/v1/event/<eid>/live/.
+    Request lain diteruskan ke aplikasi Django.
+    """
+
+    def __init__(self, application, heartbeat=15):
+        self.application = application
+        self.heartbeat = heartbeat
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            match = LIVE_PATH.match(scope['path'])
+            if match and scope['method'] == 'GET':
+                return await self.stream(scope, receive, send, int(match.group('eid')))
+        return await self.application(scope, receive, send)
+
+    async def reject(self, send, status, message):
+        body = json.dumps(get_response(message=message, status_code=status)).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def wait_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def send_event(self, send, name, data):
+        payload = 'event: %s\ndata: %s\n\n' % (name, json.dumps(data, cls=DjangoJSONEncoder))
+        await send({'type': 'http.response.body', 'body': payload.encode('utf-8'), 'more_body': True})
+
+    async def stream(self, scope, receive, send, eid):
+        # cache miss daftar token yang dicabut membaca DB
+        if await sync_to_async(authenticate)(scope) is None:
+            return await self.reject(send, 401, 'Authentication credentials were not provided.')
+
+        subscription = get_broker().subscribe(channel_name(eid))
+        disconnect = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            await self.send_event(send, 'ready', {"event": eid})
+            while True:
+                message = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait({message, disconnect}, timeout=self.heartbeat,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if message in done:
+                    await self.send_event(send, message.result()["type"], message.result())
+                    continue
+                message.cancel()
+                if disconnect in done:
+                    break
+                await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+        finally:
+            subscription.close()
+            disconnect.cancel()
+        await send({'type': 'http.response.body', 'body': b''})
@@ -0,0 +1,220 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from .models import Event, User
+from .urls import urlpatterns
+
+LOGIN_URL = '/api/v1/dj-rest-auth/login/'
+
+# endpoint yang mengubah data secara permanen atau mencabut token,
+# tidak dijalankan berulang kali oleh load test
+SKIPPED = {
+    'participants-import': 'membuat peserta baru setiap request',
+    'jury-bulk-create': 'membuat akun baru setiap request',
+    'committee-bulk-create': 'membuat akun baru setiap request',
+    'token-revoke': 'mencabut token yang dipakai load test',
+}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(int(round(q * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+class Scenario:
+
+    def __init__(self, name, role, method, path, body=None, write=False):
+        self.name = name
+        self.role = role
+        self.method = method
+        self.path = path
+        self.body = body
+        self.write = write
+
+
+class LoadTest:
+    """
+    Menjalankan setiap URL di event/urls.py (dan login dj-rest-auth) secara
+    in-process terhadap database lokal. Setiap role login sekali, request
+    berikutnya memakai cookie JWT. Hasil per skenario: latency p50/p95/p99,
+    throughput, jumlah query per request dan jumlah error.
+    """
+
+    def __init__(self, event, prefix='seed', password='seedpassword', requests=100,
+                 concurrency=1, writes=False, host='localhost'):
+        self.event = event
+        self.prefix = prefix
+        self.password = password
+        self.requests = requests
+        self.concurrency = concurrency
+        self.writes = writes
+        self.host = host
+
+    def users(self):
+        jury = self.event.juri.select_related('user').order_by('pk').first()
+        committee = self.event.panitia.select_related('user').order_by('pk').first()
+        admin = User.objects.get(username='%s-admin-0' % self.prefix)
+        return {'admin': admin, 'jury': jury and jury.user, 'committee': committee and committee.user}, jury, committee
+
+    def scenarios(self):
+        users, jury, committee = self.users()
+        eid = self.event.pk
+        participant = jury.participants.filter(event__pk=eid).order_by('pk').first() if jury else None
+        batch = list(jury.participants.filter(event__pk=eid).order_by('pk').values_list('pk', flat=True)[:20]) if jury else []
+        score = {'teknik': 80, 'vokal': 75, 'gaya': {'kostum': 8}}
+
+        scenarios = [
+            Scenario('performance-metrics', 'admin', 'get', reverse('performance-metrics')),
+            Scenario('event-list', 'admin', 'get', reverse('event-list')),
+            Scenario('event-detail', 'admin', 'get', reverse('event-detail', args=[eid])),
+            Scenario('committee-list', 'admin', 'get', reverse('committee-list', args=[eid])),
+            Scenario('jury-list', 'admin', 'get', reverse('jury-list', args=[eid])),
+            Scenario('participants-list', 'admin', 'get', reverse('participants-list', args=[eid])),
+            Scenario('participants-leaderboard', 'admin', 'get', reverse('participants-leaderboard', args=[eid])),
+            Scenario('event-rubric', 'admin', 'get', reverse('event-rubric', args=[eid])),
+            Scenario('participants-export', 'admin', 'get', reverse('participants-export', args=[eid]) + '?output=ndjson'),
+            # dry run: menghitung pembagian juri tanpa menyimpan
+            Scenario('jury-assign', 'admin', 'post', reverse('jury-assign', args=[eid]),
+                     {'per_participant': 2, 'dry_run': True}),
+        ]
+        if committee:
+            scenarios += [
+                Scenario('event-list-from-committee', 'committee', 'get',
+                         reverse('event-list-from-committee', args=[committee.pk])),
+                Scenario('committee-detail', 'admin', 'get', reverse('committee-detail', args=[eid, committee.pk])),
+                Scenario('committee-dashboard', 'committee', 'get', reverse('committee-dashboard', args=[committee.pk])),
+            ]
+        if jury:
+            scenarios += [
+                Scenario('event-list-from-jury', 'jury', 'get', reverse('event-list-from-jury', args=[jury.pk])),
+                Scenario('jury-dashboard', 'jury', 'get', reverse('jury-dashboard', args=[jury.pk])),
+                Scenario('jury-detail', 'admin', 'get', reverse('jury-detail', args=[eid, jury.pk])),
+                Scenario('participants-jury-list', 'jury', 'get', reverse('participants-jury-list', args=[eid, jury.pk])),
+            ]
+        if participant:
+            detail = reverse('participants-jury-detail', args=[eid, jury.pk, participant.pk])
+            scenarios += [
+                Scenario('participants-jury-detail', 'jury', 'get', detail),
+                Scenario('participants-jury-detail:patch', 'jury', 'patch', detail, {'score_field': score}, write=True),
+                Scenario('participants-jury-list:patch', 'jury', 'patch',
+                         reverse('participants-jury-list', args=[eid, jury.pk]),
+                         [{'id': pk, 'score_field': score} for pk in batch], write=True),
+            ]
+        return users, scenarios
+
+    def login(self, user):
+        client = Client(HTTP_HOST=self.host)
+        started = time.perf_counter()
+        response = client.post(LOGIN_URL, {'username': user.username, 'password': self.password},
+                               content_type='application/json')
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise ValueError('Login %s gagal (%s)' % (user.username, response.status_code))
+        return client, elapsed
+
+    def request(self, client, scenario):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            kwargs = {}
+            if scenario.body is not None:
+                kwargs = {'data': scenario.body, 'content_type': 'application/json'}
+            response = getattr(client, scenario.method)(scenario.path, **kwargs)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+        return time.perf_counter() - started, len(queries), response.status_code
+
+    def worker(self, users, scenarios, results, login_times, lock):
+        clients = {}
+        for role, user in users.items():
+            if user is None:
+                continue
+            clients[role], elapsed = self.login(user)
+            with lock:
+                login_times.append(elapsed)
+        for scenario in scenarios:
+            samples = []
+            started = time.perf_counter()
+            for _ in range(self.requests):
+                samples.append(self.request(clients[scenario.role], scenario))
+            wall = time.perf_counter() - started
+            with lock:
+                entry = results.setdefault(scenario.name, {'samples': [], 'wall': 0.0})
+                entry['samples'] += samples
+                entry['wall'] = max(entry['wall'], wall)
+
+    def thread_worker(self, *args):
+        try:
+            self.worker(*args)
+        finally:
+            connections.close_all()
+
+    def run(self):
+        users, scenarios = self.scenarios()
+        if not self.writes:
+            scenarios = [s for s in scenarios if not s.write]
+
+        results, login_times, lock = {}, [], threading.Lock()
+        if self.concurrency == 1:
+            self.worker(users, scenarios, results, login_times, lock)
+        else:
+            threads = [threading.Thread(target=self.thread_worker, args=(users, scenarios, results, login_times, lock))
+                       for _ in range(self.concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        report = {'login': self.summarize([(t, None, 200) for t in login_times], sum(login_times))}
+        for scenario in scenarios:
+            entry = results.get(scenario.name)
+            if entry:
+                report[scenario.name] = self.summarize(entry['samples'], entry['wall'])
+                report[scenario.name].update(method=scenario.method.upper(), path=scenario.path)
+
+        covered = {s.name.split(':')[0] for s in scenarios}
+        skipped = {}
+        for pattern in urlpatterns:
+            if pattern.name in SKIPPED:
+                skipped[pattern.name] = SKIPPED[pattern.name]
+            elif pattern.name not in covered:
+                skipped[pattern.name] = 'tidak ada skenario (butuh data seed atau --writes)'
+        return {'results': report, 'skipped': skipped}
+
+    def summarize(self, samples, wall):
+        latencies = [s[0] * 1000 for s in samples]
+        queries = [s[1] for s in samples if s[1] is not None]
+        errors = sum(1 for s in samples if s[2] >= 400)
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'throughput': round(len(samples) / wall, 2) if wall else None,
+            'p50_ms': round(percentile(latencies, 0.50), 3) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99), 3) if latencies else None,
+            'mean_ms': round(statistics.mean(latencies), 3) if latencies else None,
+            'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+        }
+
+
+def metadata():
+    db = settings.DATABASES['default']
+    return {
+        'database': '%s/%s' % (db['ENGINE'].rsplit('.', 1)[-1], db.get('NAME')),
+        'event_count': Event.objects.count(),
+    }
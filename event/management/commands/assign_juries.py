@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from event import assignment
+from event.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Membagi seluruh peserta event ke juri event secara otomatis (beban seimbang, tanpa konflik institusi)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='id event')
+        parser.add_argument('--per-participant', type=int, default=1, help='jumlah juri per peserta')
+        parser.add_argument('--max-load', type=int, default=None, help='batas peserta per juri')
+        parser.add_argument('--limit', nargs=2, type=int, action='append', metavar=('JURY', 'LOAD'), default=[],
+                            help='batas peserta untuk juri tertentu, bisa diulang')
+        parser.add_argument('--replace', action='store_true', help='hapus assignment lama yang belum dinilai')
+        parser.add_argument('--dry-run', action='store_true', help='hanya menghitung, tidak menyimpan')
+
+    def handle(self, *args, **options):
+        if options['per_participant'] < 1:
+            raise CommandError('--per-participant minimal 1')
+        job = assignment.JuryAssigner(
+            options['event'],
+            per_participant=options['per_participant'],
+            max_load=options['max_load'],
+            limits=dict(options['limit']),
+            replace=options['replace'],
+        )
+        try:
+            result = job.run(dry_run=options['dry_run'])
+        except Event.DoesNotExist:
+            raise CommandError('Event tidak ditemukan')
+
+        if options['verbosity'] > 1:
+            for jid, load in sorted(result['loads'].items()):
+                self.stdout.write('jury %s: %d peserta' % (jid, load))
+        for item in result['incomplete_participants']:
+            self.stderr.write('peserta %(id)s hanya mendapat %(assigned)d juri' % item)
+        self.stdout.write(self.style.SUCCESS('%d assignment dibuat, %d dihapus, %d peserta kekurangan juri%s' % (
+            result['created'], result['removed'], result['incomplete'], ' (dry run)' if result['dry_run'] else '')))
@@ -0,0 +1,68 @@
+import io
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from event import renderers
+from event.models import Event, User
+from event.views import EventDetail, ParticipantsList
+
+
+class Command(BaseCommand):
+    help = 'Membandingkan JSONRenderer/JSONParser bawaan DRF dengan versi orjson pada payload ParticipantsList dan EventDetail'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='id event')
+        parser.add_argument('--limit', type=int, default=500, help='jumlah peserta per halaman ParticipantsList')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if not Event.objects.filter(pk=options['event']).exists():
+            raise CommandError('Event tidak ditemukan')
+        admin = User.objects.filter(is_staff=True).order_by('pk').first()
+        if admin is None:
+            raise CommandError('Tidak ada user admin')
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson tidak terpasang, renderer memakai json stdlib'))
+
+        eid = options['event']
+        payloads = {
+            'ParticipantsList': self.payload(ParticipantsList, admin, '/api/v1/event/%s/participants/' % eid,
+                                             {'limit': options['limit']}, eid=eid),
+            'EventDetail': self.payload(EventDetail, admin, '/api/v1/event/%s/' % eid, {}, pk=eid),
+        }
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            if renderers.FastJSONRenderer().render(data) != body:
+                raise CommandError('Output renderer berbeda untuk %s' % name)
+            results = (
+                ('render', JSONRenderer().render, renderers.FastJSONRenderer().render, data),
+                ('parse', lambda b: JSONParser().parse(io.BytesIO(b)),
+                 lambda b: renderers.FastJSONParser().parse(io.BytesIO(b)), body),
+            )
+            for label, stdlib, fast, arg in results:
+                slow_ms = self.time(stdlib, arg, options['repeat'])
+                fast_ms = self.time(fast, arg, options['repeat'])
+                self.stdout.write('%-17s %-6s %8d bytes  stdlib %8.3f ms  fast %8.3f ms  %5.1fx' % (
+                    name, label, len(body), slow_ms, fast_ms, slow_ms / fast_ms if fast_ms else 0))
+
+    def payload(self, view_class, user, path, params, **kwargs):
+        request = APIRequestFactory().get(path, params, HTTP_HOST='localhost')
+        force_authenticate(request, user)
+        with override_settings(ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['localhost']):
+            response = view_class.as_view()(request, **kwargs)
+        if response.status_code != 200:
+            raise CommandError('%s mengembalikan status %s' % (view_class.__name__, response.status_code))
+        return response.data
+
+    def time(self, func, arg, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func(arg)
+        return (time.perf_counter() - started) * 1000 / repeat
+
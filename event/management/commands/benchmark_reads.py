@@ -0,0 +1,164 @@
+import asyncio
+import statistics
+import time
+import types
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import URLPattern, clear_url_caches, include, path
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+
+from event import urls as event_urls
+from event.authentication import TokenClaimsSerializer
+from event.models import Event, User
+
+PATHS = (
+    '/api/v1/event/',
+    '/api/v1/event/{eid}/',
+    '/api/v1/event/{eid}/participants/leaderboard/',
+    '/api/v1/event/{eid}/jury/{jid}/participants/',
+)
+
+
+def sync_urlconf():
+    """
+    URLconf api/v1/ dengan view async_read diganti as_view() biasa,
+    dipakai sebagai pembanding lewat handler dan middleware yang sama
+    """
+    patterns = []
+    for pattern in event_urls.urlpatterns:
+        callback = pattern.callback
+        if asyncio.iscoroutinefunction(callback) and hasattr(callback, 'cls'):
+            callback = callback.cls.as_view(**callback.initkwargs)
+        patterns.append(URLPattern(pattern.pattern, callback, pattern.default_args, pattern.name))
+    module = types.ModuleType('benchmark_sync_urls')
+    module.urlpatterns = [path('api/v1/', include(patterns))]
+    return module
+
+
+def middleware_modes():
+    """
+    Cara setiap middleware dijalankan di bawah ASGI. Hook process_request/
+    process_response MiddlewareMixin Django tetap pindah ke thread sync.
+    """
+    modes = []
+    for dotted in settings.MIDDLEWARE:
+        middleware = import_string(dotted)
+        if not getattr(middleware, 'async_capable', False):
+            mode = 'sync (adapter sync_to_async per request)'
+        elif issubclass(middleware, MiddlewareMixin) and (
+                hasattr(middleware, 'process_request') or hasattr(middleware, 'process_response')):
+            mode = 'async, hook process_request/process_response di thread sync'
+        else:
+            mode = 'async'
+        modes.append((dotted, mode))
+    return modes
+
+
+class Command(BaseCommand):
+    help = ('Membandingkan throughput view baca sync dan async lewat ASGIHandler '
+            'beserta seluruh MIDDLEWARE')
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='id event')
+        parser.add_argument('--user', default=None, help='username pemanggil, default admin pertama')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--host', default='localhost', help='header Host, harus ada di ALLOWED_HOSTS')
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help='simulasi latency jaringan DB per query (ms)')
+
+    def handle(self, *args, **options):
+        try:
+            ev = Event.objects.get(pk=options['event'])
+        except Event.DoesNotExist:
+            raise CommandError('Event tidak ditemukan')
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+        else:
+            user = User.objects.filter(is_staff=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('Tidak ada user admin, gunakan --user')
+        token = str(TokenClaimsSerializer.get_token(user).access_token)
+        jury = ev.juri.order_by('pk').first()
+        if options['db_latency']:
+            self.simulate_latency(options['db_latency'] / 1000)
+
+        for dotted, mode in middleware_modes():
+            self.stdout.write('middleware %-50s %s' % (dotted, mode))
+
+        handler = ASGIHandler()
+        urlconfs = (('sync', sync_urlconf()), ('async', settings.ROOT_URLCONF))
+        for template in PATHS:
+            if '{jid}' in template and jury is None:
+                continue
+            url = template.format(eid=ev.pk, jid=jury.pk if jury else '')
+            for mode, urlconf in urlconfs:
+                with override_settings(ROOT_URLCONF=urlconf):
+                    clear_url_caches()
+                    result = asyncio.run(self.run(handler, url, token, options['host'],
+                                                  options['requests'], options['concurrency']))
+                clear_url_caches()
+                self.stdout.write('%-6s %-55s %8.1f req/s  p50 %7.1f ms  p95 %7.1f ms  status %s' % (
+                    mode, url, result['throughput'], result['p50'], result['p95'], result['status']))
+        connections.close_all()
+
+    def simulate_latency(self, seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        # berlaku juga untuk koneksi baru di thread pool
+        def install(connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        for conn in connections.all():
+            install(conn)
+        connection_created.connect(install, weak=False)
+
+    async def request(self, handler, url, token, host):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': url, 'raw_path': url.encode('ascii'), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', host.encode('ascii')), (b'authorization', ('Bearer %s' % token).encode('ascii'))],
+            'server': (host, 80), 'client': ('127.0.0.1', 0),
+        }
+        statuses = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        await handler(scope, receive, send)
+        return statuses[0]
+
+    async def run(self, handler, url, token, host, total, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = set()
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                statuses.add(await self.request(handler, url, token, host))
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            'throughput': total / elapsed,
+            'p50': statistics.median(latencies),
+            'p95': latencies[int(len(latencies) * 0.95) - 1],
+            'status': ','.join(str(s) for s in sorted(statuses)),
+        }
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from event import leaderboard
+from event.models import Event
+from event.serializers import EventParticipantsSerializer, ParticipantsValuesSerializer
+
+
+class Command(BaseCommand):
+    help = 'Membandingkan EventParticipantsSerializer dengan ParticipantsValuesSerializer pada peserta suatu event'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='id event')
+        parser.add_argument('--limit', type=int, default=5000, help='jumlah peserta yang diserialisasi')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if not Event.objects.filter(pk=options['event']).exists():
+            raise CommandError('Event tidak ditemukan')
+        queryset = leaderboard.event_participants(options['event']).order_by(*leaderboard.ORDERING)[:options['limit']]
+
+        def model_path():
+            return EventParticipantsSerializer(list(queryset), many=True).data
+
+        def values_path():
+            return ParticipantsValuesSerializer(queryset, many=True).data
+
+        expected = model_path()
+        if [dict(row) for row in expected] != values_path():
+            raise CommandError('Output ValuesSerializer berbeda dengan EventParticipantsSerializer')
+
+        model_ms = self.time(model_path, options['repeat'])
+        values_ms = self.time(values_path, options['repeat'])
+        self.stdout.write('%d peserta  ModelSerializer %8.2f ms  ValuesSerializer %8.2f ms  %5.1fx' % (
+            len(expected), model_ms, values_ms, model_ms / values_ms if values_ms else 0))
+
+    def time(self, func, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) * 1000 / repeat
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from event import ledger
+from event.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Membuat snapshot ledger nilai per event dan menghapus entry yang sudah tercakup snapshot (jalankan berkala, mis. cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', help='id event, default semua event')
+        parser.add_argument('--keep', type=int, default=2, help='jumlah snapshot terbaru yang disimpan')
+        parser.add_argument('--lag', type=int, default=None,
+                            help='hanya entry yang lebih tua dari ini (detik), default EVENT_LEDGER_SNAPSHOT_LAG')
+
+    def handle(self, *args, **options):
+        if options['keep'] < 1:
+            raise CommandError('--keep minimal 1')
+        events = Event.objects.order_by('pk').values_list('pk', flat=True)
+        if options['event']:
+            events = events.filter(pk__in=options['event'])
+
+        total = {'deleted_entries': 0, 'deleted_snapshots': 0}
+        for eid in events.iterator():
+            result = ledger.compact(eid, keep=options['keep'], lag=options['lag'])
+            total['deleted_entries'] += result['deleted_entries']
+            total['deleted_snapshots'] += result['deleted_snapshots']
+            if options['verbosity'] > 1:
+                self.stdout.write('event %s: %s' % (eid, result))
+        self.stdout.write(self.style.SUCCESS('%(deleted_entries)d entry ledger dan %(deleted_snapshots)d snapshot dihapus' % total))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from event import importer
+from event.models import Event, Jury
+
+
+class Command(BaseCommand):
+    help = 'Import peserta ke event dari file CSV atau NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='id event')
+        parser.add_argument('path', help='lokasi file CSV/NDJSON')
+        parser.add_argument('--jury', type=int, default=None, help='assign peserta ke jury tsb.')
+        parser.add_argument('--format', dest='file_format', choices=importer.FORMATS, default=None)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or importer.detect_format(options['path'])
+        job = importer.ParticipantImporter(options['event'], options['jury'], chunk_size=options['chunk_size'])
+        try:
+            with open(options['path'], 'rb') as stream:
+                summary = job.run(importer.iter_rows(stream, file_format))
+        except Event.DoesNotExist:
+            raise CommandError('Event tidak ditemukan')
+        except Jury.DoesNotExist:
+            raise CommandError('Jury tidak ditemukan pada event ini')
+
+        for error in summary['errors']:
+            self.stderr.write('baris %(line)s: %(message)s' % error)
+        self.stdout.write(self.style.SUCCESS('%d peserta diimport, %d gagal' % (summary['created'], summary['failed'])))
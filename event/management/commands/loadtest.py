@@ -0,0 +1,71 @@
+import datetime
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from event import loadtest
+from event.models import Event, User
+
+
+class Command(BaseCommand):
+    help = 'Load test in-process seluruh endpoint event terhadap database lokal (data dari seed_data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, default=None, help='id event, default event seed pertama')
+        parser.add_argument('--prefix', default='seed', help='prefix yang dipakai seed_data')
+        parser.add_argument('--password', default='seedpassword')
+        parser.add_argument('--requests', type=int, default=100, help='request per skenario per thread')
+        parser.add_argument('--concurrency', type=int, default=1, help='jumlah thread client')
+        parser.add_argument('--writes', action='store_true', help='ikut menjalankan PATCH nilai')
+        parser.add_argument('--output', default=None, help='simpan hasil JSON ke file ini')
+
+    def handle(self, *args, **options):
+        if options['event']:
+            event = Event.objects.filter(pk=options['event']).first()
+        else:
+            event = Event.objects.filter(title__startswith='%s event' % options['prefix']).order_by('pk').first()
+        if event is None:
+            raise CommandError('Event tidak ditemukan, jalankan seed_data terlebih dahulu')
+        if not User.objects.filter(username='%s-admin-0' % options['prefix']).exists():
+            raise CommandError('User %s-admin-0 tidak ditemukan' % options['prefix'])
+
+        test = loadtest.LoadTest(event, prefix=options['prefix'], password=options['password'],
+                                 requests=options['requests'], concurrency=options['concurrency'],
+                                 writes=options['writes'])
+        # client in-process memakai host localhost
+        with override_settings(ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['localhost']):
+            try:
+                report = test.run()
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        report['meta'] = dict(loadtest.metadata(), **{
+            'commit': self.commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'event': event.pk,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'writes': options['writes'],
+        })
+
+        for name, result in report['results'].items():
+            self.stdout.write('%-34s %6d req %4d err %9s req/s  p50 %8s  p95 %8s  p99 %8s ms  %6s q/req' % (
+                name, result['requests'], result['errors'], result['throughput'], result['p50_ms'],
+                result['p95_ms'], result['p99_ms'], result['queries_per_request']))
+        for name, reason in report['skipped'].items():
+            self.stdout.write('%-34s dilewati: %s' % (name, reason))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS('Hasil disimpan ke %s' % options['output']))
+
+    def commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from event import importer, onboarding
+from event.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Membuat akun jury/committee secara massal pada event dari file CSV atau NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event', type=int, help='id event')
+        parser.add_argument('role', choices=sorted(onboarding.ROLES))
+        parser.add_argument('path', help='lokasi file CSV/NDJSON (username, email, password, first_name, ...)')
+        parser.add_argument('--format', dest='file_format', choices=importer.FORMATS, default=None)
+        parser.add_argument('--confirm', action='store_true', help='tambahkan akun yang sudah ada ke event')
+        parser.add_argument('--workers', type=int, default=None, help='jumlah proses hash password')
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or importer.detect_format(options['path'])
+        job = onboarding.Onboarding(options['event'], options['role'], confirm=options['confirm'],
+                                    workers=options['workers'])
+        try:
+            with open(options['path'], 'rb') as stream:
+                summary = job.run(importer.iter_rows(stream, file_format))
+        except Event.DoesNotExist:
+            raise CommandError('Event tidak ditemukan')
+
+        for error in summary['errors']:
+            self.stderr.write('baris %(line)s: %(message)s' % error)
+        self.stdout.write(self.style.SUCCESS('%d akun dibuat, %d ditambahkan, %d gagal' % (
+            summary['created'], summary['linked'], summary['failed'])))
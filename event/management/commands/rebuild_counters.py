@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from event import counters
+
+
+class Command(BaseCommand):
+    help = 'Menghitung ulang seluruh counter statistik dari data yang ada'
+
+    def handle(self, *args, **options):
+        total = counters.rebuild()
+        self.stdout.write(self.style.SUCCESS('%d counter berhasil dibangun ulang' % total))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from event.seed import Seeder
+
+
+class Command(BaseCommand):
+    help = 'Membuat dataset sintetis deterministik untuk benchmark dan load test'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=500)
+        parser.add_argument('--participants', type=int, default=200000)
+        parser.add_argument('--juries', type=int, default=5000)
+        parser.add_argument('--committees', type=int, default=1000)
+        parser.add_argument('--juries-per-participant', type=int, default=2)
+        parser.add_argument('--scored', type=float, default=0.8, help='porsi peserta yang sudah dinilai')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help='prefix username dan kode peserta')
+        parser.add_argument('--password', default='seedpassword', help='password seluruh user seed')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['events'] < 1:
+            raise CommandError('--events minimal 1')
+        seeder = Seeder(
+            events=options['events'], participants=options['participants'], juries=options['juries'],
+            committees=options['committees'], juries_per_participant=options['juries_per_participant'],
+            scored=options['scored'], seed=options['seed'], prefix=options['prefix'],
+            password=options['password'], batch_size=options['batch_size'], stdout=self.stdout,
+        )
+        started = time.perf_counter()
+        try:
+            summary = seeder.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            '%(events)d event, %(participants)d peserta, %(juries)d jury, %(committees)d committee, '
+            '%(scores)d nilai' % summary + ' dibuat dalam %.1f detik' % (time.perf_counter() - started)
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 12:52
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0002_statisticcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participants',
+            index=models.Index(django.db.models.expressions.OrderBy(django.db.models.expressions.F('total_score'), descending=True, nulls_last=True), django.db.models.expressions.F('id'), name='participant_leaderboard_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+from numbers import Number
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Sum
+
+
+def flatten(score_field, prefix=''):
+    # salinan event.scores.flatten saat migrasi ini dibuat, supaya perubahan
+    # pada modul aplikasi tidak mengubah hasil migrasi
+    if not isinstance(score_field, dict):
+        return []
+    items = []
+    for key, value in score_field.items():
+        criterion = '%s%s' % (prefix, key)
+        if isinstance(value, dict):
+            items += flatten(value, criterion + '.')
+        elif isinstance(value, Number) and not isinstance(value, bool):
+            items.append((criterion, float(value)))
+    return items
+
+
+def forwards(apps, schema_editor):
+    Participants = apps.get_model('event', 'Participants')
+    Score = apps.get_model('event', 'Score')
+    Jury = apps.get_model('event', 'Jury')
+
+    # nilai lama hanya bisa diatribusikan jika peserta punya tepat satu juri
+    juries = {}
+    for pid, jid in Jury.participants.through.objects.values_list('participants_id', 'jury_id'):
+        juries.setdefault(pid, []).append(jid)
+
+    scored = []
+    rows = []
+    for pid, score_field in Participants.objects.exclude(score_field=None).values_list('pk', 'score_field').iterator():
+        items = flatten(score_field)
+        if not items:
+            continue
+        jids = juries.get(pid, [])
+        jid = jids[0] if len(jids) == 1 else None
+        rows += [Score(participant_id=pid, jury_id=jid, criterion=c[:255], value=v) for c, v in items]
+        scored.append(pid)
+        if len(rows) >= 1000:
+            Score.objects.bulk_create(rows)
+            rows = []
+    Score.objects.bulk_create(rows)
+
+    totals = (Score.objects.filter(participant=OuterRef('pk'))
+              .order_by().values('participant').annotate(total=Sum('value')).values('total'))
+    for start in range(0, len(scored), 1000):
+        Participants.objects.filter(pk__in=scored[start:start + 1000]).update(total_score=Subquery(totals))
+
+
+def backwards(apps, schema_editor):
+    apps.get_model('event', 'Score').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0004_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
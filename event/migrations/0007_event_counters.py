@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def forwards(apps, schema_editor):
+    Event = apps.get_model('event', 'Event')
+    StatisticCounter = apps.get_model('event', 'StatisticCounter')
+
+    columns = {}
+    for field, column in (('peserta', 'participants_count'), ('juri', 'jury_count'), ('panitia', 'committee_count')):
+        through = getattr(Event, field).through
+        counts = through.objects.filter(event_id=OuterRef('pk')).order_by().values('event_id').annotate(n=Count('pk'))
+        columns[column] = Coalesce(Subquery(counts.values('n')), 0)
+    Event.objects.update(**columns)
+    # counter per event sebelumnya disimpan sebagai baris 'event:<id>:<nama>'
+    StatisticCounter.objects.filter(key__startswith='event:').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0006_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='committee_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='jury_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0007_event_counters'),
+    ]
+
+    operations = [
+        # tabel event_event_peserta sudah ada sebagai through otomatis,
+        # cukup daftarkan modelnya di state tanpa mengubah database
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='EventParticipant',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='event.event')),
+                        ('participants', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_links', to='event.participants')),
+                    ],
+                    options={
+                        'db_table': 'event_event_peserta',
+                        'unique_together': {('event', 'participants')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='event',
+                    name='peserta',
+                    field=models.ManyToManyField(null=True, related_name='event', through='event.EventParticipant', to='event.Participants'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='eventparticipant',
+            name='total_score',
+            field=models.FloatField(null=True),
+        ),
+        migrations.RunSQL(
+            'UPDATE event_event_peserta SET total_score = p.total_score '
+            'FROM event_participants p WHERE p.id = event_event_peserta.participants_id',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='eventparticipant',
+            index=models.Index(django.db.models.expressions.F('event'), django.db.models.expressions.OrderBy(django.db.models.expressions.F('total_score'), descending=True, nulls_last=True), django.db.models.expressions.F('participants'), name='event_leaderboard_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0008_event_participant_through'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ledger_id', models.BigIntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('compacted', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rubric',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='ScoreSnapshotRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criterion', models.CharField(max_length=255)),
+                ('value', models.FloatField()),
+                ('count', models.IntegerField()),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='event.participants')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='event.scoresnapshot')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scoresnapshot',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_snapshots', to='event.event'),
+        ),
+        migrations.CreateModel(
+            name='ScoreEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criterion', models.CharField(max_length=255)),
+                ('delta', models.FloatField()),
+                ('count', models.SmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_entries', to='event.event')),
+                ('jury', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='score_entries', to='event.jury')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_entries', to='event.participants')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scoresnapshotrow',
+            index=models.Index(fields=['snapshot', 'participant'], name='score_snapshot_row_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoresnapshot',
+            index=models.Index(fields=['event', 'taken_at'], name='score_snapshot_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreentry',
+            index=models.Index(fields=['event', 'id'], name='score_entry_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreentry',
+            index=models.Index(fields=['participant', 'id'], name='score_entry_participant_idx'),
+        ),
+        # nilai yang sudah ada menjadi entry pertama ledger
+        migrations.RunSQL(
+            'INSERT INTO event_scoreentry (event_id, participant_id, jury_id, criterion, delta, count, created_at) '
+            'SELECT ep.event_id, s.participant_id, s.jury_id, s.criterion, s.value, 1, s.updated_at '
+            'FROM event_score s JOIN event_event_peserta ep ON ep.participants_id = s.participant_id',
+            'DELETE FROM event_scoreentry',
+        ),
+    ]
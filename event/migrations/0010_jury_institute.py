@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0009_score_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jury',
+            name='institute',
+            field=models.CharField(blank=True, default='', max_length=512),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0010_jury_institute'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='claims_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
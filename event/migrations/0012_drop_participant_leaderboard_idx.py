@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0011_user_claims_changed_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='participants',
+            name='participant_leaderboard_idx',
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 
@@ -18,6 +19,8 @@ class User(AbstractUser):
     city = models.CharField(max_length=512, null=True, blank=True)
     state = models.CharField(max_length=512, null=True, blank=True)
     photo_url = models.URLField(null=True, blank=True)
+    # terakhir kali is_active atau role berubah, token yang terbit sebelumnya dianggap basi
+    claims_changed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
 class Participants(models.Model):
     code = models.CharField(max_length=20, unique=True, null=False)
@@ -37,6 +40,9 @@ class Participants(models.Model):
 class Jury(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     participants = models.ManyToManyField(Participants, null=True, related_name='jury')
+    # asal institusi juri, peserta dari institusi yang sama tidak diassign
+    # ke juri ini oleh assignment.assign (konflik kepentingan)
+    institute = models.CharField(max_length=512, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -64,9 +70,132 @@ class Event(models.Model):
     event_level = models.CharField(max_length=512)
     panitia = models.ManyToManyField(Committee, null=True, related_name='event')
     juri = models.ManyToManyField(Jury, null=True, related_name='event')
-    peserta = models.ManyToManyField(Participants, null=True, related_name='event')
+    peserta = models.ManyToManyField(Participants, null=True, related_name='event', through='EventParticipant')
+    participants_count = models.PositiveIntegerField(default=0)
+    jury_count = models.PositiveIntegerField(default=0)
+    committee_count = models.PositiveIntegerField(default=0)
+    # bobot per kriteria ({"teknik": 2, "gaya": 0.5}), kriteria tanpa bobot bernilai 1
+    rubric = models.JSONField(default=dict, blank=True)
+
+    COUNTER_FIELDS = ('participants_count', 'jury_count', 'committee_count')
+    # diubah lewat UPDATE langsung (counters.py, ledger.set_rubric)
+    MANAGED_FIELDS = COUNTER_FIELDS + ('rubric',)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # counter hanya diubah lewat UPDATE bersyarat di counters.py,
+        # save() biasa tidak boleh menimpanya dengan nilai lama
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MANAGED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+class EventParticipant(models.Model):
+    """
+    Tabel relasi event-peserta. total_score adalah total berbobot rubric
+    event, diperbarui dari delta ledger nilai (lihat ledger.record) supaya
+    leaderboard per event bisa dibaca langsung dari index
+    (event, total_score DESC, peserta).
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    participants = models.ForeignKey(Participants, on_delete=models.CASCADE, related_name='event_links')
+    total_score = models.FloatField(null=True)
+
+    class Meta:
+        db_table = 'event_event_peserta'
+        unique_together = (('event', 'participants'),)
+        indexes = [
+            models.Index(
+                'event', F('total_score').desc(nulls_last=True), 'participants',
+                name='event_leaderboard_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return '%s - %s' % (self.event_id, self.participants_id)
+
+class Score(models.Model):
+    participant = models.ForeignKey(Participants, on_delete=models.CASCADE, related_name='scores')
+    jury = models.ForeignKey(Jury, on_delete=models.CASCADE, null=True, blank=True, related_name='scores')
+    criterion = models.CharField(max_length=255)
+    value = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['participant', 'jury', 'criterion'], name='unique_score_per_criterion'),
+        ]
+
+    def __str__(self):
+        return '%s - %s' % (self.participant_id, self.criterion)
+
+class ScoreEntry(models.Model):
+    """
+    Ledger nilai append-only per event. Setiap perubahan Score dicatat
+    sebagai delta nilai dan delta jumlah nilai (count: +1 kriteria baru
+    dinilai, -1 nilai dihapus) sehingga nilai 0 bisa dibedakan dari
+    belum dinilai.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='score_entries')
+    participant = models.ForeignKey(Participants, on_delete=models.CASCADE, related_name='score_entries')
+    jury = models.ForeignKey(Jury, on_delete=models.SET_NULL, null=True, blank=True, related_name='score_entries')
+    criterion = models.CharField(max_length=255)
+    delta = models.FloatField()
+    count = models.SmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'id'], name='score_entry_event_idx'),
+            models.Index(fields=['participant', 'id'], name='score_entry_participant_idx'),
+        ]
 
+    def __str__(self):
+        return '%s - %s %+g' % (self.participant_id, self.criterion, self.delta)
+
+class ScoreSnapshot(models.Model):
+    """
+    Nilai per peserta per kriteria sebuah event setelah semua entry ledger
+    sampai ledger_id. compacted berarti entry sebelumnya sudah dihapus.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='score_snapshots')
+    ledger_id = models.BigIntegerField()
+    taken_at = models.DateTimeField()
+    compacted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['event', 'taken_at'], name='score_snapshot_event_idx')]
+
+    def __str__(self):
+        return '%s @ %s' % (self.event_id, self.ledger_id)
+
+class ScoreSnapshotRow(models.Model):
+    snapshot = models.ForeignKey(ScoreSnapshot, on_delete=models.CASCADE, related_name='rows')
+    participant = models.ForeignKey(Participants, on_delete=models.CASCADE, related_name='+')
+    criterion = models.CharField(max_length=255)
+    value = models.FloatField()
+    count = models.IntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['snapshot', 'participant'], name='score_snapshot_row_idx')]
+
+class StatisticCounter(models.Model):
+    key = models.CharField(max_length=128, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.key
+
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,218 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from . import counters, response_cache
+from .exception_handler import get_error_message
+from .models import Committee, Event, Jury, User
+from .serializers import OnboardingUserSerializer
+
+ROLES = {
+    # role -> (model profil, field M2M di Event, flag di User, counter total)
+    'jury': (Jury, 'juri', 'is_jury', counters.TOTAL_JURY),
+    'committee': (Committee, 'panitia', 'is_committee', counters.TOTAL_COMMITTEE),
+}
+MAX_REPORTED_ERRORS = 1000
+FULL_MESSAGES = {'jury': 'Jumlah juri sudah penuh', 'committee': 'Jumlah panitia sudah penuh'}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _setup_worker():
+    # proses baru (spawn/forkserver) belum memuat settings Django
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def get_pool(workers):
+    """
+    Process pool bersama satu per proses, dibuat saat pertama dipakai
+    dengan ukuran `workers`, lalu dipakai ulang oleh request berikutnya
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker)
+    return _pool
+
+
+def reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash PBKDF2 di process pool supaya tidak dibatasi GIL, batch kecil
+    di-hash langsung karena biaya kirim ke proses lain lebih besar
+    """
+    workers = workers or settings.EVENT_ONBOARDING_WORKERS or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < settings.EVENT_ONBOARDING_POOL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    chunksize = max(len(passwords) // (workers * 4), 1)
+    try:
+        return list(get_pool(workers).map(make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # worker mati (mis. OOM), pool dibuat ulang pada batch berikutnya
+        reset_pool()
+        return [make_password(password) for password in passwords]
+
+
+class Onboarding:
+    """
+    Membuat banyak akun jury/committee sekaligus pada event: validasi
+    semua baris, password di-hash paralel di luar transaksi, lalu user,
+    profil jury/committee dan relasi event dibuat dengan bulk_create dalam
+    satu transaksi. Kuota event dicek sekali. confirm=True menambahkan
+    akun jury/committee yang sudah ada (username sama) ke event ini,
+    sama seperti ?confirm=1 pada JuryList/CommitteeList.
+    """
+
+    def __init__(self, event_id, role, confirm=False, workers=None):
+        self.event_id = event_id
+        self.role = role
+        self.confirm = confirm
+        self.workers = workers
+        self.created = 0
+        self.linked = 0
+        self.failed = 0
+        self.errors = []
+        self.accounts = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+    def summary(self):
+        return {"created": self.created, "linked": self.linked, "failed": self.failed,
+                "errors": sorted(self.errors, key=lambda error: error["line"]), "accounts": self.accounts}
+
+    def validate(self, rows):
+        """
+        Mengembalikan (baris akun baru [(line, data)], profil yang sudah ada
+        untuk ditambahkan ke event [(line, profil id, username)])
+        """
+        valid = {}
+        emails = set()
+        for line, row in rows:
+            if isinstance(row, str):
+                self.error(line, row)
+                continue
+            serializer = OnboardingUserSerializer(data=row)
+            if not serializer.is_valid():
+                self.error(line, get_error_message(serializer.errors))
+                continue
+            data = serializer.validated_data
+            if data['username'] in valid:
+                self.error(line, 'Username duplikat di dalam data')
+                continue
+            valid[data['username']] = (line, data)
+
+        model, field, _, _ = ROLES[self.role]
+        existing = User.objects.filter(username__in=list(valid)).values_list('username', '%s__pk' % model._meta.model_name)
+        linked = []
+        in_event = set(getattr(Event, field).through.objects.filter(event_id=self.event_id).values_list(
+            '%s_id' % model._meta.model_name, flat=True))
+        for username, profile_id in existing:
+            line, _ = valid.pop(username)
+            if not self.confirm or profile_id is None:
+                self.error(line, 'Username sudah terdaftar')
+            elif profile_id in in_event:
+                self.error(line, 'Akun sudah terdaftar pada event ini')
+            else:
+                linked.append((line, profile_id, username))
+
+        # email dibandingkan tanpa membedakan huruf besar/kecil, terhadap
+        # user yang sudah ada dan baris lain di batch ini
+        taken = set(User.objects.annotate(email_lower=Lower('email'))
+                    .filter(email_lower__in=[data['email'].lower() for _, data in valid.values()])
+                    .values_list('email_lower', flat=True))
+        new = []
+        for line, data in valid.values():
+            email = data['email'].lower()
+            if email in taken or email in emails:
+                self.error(line, 'Email sudah terdaftar')
+                continue
+            emails.add(email)
+            new.append((line, data))
+        return new, linked
+
+    def run(self, rows):
+        if not Event.objects.filter(pk=self.event_id).exists():
+            raise Event.DoesNotExist
+        new, linked = self.validate(list(rows))
+        if not new and not linked:
+            return self.summary()
+
+        passwords = hash_passwords([data['password'] for _, data in new], self.workers)
+        created, failed, errors = self.created, self.failed, len(self.errors)
+        try:
+            self.save(new, passwords, linked)
+        except IntegrityError:
+            # username/email yang sama didaftarkan bersamaan oleh request lain
+            self.created, self.linked, self.failed = created, 0, failed
+            del self.errors[errors:]
+            self.accounts = []
+            for line, _ in new:
+                self.error(line, 'Gagal menyimpan batch, username atau email bentrok')
+            for line, _, _ in linked:
+                self.error(line, 'Gagal menyimpan batch, username atau email bentrok')
+        return self.summary()
+
+    @transaction.atomic
+    def save(self, new, passwords, linked):
+        model, field, flag, total = ROLES[self.role]
+        remaining = counters.reserve_up_to(self.event_id, self.role, len(new) + len(linked))
+        # akun yang sudah ada didahulukan karena tidak perlu dibuat
+        for line, _, _ in linked[remaining:]:
+            self.error(line, FULL_MESSAGES[self.role])
+        linked = linked[:remaining]
+        remaining -= len(linked)
+        for line, _ in new[remaining:]:
+            self.error(line, FULL_MESSAGES[self.role])
+        new, passwords = new[:remaining], passwords[:remaining]
+
+        users = User.objects.bulk_create([
+            User(password=password, **{flag: True},
+                 **{key: value for key, value in data.items() if key not in ('password', 'institute')})
+            for (_, data), password in zip(new, passwords)
+        ])
+        if any(user.pk is None for user in users):
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        extra = [{'institute': data['institute']} if self.role == 'jury' else {} for _, data in new]
+        profiles = model.objects.bulk_create([model(user_id=user.pk, **kwargs) for user, kwargs in zip(users, extra)])
+        if any(profile.pk is None for profile in profiles):
+            ids = dict(model.objects.filter(user_id__in=[user.pk for user in users]).values_list('user_id', 'pk'))
+            for profile in profiles:
+                profile.pk = ids[profile.user_id]
+
+        through = getattr(Event, field).through
+        column = '%s_id' % model._meta.model_name
+        profile_ids = [profile.pk for profile in profiles] + [profile_id for _, profile_id, _ in linked]
+        through.objects.bulk_create([through(event_id=self.event_id, **{column: pk}) for pk in profile_ids])
+
+        if profiles:
+            counters.increment(total, len(profiles))
+        if profile_ids:
+            response_cache.invalidate([self.event_id])
+        self.created += len(profiles)
+        self.linked += len(linked)
+        self.accounts += [{"id": profile.pk, "username": user.username} for profile, user in zip(profiles, users)]
+        self.accounts += [{"id": profile_id, "username": username} for _, profile_id, username in linked]
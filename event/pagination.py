@@ -0,0 +1,137 @@
+import base64
+import json
+import math
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import leaderboard
+from .exception_handler import get_response
+
+
+def is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_number(value):
+    return is_integer(value) or (isinstance(value, float) and math.isfinite(value))
+
+
+class EnvelopeCursorPagination(CursorPagination):
+    """
+    Cursor pagination tanpa COUNT(*), hasilnya dibungkus format get_response.
+    Urutan diambil dari atribut `ordering` pada view, default pk.
+    """
+    page_size_query_param = 'limit'
+    max_page_size = 500
+    ordering = 'pk'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def get_paginated_response(self, data):
+        return Response(get_response(message="Success", data={
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }, status=True))
+
+
+class LeaderboardPagination(BasePagination):
+    """
+    Keyset pagination pada (total_score per event, id) untuk leaderboard.
+    Tidak ada OFFSET, halaman berikutnya dimulai tepat setelah baris terakhir.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Cursor tidak valid'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        if position is None:
+            reverse = False
+            rows = queryset.order_by(*leaderboard.ORDERING)
+        else:
+            reverse, score, pk = position
+            if reverse:
+                rows = leaderboard.before(queryset, score, pk).order_by(*leaderboard.REVERSE_ORDERING)
+            else:
+                rows = leaderboard.after(queryset, score, pk).order_by(*leaderboard.ORDERING)
+
+        rows = list(rows[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if position is None:
+            start = 1
+        elif rows:
+            start = leaderboard.rank_of(queryset, rows[0])
+        else:
+            start = 0
+        self.page = leaderboard.assign_ranks(rows, start)
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None and start > 1
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            reverse, score, pk = data['r'], data['s'], data['i']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        # nilai cursor dipakai langsung di filter keyset, tipe lain ditolak
+        if not (is_number(score) or score is None) or not is_integer(pk) or not is_integer(reverse):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), score, pk
+
+    def encode_cursor(self, row, reverse):
+        data = json.dumps({'r': int(reverse), 's': leaderboard.score_of(row), 'i': leaderboard.pk_of(row)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(get_response(message="Success", data={
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }, status=True))
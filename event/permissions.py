@@ -1,31 +1,29 @@
 from rest_framework import permissions
-from .models import Jury
-from django.core.exceptions import ObjectDoesNotExist
+from .access import get_access
 
 class IsSameJuryAndParticipantsOrReadOnly(permissions.BasePermission):
-
+    """
+    Allows writes only to admin, committee, or a jury assigned to the participant.
+    """
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        try:
-            juri = Jury.objects.get(participants=obj)
-            return True
-        except ObjectDoesNotExist:
-            return False
+        access = get_access(request)
+        return access.is_admin_or_committee or access.can_score(obj.pk)
 
 class IsAdminUser(permissions.BasePermission):
     """
     Allows access only to admin users.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_staff)
+        return get_access(request).is_staff
 
 class IsCommittee(permissions.BasePermission):
     """
     Allows access only to committee.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_committee)
+        return get_access(request).is_committee
 
 class IsAdminOrCommitteeOrReadOnly(permissions.BasePermission):
     """
@@ -35,14 +33,21 @@ class IsAdminOrCommitteeOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
             
-        return bool(request.user and request.user.is_staff) or bool(request.user and request.user.is_committee)
+        return get_access(request).is_admin_or_committee
+
+class IsAdminOrCommittee(permissions.BasePermission):
+    """
+    Allows access only to admin or committee users, for every method.
+    """
+    def has_permission(self, request, view):
+        return get_access(request).is_admin_or_committee
 
 class IsJury(permissions.BasePermission):
     """
     Allows access only to jury.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_jury)
+        return get_access(request).is_jury
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
 
@@ -50,4 +55,4 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        return obj.user == request.user
\ No newline at end of file
+        return obj.user == request.user
@@ -0,0 +1,49 @@
+from django.db import connection
+from django.db.models import ManyToManyField, Prefetch, Subquery
+from django.db.models.expressions import RawSQL
+from rest_framework import serializers
+
+
+def capped(queryset, field, limit):
+    """
+    Membatasi queryset prefetch relasi m2m `field` sebanyak `limit` item
+    per parent, urut pk. LIMIT per parent memakai subquery berkorelasi
+    (seperti dashboard.leaders) terhadap tabel penghubung yang di-join oleh
+    prefetch_related, nama tabelnya sama dengan yang dipakai Django untuk
+    _prefetch_related_val_*.
+    """
+    qn = connection.ops.quote_name
+    through = field.remote_field.through
+    parent, child = field.m2m_field_name(), field.m2m_reverse_field_name()
+    outer = RawSQL('%s.%s' % (qn(through._meta.db_table), qn(field.m2m_column_name())), ())
+    top = through._default_manager.filter(**{parent: outer}).order_by(child).values(child)[:limit]
+    return queryset.filter(pk__in=Subquery(top)).order_by('pk')
+
+
+def eager_load(queryset, serializer, prefix=''):
+    """
+    Menambahkan select_related/prefetch_related ke queryset berdasarkan
+    pohon serializer, sehingga jumlah query tetap berapapun jumlah relasinya.
+    """
+    serializer = getattr(serializer, 'child', serializer)
+
+    for related in getattr(serializer, 'select_related_fields', ()):
+        queryset = queryset.select_related(prefix + related)
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+
+        if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+            child = field.child
+            nested = eager_load(child.Meta.model._default_manager.all(), child)
+            relation = serializer.Meta.model._meta.get_field(field.source)
+            limit = getattr(field, 'limit', None)
+            if limit is not None and isinstance(relation, ManyToManyField):
+                nested = capped(nested, relation, limit)
+            queryset = queryset.prefetch_related(Prefetch(prefix + field.source, queryset=nested))
+        elif isinstance(field, serializers.ModelSerializer):
+            path = prefix + field.source
+            queryset = eager_load(queryset.select_related(path), field, path + '__')
+
+    return queryset
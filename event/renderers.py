@@ -0,0 +1,59 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+# Datetime/Decimal/UUID/lazy string diteruskan ke encoder DRF agar format
+# output sama persis dengan JSONRenderer bawaan
+OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+_default = encoders.JSONEncoder().default
+
+
+def dumps(data):
+    """
+    Encode ke bytes JSON ringkas. Memakai orjson jika terpasang,
+    selain itu json stdlib dengan encoder DRF.
+    """
+    if orjson is None:
+        return renderers.JSONRenderer().render(data)
+    return orjson.dumps(data, default=_default, option=OPTIONS)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer dengan backend orjson. Request dengan indent (browsable
+    API, ?indent) atau setting UNICODE_JSON/COMPACT_JSON non-default
+    tetap memakai renderer bawaan DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or not api_settings.UNICODE_JSON or not api_settings.COMPACT_JSON
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        # sama seperti DRF, U+2028/U+2029 di-escape agar aman disisipkan ke <script>
+        return dumps(data).replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSONParser dengan backend orjson (hanya untuk body UTF-8)
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8').lower().replace('_', '-')
+        if orjson is None or encoding not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % exc)
@@ -0,0 +1,122 @@
+import asyncio
+import random
+import time
+import types
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import permissions
+
+# alias database baca untuk request yang sedang berjalan, None = primary
+_read_alias = ContextVar('event_read_alias', default=None)
+
+STICKY_COOKIE = 'event-primary'
+
+
+def read_aliases():
+    return list(settings.EVENT_READ_DATABASES)
+
+
+def current_alias():
+    return _read_alias.get()
+
+
+def wants_replica(view_func):
+    """
+    Hanya view app event, view dapat menolak dengan atribut read_replica = False
+    """
+    target = getattr(view_func, 'cls', view_func)
+    return target.__module__.startswith('event.') and getattr(target, 'read_replica', True)
+
+
+def is_sticky(request):
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadReplicaRouter:
+    """
+    Query baca diarahkan ke alias yang dipilih ReadReplicaMiddleware untuk
+    request tsb., semua query tulis dan query di dalam transaksi ke primary
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # transaksi harus membaca tulisannya sendiri
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # instance yang dibaca dari replica tetap disimpan ke primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *read_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReadReplicaMiddleware:
+    """
+    Request GET/HEAD/OPTIONS ke view app event membaca dari salah satu
+    EVENT_READ_DATABASES. Setelah client berhasil menulis, cookie
+    event-primary membuat request client tsb. membaca dari primary selama
+    EVENT_STICKY_PRIMARY_SECONDS supaya perubahannya sendiri langsung terlihat
+    meskipun replica tertinggal.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # process_view harus berjalan di context request (bukan di thread
+            # sync) agar alias yang dipilih terlihat oleh view
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.async_hook(self.process_view)
+
+    def async_hook(self, method):
+        # Django membaca __self__ dari hook, jadi hasilnya tetap bound method
+        async def hook(self, *args):
+            return method(*args)
+        return types.MethodType(hook, self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.set(None)
+        return self.set_sticky(request, response)
+
+    async def __acall__(self, request):
+        _read_alias.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.set(None)
+        return self.set_sticky(request, response)
+
+    def set_sticky(self, request, response):
+        if (read_aliases() and request.method not in permissions.SAFE_METHODS
+                and response.status_code < 400):
+            seconds = settings.EVENT_STICKY_PRIMARY_SECONDS
+            response.set_cookie(STICKY_COOKIE, '%.3f' % (time.time() + seconds), max_age=seconds,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        aliases = read_aliases()
+        if (aliases and request.method in permissions.SAFE_METHODS and wants_replica(view_func)
+                and not is_sticky(request)):
+            _read_alias.set(random.choice(aliases))
@@ -0,0 +1,110 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import quote_etag
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from .models import Event
+
+
+def get_cache():
+    return caches[settings.EVENT_CACHE_ALIAS]
+
+
+def generation_key(eid):
+    return 'event-generation:%s' % eid
+
+
+def get_generation(eid):
+    """
+    Versi data event. Nilai awal berbasis waktu supaya counter yang
+    hilang dari cache tidak pernah kembali ke versi lama.
+    """
+    cache = get_cache()
+    key = generation_key(eid)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key, 0)
+    return generation
+
+
+def bump(eid):
+    cache = get_cache()
+    try:
+        cache.incr(generation_key(eid))
+    except ValueError:
+        cache.set(generation_key(eid), time.time_ns(), timeout=None)
+
+
+def invalidate(event_ids):
+    """
+    Menaikkan generation setiap event setelah transaksi commit
+    """
+    event_ids = set(event_ids)
+
+    def run():
+        for eid in event_ids:
+            bump(eid)
+    transaction.on_commit(run)
+
+
+def invalidate_participants(participant_ids):
+    through = Event.peserta.through.objects.filter(participants_id__in=list(participant_ids))
+    invalidate(through.values_list('event_id', flat=True).distinct())
+
+
+def invalidate_juries(jury_ids):
+    through = Event.juri.through.objects.filter(jury_id__in=list(jury_ids))
+    invalidate(through.values_list('event_id', flat=True).distinct())
+
+
+def invalidate_committees(committee_ids):
+    through = Event.panitia.through.objects.filter(committee_id__in=list(committee_ids))
+    invalidate(through.values_list('event_id', flat=True).distinct())
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache untuk GET per event. Key memakai generation event
+    sehingga setiap penulisan otomatis membuat cache lama tidak terpakai.
+    Response membawa ETag, If-None-Match yang cocok dijawab 304.
+    """
+    cache_event_kwarg = 'eid'
+    # cache miss mengisi entry yang dipakai semua client, tidak boleh diisi
+    # dari replica yang tertinggal (lihat replicas.ReadReplicaMiddleware)
+    read_replica = False
+
+    def get_cache_key(self, request, generation):
+        eid = self.kwargs[self.cache_event_kwarg]
+        raw = '%s|%s|%s' % (request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+                            request.accepted_renderer.format)
+        digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+        return 'event-response:%s:%s:%s:%s' % (self.__class__.__name__, eid, generation, digest)
+
+    def get(self, request, *args, **kwargs):
+        generation = get_generation(self.kwargs[self.cache_event_kwarg])
+        key = self.get_cache_key(request, generation)
+        etag = quote_etag(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=304)
+        else:
+            cache = get_cache()
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response.data, settings.EVENT_CACHE_TIMEOUT)
+                else:
+                    return response
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
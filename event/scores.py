@@ -0,0 +1,122 @@
+from numbers import Number
+
+from django.db.models import Exists, OuterRef, Subquery, Sum
+
+from . import ledger
+from .models import Event, EventParticipant, Jury, Participants, Score
+
+CRITERION_MAX_LENGTH = 255
+
+
+def flatten(score_field, prefix=''):
+    """
+    Mengubah score_field menjadi pasangan (kriteria, nilai).
+    Dict bersarang digabung dengan titik, nilai yang bukan angka diabaikan.
+    """
+    if not isinstance(score_field, dict):
+        return []
+    items = []
+    for key, value in score_field.items():
+        criterion = '%s%s' % (prefix, key)
+        if isinstance(value, dict):
+            items += flatten(value, criterion + '.')
+        elif isinstance(value, Number) and not isinstance(value, bool):
+            items.append((criterion, float(value)))
+    return items
+
+
+def build_scores(participant_id, jury_id, score_field):
+    return [
+        Score(participant_id=participant_id, jury_id=jury_id, criterion=criterion, value=value)
+        for criterion, value in flatten(score_field)
+    ]
+
+
+def total_score_subquery(participant_ref=OuterRef('pk')):
+    totals = (Score.objects.filter(participant=participant_ref)
+              .order_by().values('participant').annotate(total=Sum('value')).values('total'))
+    return Subquery(totals)
+
+
+def update_totals(participant_ids):
+    """
+    total_score dihitung ulang oleh database dari tabel Score. Total per
+    event (EventParticipant) diperbarui oleh ledger.record
+    """
+    return Participants.objects.filter(pk__in=participant_ids).update(total_score=total_score_subquery())
+
+
+def sync_event_scores(participant_ids):
+    """
+    Menyalin total_score peserta ke tabel relasi event (EventParticipant)
+    tanpa bobot rubric, untuk data yang tidak dibuat lewat ledger
+    """
+    totals = Participants.objects.filter(pk=OuterRef('participants_id')).values('total_score')
+    return EventParticipant.objects.filter(participants_id__in=participant_ids).update(total_score=Subquery(totals))
+
+
+def replace_scores(jury_id, score_fields):
+    """
+    Mengganti seluruh nilai jury untuk setiap peserta pada score_fields
+    ({participant_id: score_field}), mencatat selisihnya di ledger,
+    lalu menghitung ulang total_score.
+    """
+    participant_ids = list(score_fields)
+    old = Score.objects.filter(jury_id=jury_id, participant_id__in=participant_ids)
+    previous = {}
+    for participant_id, criterion, value in old.values_list('participant_id', 'criterion', 'value'):
+        previous.setdefault(participant_id, []).append((criterion, value))
+    old.delete()
+
+    rows = []
+    changes = {}
+    for participant_id, score_field in score_fields.items():
+        built = build_scores(participant_id, jury_id, score_field)
+        changes.update(ledger.changes_between(participant_id, previous.get(participant_id, ()),
+                                              [(row.criterion, row.value) for row in built]))
+        rows += built
+    Score.objects.bulk_create(rows, batch_size=1000)
+    update_totals(participant_ids)
+    ledger.record(jury_id, changes, participant_ids)
+
+
+def remove_jury_scores(jury):
+    """
+    Menghapus jury beserta nilainya (cascade) dan mencatat pembatalan
+    nilai tsb. di ledger. Mengembalikan id peserta yang terdampak.
+    """
+    previous = {}
+    for participant_id, criterion, value in jury.scores.values_list('participant_id', 'criterion', 'value'):
+        previous.setdefault(participant_id, []).append((criterion, value))
+    jury.delete()
+
+    changes = {}
+    for participant_id, rows in previous.items():
+        changes.update(ledger.changes_between(participant_id, rows, ()))
+    update_totals(list(previous))
+    ledger.record(None, changes, list(previous))
+    return list(previous)
+
+
+def is_assigned(event_id, jury_id, participant_id):
+    """
+    True jika jury ada di event dan diassign ke peserta, dalam satu query
+    """
+    in_event = Event.juri.through.objects.filter(event_id=event_id, jury_id=OuterRef('jury_id'))
+    return (Jury.participants.through.objects.filter(jury_id=jury_id, participants_id=participant_id)
+            .filter(Exists(in_event)).exists())
+
+
+def save_scores(participant, jury_id, score_field):
+    replace_scores(jury_id, {participant.pk: score_field})
+    participant.refresh_from_db(fields=['total_score'])
+
+
+def validate_score_field(score_field):
+    if score_field is None:
+        return
+    if not isinstance(score_field, dict):
+        raise ValueError('score_field harus berupa object')
+    for criterion, _ in flatten(score_field):
+        if len(criterion) > CRITERION_MAX_LENGTH:
+            raise ValueError('Nama kriteria terlalu panjang')
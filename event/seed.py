@@ -0,0 +1,159 @@
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from . import counters
+from .models import Committee, Event, EventParticipant, Jury, Participants, Score, ScoreEntry, User
+from .scores import flatten
+
+CRITERIA = ('teknik', 'vokal', 'kreativitas')
+STYLE_CRITERIA = ('kostum', 'ekspresi')
+NOTES = ('rapi', 'perlu latihan', 'sangat baik', 'tempo kurang stabil', '')
+INSTITUTES = ('Universitas Indonesia', 'ITB', 'UGM', 'ITS', 'Unpad', 'Telkom University', 'SMA 1', 'SMK 2')
+LEVELS = ('kota', 'provinsi', 'nasional', 'internasional')
+
+
+def split(total, parts):
+    """
+    Membagi total ke beberapa bagian serata mungkin
+    """
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+class Seeder:
+    """
+    Membuat dataset sintetis yang deterministik (hasil sama untuk seed sama).
+    Setiap event punya peserta, jury dan committee sendiri; tiap peserta
+    dinilai oleh `juries_per_participant` jury dari event-nya.
+    """
+
+    def __init__(self, events=500, participants=200000, juries=5000, committees=1000,
+                 juries_per_participant=2, scored=0.8, seed=42, prefix='seed',
+                 password='seedpassword', batch_size=5000, stdout=None):
+        self.events = events
+        self.participants = participants
+        self.juries = juries
+        self.committees = committees
+        self.juries_per_participant = juries_per_participant
+        self.scored = scored
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.password = make_password(password)
+        self.batch_size = batch_size
+        self.stdout = stdout
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def username(self, role, index):
+        return '%s-%s-%s' % (self.prefix, role, index)
+
+    def run(self):
+        if User.objects.filter(username=self.username('admin', 0)).exists():
+            raise ValueError('Data dengan prefix %s sudah ada' % self.prefix)
+
+        admin = User.objects.create(username=self.username('admin', 0), password=self.password,
+                                    email='%s-admin@example.com' % self.prefix, is_staff=True)
+        participant_counts = split(self.participants, self.events)
+        jury_counts = split(self.juries, self.events)
+        committee_counts = split(self.committees, self.events)
+
+        summary = {'events': 0, 'participants': 0, 'juries': 0, 'committees': 0, 'scores': 0}
+        offsets = {'participants': 0, 'juries': 0, 'committees': 0}
+        for index in range(self.events):
+            with transaction.atomic():
+                self.seed_event(admin, index, participant_counts[index], jury_counts[index],
+                                committee_counts[index], offsets, summary)
+            if (index + 1) % 50 == 0 or index + 1 == self.events:
+                self.log('%d/%d event' % (index + 1, self.events))
+
+        counters.rebuild()
+        return summary
+
+    def seed_event(self, admin, index, n_participants, n_juries, n_committees, offsets, summary):
+        rnd = self.random
+        start = datetime.date(2021, 1, 1) + datetime.timedelta(days=rnd.randrange(365))
+        ev = Event.objects.create(
+            user=admin, title='%s event %s' % (self.prefix, index),
+            start_date=start, end_date=start + datetime.timedelta(days=rnd.randrange(1, 4)),
+            start_time=datetime.time(8, 0), end_time=datetime.time(17, 0),
+            max_participants=max(n_participants * 2, 10), num_jury=max(n_juries * 2, 5),
+            num_committee=max(n_committees * 2, 5), event_level=rnd.choice(LEVELS),
+        )
+
+        juries = self.create_staff(Jury, 'jury', n_juries, offsets, is_jury=True)
+        committees = self.create_staff(Committee, 'committee', n_committees, offsets, is_committee=True)
+        Event.juri.through.objects.bulk_create([Event.juri.through(event_id=ev.pk, jury_id=j.pk) for j in juries])
+        Event.panitia.through.objects.bulk_create([
+            Event.panitia.through(event_id=ev.pk, committee_id=c.pk) for c in committees
+        ])
+
+        peserta = []
+        for i in range(n_participants):
+            number = offsets['participants'] + i
+            peserta.append(Participants(
+                code='%s-%s' % (self.prefix, number), full_name='Peserta %s' % number,
+                age=rnd.randrange(15, 40), email='%s-p%s@example.com' % (self.prefix, number),
+                institute=rnd.choice(INSTITUTES),
+            ))
+        offsets['participants'] += n_participants
+
+        for p in peserta:
+            assigned = rnd.sample(juries, min(self.juries_per_participant, len(juries)))
+            p.assigned = assigned
+            if assigned and rnd.random() < self.scored:
+                p.score_field = self.score_field()
+                p.total_score = 0.0
+
+        Participants.objects.bulk_create(peserta, batch_size=self.batch_size)
+        links, scores = [], []
+        for p in peserta:
+            links += [Jury.participants.through(jury_id=j.pk, participants_id=p.pk) for j in p.assigned]
+            if p.score_field is None:
+                continue
+            for j in p.assigned:
+                # score_field peserta menyimpan payload dari jury terakhir
+                field = self.score_field() if j is not p.assigned[-1] else p.score_field
+                rows = [Score(participant_id=p.pk, jury_id=j.pk, criterion=c, value=v)
+                        for c, v in flatten(field)]
+                p.total_score += sum(row.value for row in rows)
+                scores += rows
+        Jury.participants.through.objects.bulk_create(links, batch_size=self.batch_size)
+        Score.objects.bulk_create(scores, batch_size=self.batch_size)
+        Participants.objects.bulk_update([p for p in peserta if p.score_field is not None], ['total_score'],
+                                         batch_size=self.batch_size)
+        EventParticipant.objects.bulk_create([
+            EventParticipant(event_id=ev.pk, participants_id=p.pk, total_score=p.total_score) for p in peserta
+        ], batch_size=self.batch_size)
+        ScoreEntry.objects.bulk_create([
+            ScoreEntry(event_id=ev.pk, participant_id=row.participant_id, jury_id=row.jury_id,
+                       criterion=row.criterion, delta=row.value, count=1)
+            for row in scores
+        ], batch_size=self.batch_size)
+
+        summary['events'] += 1
+        summary['participants'] += n_participants
+        summary['juries'] += n_juries
+        summary['committees'] += n_committees
+        summary['scores'] += len(scores)
+
+    def create_staff(self, model, role, count, offsets, **flags):
+        key = 'juries' if role == 'jury' else 'committees'
+        users = User.objects.bulk_create([
+            User(username=self.username(role, offsets[key] + i), password=self.password,
+                 email='%s-%s-%s@example.com' % (self.prefix, role, offsets[key] + i), **flags)
+            for i in range(count)
+        ], batch_size=self.batch_size)
+        offsets[key] += count
+        return model.objects.bulk_create([model(user=u) for u in users], batch_size=self.batch_size)
+
+    def score_field(self):
+        rnd = self.random
+        field = {c: rnd.randrange(50, 101) for c in CRITERIA}
+        field['gaya'] = {c: rnd.randrange(1, 11) for c in STYLE_CRITERIA}
+        field['catatan'] = rnd.choice(NOTES)
+        return field
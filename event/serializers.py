@@ -1,11 +1,79 @@
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 from django.conf import settings
 from rest_framework.validators import UniqueValidator
+from rest_framework.settings import api_settings
+from rest_framework import ISO_8601
 from django.contrib.auth.password_validation import validate_password
-from django.core.exceptions import ObjectDoesNotExist
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction
 from .models import Event, Committee, Jury, Participants, User
 from .exception_handler import get_response
-from .permissions import IsSameJuryAndParticipantsOrReadOnly
+from . import access, counters, leaderboard, live, response_cache, scores
+from .access import get_access
+
+def parse_paths(value):
+    """
+    "id,juri.participants" -> {'id': {}, 'juri': {'participants': {}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in filter(None, (p.strip() for p in path.split('.'))):
+            node = node.setdefault(part, {})
+    return tree
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldset dari query params pada request GET:
+    ?fields=id,title,juri.id memilih field yang dikirim,
+    ?expand=juri,juri.participants menyertakan relasi di `expandable_fields`.
+    Tanpa ?expand, relasi yang disertakan mengikuti `default_expand` pada
+    view (None berarti semua). Field yang dibuang tidak ikut di-prefetch
+    oleh eager_load karena pemangkasan terjadi di get_fields.
+    """
+    expandable_fields = ()
+    _prune = None
+
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_prune(self):
+        if self._prune is not None:
+            return self._prune
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS or not self.is_root():
+            return None, None
+        params = request.query_params
+        only = parse_paths(params['fields']) if params.get('fields') else None
+        if 'expand' in params:
+            expand = parse_paths(params['expand'])
+        else:
+            default = getattr(self.context.get('view'), 'default_expand', None)
+            expand = None if default is None else parse_paths(','.join(default))
+        return only, expand
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = self.get_prune()
+        for name in list(fields):
+            if only is not None and name not in only:
+                del fields[name]
+            elif (name in self.expandable_fields and expand is not None and name not in expand
+                  and (only is None or name not in only)):
+                del fields[name]
+
+        for name, field in fields.items():
+            child = getattr(field, 'child', field)
+            if isinstance(child, DynamicFieldsMixin):
+                child._prune = (
+                    (only[name] or None) if only is not None else None,
+                    expand.get(name, {}) if expand is not None else None,
+                )
+        return fields
 
 class CreateUser:
     def __init__(self, user_data):
@@ -29,7 +97,7 @@ class CreateUser:
             raise serializers.ValidationError(get_response(message="username dan password harus diisi", status=False, status_code=400))
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     email = serializers.EmailField(
             required=True,
             validators=[UniqueValidator(queryset=User.objects.all())]
@@ -56,28 +124,32 @@ class UserSerializer(serializers.ModelSerializer):
 
         return user.create_user()
 
-class ParticipantsSerializer(serializers.ModelSerializer):
+class ParticipantsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     score_field = serializers.JSONField(read_only=True)
 
     class Meta:
         fields = ('id', 'code', 'full_name','age','email','institute','total_score', 'score_field','photo_url', 'created_at', 'updated_at')
         model = Participants
+        read_only_fields = ('total_score',)
     
+    @transaction.atomic
     def create(self, validated_data):
         eid = self.context.get("eid", "")
         if eid:
             ev = Event.objects.get(pk=eid)
-            p_count = Participants.objects.filter(event__pk=eid).count()
-            if p_count < ev.max_participants:
+            if counters.reserve(eid, 'participants'):
                 com = Participants.objects.create(**validated_data)
                 com.save()
                 jid = self.context.get("jid", "")
                 ev.peserta.add(com)
-                ev.save()
                 if jid:
                     ju = Jury.objects.get(pk=jid)
                     ju.participants.add(com)
                     ju.save()
+                    access.invalidate_users([ju.user_id])
+                    response_cache.invalidate_juries([jid])
+                counters.increment(counters.TOTAL_PARTICIPANTS)
+                response_cache.invalidate([eid])
             else:
                 raise serializers.ValidationError(get_response(message="Jumlah peserta sudah penuh", status=False, status_code=400))
         else:
@@ -89,12 +161,199 @@ class ParticipantsSerializer(serializers.ModelSerializer):
 
         return repr
 
+class ParticipantImportSerializer(serializers.ModelSerializer):
+    """
+    Validasi baris import. Keunikan code dicek per batch oleh importer
+    """
+
+    class Meta:
+        fields = ('code', 'full_name', 'age', 'email', 'institute', 'photo_url')
+        model = Participants
+        extra_kwargs = {'code': {'validators': []}}
+
+class OnboardingUserSerializer(serializers.ModelSerializer):
+    """
+    Validasi baris onboarding jury/committee. Keunikan username dan email
+    (terhadap user yang sudah ada dan baris lain di batch) dicek sekaligus
+    oleh onboarding.Onboarding
+    """
+    email = serializers.EmailField(required=True)
+    password = serializers.CharField(write_only=True, required=True)
+    institute = serializers.CharField(max_length=512, required=False, allow_blank=True, default='')
+
+    class Meta:
+        fields = ('username', 'email', 'password', 'first_name', 'last_name', 'phone_number', 'address', 'city',
+                  'state', 'photo_url', 'institute')
+        model = User
+        extra_kwargs = {'username': {'validators': [UnicodeUsernameValidator()]}}
+
+    def validate(self, attrs):
+        user = User(**{key: value for key, value in attrs.items() if key not in ('password', 'institute')})
+        validate_password(attrs['password'], user)
+        return attrs
+
+class CappedListSerializer(serializers.ListSerializer):
+    """
+    Daftar bersarang dibatasi sebanyak EVENT_NESTED_LIST_LIMIT item urut pk,
+    daftar lengkapnya diambil dari endpoint list yang sudah dipaginasi.
+    eager_load memasang batas yang sama di query prefetch.
+    """
+    @property
+    def limit(self):
+        return settings.EVENT_NESTED_LIST_LIMIT
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return super().to_representation(iterable[:self.limit])
+
+class NestedParticipantsSerializer(ParticipantsSerializer):
+
+    class Meta(ParticipantsSerializer.Meta):
+        list_serializer_class = CappedListSerializer
+
+def iso_datetime(field):
+    """
+    Versi cepat DateTimeField.to_representation untuk format ISO 8601:
+    zona waktu dibaca sekali, bukan per nilai
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    tz = getattr(field, 'timezone', field.default_timezone())
+    if output_format is None or output_format.lower() != ISO_8601 or tz is None:
+        return field.to_representation
+
+    def convert(value):
+        if isinstance(value, str) or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+class ValuesListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        if isinstance(data, models.Manager):
+            data = data.all()
+        if isinstance(data, models.QuerySet) and not data._fields and data._iterable_class is models.query.ModelIterable:
+            data = self.child.values(data)
+        to_representation = self.child.to_representation
+        return [to_representation(row) for row in data]
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Serializer baca-saja yang memetakan baris queryset.values() ke bentuk
+    output yang sama dengan `model_serializer_class`, tanpa membuat
+    instance model dan tanpa memanggil to_representation per field
+    kecuali untuk tipe yang memang perlu dikonversi (mis. datetime).
+    Field yang didukung hanya field model biasa (source tanpa '*').
+    """
+    model_serializer_class = None
+
+    # field yang nilainya dari DB sudah sama dengan hasil to_representation
+    passthrough = (serializers.IntegerField, serializers.FloatField, serializers.CharField,
+                   serializers.BooleanField)
+
+    class Meta:
+        list_serializer_class = ValuesListSerializer
+
+    def get_columns(self):
+        reference = self.model_serializer_class(context=self.context)
+        columns = []
+        for name, field in reference.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+                raise ImproperlyConfigured('%s tidak bisa dibaca dari values()' % name)
+            convert = None
+            if isinstance(field, serializers.JSONField):
+                convert = field.to_representation if field.binary else None
+            elif isinstance(field, serializers.DateTimeField):
+                convert = iso_datetime(field)
+            elif not isinstance(field, self.passthrough):
+                convert = field.to_representation
+            columns.append((name, field.source.replace('.', '__'), convert))
+        return columns
+
+    @property
+    def columns(self):
+        if not hasattr(self, '_columns'):
+            self._columns = self.get_columns()
+        return self._columns
+
+    def values(self, queryset):
+        """
+        Kolom yang diambil: pk, source setiap field, dan semua annotation
+        queryset (dipakai pagination, mis. nilai leaderboard)
+        """
+        sources = dict.fromkeys(['pk'] + [source for _, source, _ in self.columns] + list(queryset.query.annotations))
+        return queryset.values(*sources)
+
+    def to_representation(self, row):
+        out = {}
+        for name, source, convert in self.columns:
+            value = row[source]
+            out[name] = value if value is None or convert is None else convert(value)
+        return out
+
+class EventParticipantsSerializer(ParticipantsSerializer):
+    """
+    Peserta pada daftar per event. total_score adalah total berbobot rubric
+    event (anotasi leaderboard.SCORE), nilai yang sama dengan urutan ranking.
+    Queryset harus dari leaderboard.event_participants.
+    """
+    total_score = serializers.FloatField(source=leaderboard.SCORE, read_only=True)
+
+class ParticipantsValuesSerializer(ValuesSerializer):
+    model_serializer_class = EventParticipantsSerializer
+
+class LeaderboardSerializer(EventParticipantsSerializer):
+    rank = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        fields = ('rank',) + ParticipantsSerializer.Meta.fields
+        model = Participants
+
 class ParticipantsJurySerializer(ParticipantsSerializer):
     score_field = serializers.JSONField(read_only=False)
 
     class Meta:
         fields = ('id', 'code', 'full_name','age','email','institute','total_score','score_field','photo_url', 'created_at', 'updated_at')
         model = Participants
+        read_only_fields = ('total_score',)
+
+    def validate_score_field(self, value):
+        try:
+            scores.validate_score_field(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def get_jury_id(self):
+        """
+        Jury pemberi nilai: jury dari URL jika milik pemanggil atau pemanggil
+        admin/committee, selain itu jury milik pemanggil yang diassign ke peserta
+        """
+        caller = get_access(self.context["request"])
+        jid = self.context["view"].kwargs.get('jid')
+        if caller.is_admin_or_committee or caller.can_score(self.instance.pk, jid):
+            return jid
+        return caller.jury_for(self.instance.pk)
+
+    def validate(self, attrs):
+        if 'score_field' in attrs and self.instance is not None:
+            eid = self.context["view"].kwargs.get('eid')
+            if not scores.is_assigned(eid, self.get_jury_id(), self.instance.pk):
+                raise serializers.ValidationError('Jury tidak valid untuk peserta pada event ini')
+        return attrs
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        if 'score_field' in validated_data:
+            scores.save_scores(instance, self.get_jury_id(), instance.score_field)
+            live.publish_scores([instance.pk])
+        return instance
 
     def to_representation(self, instance):
         repr = super().to_representation(instance)
@@ -103,11 +362,37 @@ class ParticipantsJurySerializer(ParticipantsSerializer):
         return out
 
 
+class ScoreSubmissionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    score_field = serializers.JSONField()
+
+    def validate_score_field(self, value):
+        try:
+            scores.validate_score_field(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
+class JuryAssignmentSerializer(serializers.Serializer):
+    per_participant = serializers.IntegerField(min_value=1, default=1)
+    max_load = serializers.IntegerField(min_value=0, allow_null=True, default=None)
+    limits = serializers.DictField(child=serializers.IntegerField(min_value=0), default=dict)
+    replace = serializers.BooleanField(default=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_limits(self, value):
+        if not all(str(key).isdigit() for key in value):
+            raise serializers.ValidationError('Key limits harus berupa id jury')
+        return {int(key): limit for key, limit in value.items()}
+
+
 class ParticipantsCreateJurySerializer(ParticipantsSerializer):
 
     class Meta:
         fields = ('id', 'code', 'full_name','age','email','institute','total_score','score_field','photo_url', 'created_at', 'updated_at')
         model = Participants
+        read_only_fields = ('total_score',)
 
     def to_representation(self, instance):
         repr = super().to_representation(instance)
@@ -115,20 +400,21 @@ class ParticipantsCreateJurySerializer(ParticipantsSerializer):
 
         return out
 
-class JurySerializer(serializers.ModelSerializer):
-    participants = ParticipantsSerializer(read_only=True, many=True, required=False)
+class JurySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    participants = NestedParticipantsSerializer(read_only=True, many=True, required=False)
     user = UserSerializer(write_only=True)
+    expandable_fields = ('participants',)
 
     class Meta:
-        fields = ('id', 'participants', 'created_at', 'updated_at', 'user')
+        fields = ('id', 'participants', 'institute', 'created_at', 'updated_at', 'user')
         model = Jury
 
+    @transaction.atomic
     def create(self, validated_data):
         eid = self.context.get("eid", "")
         if eid:
             ev = Event.objects.get(pk=eid)
-            ju_count = Jury.objects.filter(event__pk=eid).count()
-            if ju_count < ev.num_jury:
+            if counters.reserve(eid, 'jury'):
                 user_data = validated_data.pop('user')
                 user = CreateUser(user_data)
                 u = user.create_user()
@@ -137,7 +423,8 @@ class JurySerializer(serializers.ModelSerializer):
                 com = Jury.objects.create(user=u, **validated_data)
                 com.save()
                 ev.juri.add(com)
-                ev.save()
+                counters.increment(counters.TOTAL_JURY)
+                response_cache.invalidate([eid])
             else:
                 raise serializers.ValidationError(get_response(message="Jumlah juri sudah penuh", status=False, status_code=400))
         else:
@@ -149,12 +436,13 @@ class JurySerializer(serializers.ModelSerializer):
 
         return repr
 
-class JuryDetailSerializer(serializers.ModelSerializer):
-    participants = ParticipantsSerializer(read_only=True, many=True)
+class JuryDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    participants = NestedParticipantsSerializer(read_only=True, many=True)
     user = UserSerializer(read_only=True)
+    expandable_fields = ('participants',)
 
     class Meta:
-        fields = ('id', 'participants', 'created_at', 'updated_at', 'user')
+        fields = ('id', 'participants', 'institute', 'created_at', 'updated_at', 'user')
         model = Jury
     
     def to_representation(self, instance):
@@ -163,19 +451,20 @@ class JuryDetailSerializer(serializers.ModelSerializer):
 
         return out
 
-class CommitteeSerializer(serializers.ModelSerializer):
+class CommitteeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(write_only=True)
+    select_related_fields = ('user',)
 
     class Meta:
         fields = ('id', 'created_at', 'updated_at', 'user')
         model = Committee
 
+    @transaction.atomic
     def create(self, validated_data):
         eid = self.context.get("eid", "")
         if eid:
             ev = Event.objects.get(pk=eid)
-            com_count = Committee.objects.filter(event__pk=eid).count()
-            if com_count < ev.num_committee:
+            if counters.reserve(eid, 'committee'):
                 user_data = validated_data.pop('user')
                 user = CreateUser(user_data)
                 u = user.create_user()
@@ -186,7 +475,8 @@ class CommitteeSerializer(serializers.ModelSerializer):
                 com = Committee.objects.create(user=u, **validated_data)
                 com.save()
                 ev.panitia.add(com)
-                ev.save()
+                counters.increment(counters.TOTAL_COMMITTEE)
+                response_cache.invalidate([eid])
             else:
                 raise serializers.ValidationError(get_response(message="Jumlah juri sudah penuh", status=False, status_code=400))
         else:
@@ -200,7 +490,7 @@ class CommitteeSerializer(serializers.ModelSerializer):
 
         return repr
 
-class CommitteeDetailSerializer(serializers.ModelSerializer):
+class CommitteeDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
 
     class Meta:
@@ -214,25 +504,31 @@ class CommitteeDetailSerializer(serializers.ModelSerializer):
         return out
     
 
-class EventBaseSerializer(serializers.ModelSerializer):
+class EventBaseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = serializers.HiddenField(
         default=serializers.CurrentUserDefault(),
     )
     panitia = CommitteeSerializer(many=True, required=False, read_only=True)
     juri = JurySerializer(many=True, required=False, read_only=True)
-    peserta = ParticipantsSerializer(many=True, required=False, read_only=True)
+    peserta = NestedParticipantsSerializer(many=True, required=False, read_only=True)
+    expandable_fields = ('panitia', 'juri', 'peserta')
 
     class Meta:
         fields = ('id','user', 'title', 'start_date', 'end_date','start_time', 'end_time',
                   'max_participants','num_jury','num_committee','event_level', 'panitia', 'juri', 'peserta')
         model = Event
 
+    @transaction.atomic
+    def create(self, validated_data):
+        ev = super().create(validated_data)
+        counters.increment(counters.TOTAL_EVENT)
+        return ev
+
 class EventSerializer(EventBaseSerializer):
 
     def to_representation(self, instance):
         repr = super().to_representation(instance)
         if self.context.get("eid", ""):
-            prk = self.context.get("eid", "")
-            repr['current_total_participants'] = Participants.objects.filter(event__pk=prk).count()
-            repr['current_total_jury'] = Jury.objects.filter(event__pk=prk).count()
+            repr['current_total_participants'] = instance.participants_count
+            repr['current_total_jury'] = instance.jury_count
         return repr
@@ -1,3 +1,1588 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import datetime
+import decimal
+import io
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import models
+from django.utils import timezone
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import (authentication, counters, instrumentation, leaderboard, ledger, live, onboarding, renderers, replicas,
+               response_cache, scores)
+from .authentication import TokenClaimsSerializer
+from .broker import LocalBroker
+from .exception_handler import ExceptionMiddleware
+from .live import LiveLeaderboardApp
+from .views import ParticipantsLeaderboard
+from .models import (Event, Committee, Jury, Participants, User, Score, StatisticCounter, RevokedToken, EventParticipant,
+                     ScoreEntry, ScoreSnapshot)
+
+
+def create_event(user, **kwargs):
+    data = {
+        'user': user,
+        'title': 'Lomba',
+        'start_date': datetime.date(2021, 8, 1),
+        'end_date': datetime.date(2021, 8, 2),
+        'start_time': datetime.time(8, 0),
+        'end_time': datetime.time(17, 0),
+        'max_participants': 10000,
+        'num_jury': 100,
+        'num_committee': 100,
+        'event_level': 'nasional',
+    }
+    data.update(kwargs)
+    return Event.objects.create(**data)
+
+
+def clear_totals():
+    """
+    total_score dari populate_event tidak punya baris Score/ledger, dikosongkan
+    untuk test yang menulis nilai lewat endpoint
+    """
+    EventParticipant.objects.update(total_score=None)
+    Participants.objects.update(total_score=None)
+
+
+def populate_event(event, committees=1, juries=1, participants=1, prefix=''):
+    tag = '%s%s' % (prefix, event.pk)
+    for i in range(committees):
+        u = User.objects.create(username='com-%s-%s' % (tag, i), is_committee=True)
+        event.panitia.add(Committee.objects.create(user=u))
+    peserta = [
+        Participants.objects.create(code='p-%s-%s' % (tag, i), full_name='Peserta %s' % i,
+                                    institute='Univ', total_score=float(i % 7))
+        for i in range(participants)
+    ]
+    event.peserta.add(*peserta)
+    scores.sync_event_scores([p.pk for p in peserta])
+    for i in range(juries):
+        u = User.objects.create(username='jury-%s-%s' % (tag, i), is_jury=True)
+        ju = Jury.objects.create(user=u)
+        ju.participants.add(*peserta[i::juries])
+        event.juri.add(ju)
+    counters.increment_events('committee', [event.pk], committees)
+    counters.increment_events('jury', [event.pk], juries)
+    counters.increment_events('participants', [event.pk], participants)
+    return peserta
+
+
+NO_RESPONSE_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'event': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+@override_settings(CACHES=NO_RESPONSE_CACHE)
+class QueryCountTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True, is_committee=True)
+        self.client.force_authenticate(self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url, grow):
+        self.count_queries(url)
+        small = self.count_queries(url)
+        grow()
+        self.assertEqual(self.count_queries(url), small)
+
+    def test_event_list(self):
+        ev = create_event(self.admin)
+        populate_event(ev, 1, 1, 1)
+        self.assertConstantQueries('/api/v1/event/', lambda: (
+            populate_event(ev, 5, 5, 30, prefix='x'),
+            populate_event(create_event(self.admin), 3, 3, 10),
+        ))
+
+    def test_event_detail(self):
+        ev = create_event(self.admin)
+        populate_event(ev, 1, 1, 1)
+        self.assertConstantQueries('/api/v1/event/%s/' % ev.pk,
+                                   lambda: populate_event(ev, 5, 5, 30, prefix='x'))
+
+    def test_event_list_from_committee(self):
+        ev = create_event(self.admin)
+        populate_event(ev, 1, 1, 1)
+        com = Committee.objects.create(user=self.admin)
+        ev.panitia.add(com)
+        self.assertConstantQueries('/api/v1/event/committee/%s/' % com.pk, lambda: (
+            populate_event(ev, 5, 5, 30, prefix='x'),
+            create_event(self.admin).panitia.add(com),
+        ))
+
+    def test_committee_and_jury_lists(self):
+        ev = create_event(self.admin)
+        populate_event(ev, 1, 1, 1)
+        for url in ('/api/v1/event/%s/committee/', '/api/v1/event/%s/jury/', '/api/v1/event/%s/participants/'):
+            self.assertConstantQueries(url % ev.pk,
+                                       lambda: populate_event(ev, 3, 3, 12, prefix=url[-12:-1]))
+
+    def test_jury_detail(self):
+        ev = create_event(self.admin)
+        populate_event(ev, 1, 1, 1)
+        ju = ev.juri.first()
+        url = '/api/v1/event/%s/jury/%s/' % (ev.pk, ju.pk)
+        small = self.count_queries(url)
+        ju.participants.add(*populate_event(ev, 0, 0, 20, prefix='x'))
+        self.assertEqual(self.count_queries(url), small)
+
+
+class CounterTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True, is_committee=True)
+        self.client.force_authenticate(self.admin)
+
+    def statistic(self):
+        return self.client.get('/api/v1/event/').data['data']['statistic']
+
+    def test_counters_follow_write_paths(self):
+        ev = create_event(self.admin)
+        populate_event(ev, 2, 1, 3)
+        self.assertEqual(self.statistic(), {
+            'total_event': 1, 'total_participants': 3, 'total_jury': 1, 'total_committee': 2,
+        })
+
+        ju = ev.juri.first()
+        response = self.client.post('/api/v1/event/%s/jury/%s/participants/' % (ev.pk, ju.pk), {
+            'code': 'baru', 'full_name': 'Peserta Baru', 'institute': 'Univ',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.statistic()['total_participants'], 4)
+
+        p = Participants.objects.get(code='baru')
+        self.client.delete('/api/v1/event/%s/jury/%s/participants/%s/' % (ev.pk, ju.pk, p.pk))
+        self.client.delete('/api/v1/event/%s/jury/%s/' % (ev.pk, ju.pk))
+        self.assertEqual(self.statistic(), {
+            'total_event': 1, 'total_participants': 3, 'total_jury': 0, 'total_committee': 2,
+        })
+
+        before = dict(StatisticCounter.objects.values_list('key', 'value'))
+        call_command('rebuild_counters', stdout=io.StringIO())
+        after = dict(StatisticCounter.objects.values_list('key', 'value'))
+        self.assertEqual({key: after[key] for key in before}, before)
+
+
+class CapacityConcurrencyTest(TransactionTestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True, is_committee=True)
+        self.ev = create_event(self.admin, max_participants=5, num_jury=3, num_committee=2)
+        self.jury = Jury.objects.create(user=User.objects.create(username='juri-awal', is_jury=True))
+        self.ev.juri.add(self.jury)
+        counters.increment_events('jury', [self.ev.pk])
+
+    def hammer(self, path, payloads):
+        barrier = threading.Barrier(len(payloads))
+        statuses = []
+
+        def register(payload):
+            client = APIClient()
+            client.force_authenticate(self.admin)
+            barrier.wait()
+            try:
+                statuses.append(client.post(path, payload, format='json').status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=register, args=(payload,)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def user(self, prefix, i):
+        return {'user': {'username': '%s-%s' % (prefix, i), 'email': '%s-%s@mail.com' % (prefix, i),
+                         'password': 'Rahasia-%s-xyz' % i, 'password2': 'Rahasia-%s-xyz' % i}}
+
+    def test_limits_hold_under_concurrent_registration(self):
+        base = '/api/v1/event/%s/' % self.ev.pk
+        participants = self.hammer(base + 'jury/%s/participants/' % self.jury.pk, [
+            {'code': 'c-%s' % i, 'full_name': 'P', 'institute': 'U'} for i in range(16)
+        ])
+        juries = self.hammer(base + 'jury/', [self.user('juri', i) for i in range(16)])
+        committees = self.hammer(base + 'committee/', [self.user('panitia', i) for i in range(16)])
+
+        self.assertEqual(set(participants + juries + committees), {201, 400})
+        self.assertEqual(participants.count(201), 5)
+        self.assertEqual(juries.count(201), 2)
+        self.assertEqual(committees.count(201), 2)
+        self.assertEqual(self.ev.peserta.count(), 5)
+        self.assertEqual(self.ev.juri.count(), 3)
+        self.assertEqual(self.ev.panitia.count(), 2)
+        self.assertEqual(counters.get_event_counts(self.ev.pk), {'participants': 5, 'jury': 3, 'committee': 2})
+
+
+class LeaderboardTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.ev = create_event(self.admin)
+        totals = [5, None, 9, 5, 7, 5, None, 1]
+        self.peserta = [
+            Participants.objects.create(code='lb-%s' % i, full_name='P%s' % i, institute='U', total_score=score)
+            for i, score in enumerate(totals)
+        ]
+        self.ev.peserta.add(*self.peserta)
+        other = create_event(self.admin)
+        other.peserta.add(Participants.objects.create(code='lain', full_name='Lain', institute='U', total_score=100))
+        scores.sync_event_scores(Participants.objects.values_list('pk', flat=True))
+        self.url = '/api/v1/event/%s/participants/leaderboard/' % self.ev.pk
+        # 9, 7, 5 (id kecil dulu), 1, lalu yang belum dinilai
+        self.expected = [self.peserta[i].pk for i in (2, 4, 0, 3, 5, 7, 1, 6)]
+
+    def test_keyset_pages_cover_leaderboard_in_order(self):
+        response = self.client.get(self.url, {'limit': 3})
+        ids, ranks = [], []
+        pages = [response.data['data']]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data['data'])
+        for page in pages:
+            ids += [row['id'] for row in page['results']]
+            ranks += [row['rank'] for row in page['results']]
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(ranks, list(range(1, 9)))
+
+        back = self.client.get(pages[-1]['previous']).data['data']
+        self.assertEqual([row['id'] for row in back['results']], self.expected[3:6])
+        self.assertEqual([row['rank'] for row in back['results']], [4, 5, 6])
+
+    def test_cursor_with_wrong_value_types_is_not_found(self):
+        for data in ({'r': 0, 's': 'abc', 'i': 1}, {'r': 0, 's': [5], 'i': 1}, {'r': 0, 's': 5, 'i': 1.5},
+                     {'r': 0, 's': 5, 'i': '1'}, {'r': 0, 's': True, 'i': 1}, {'r': 'x', 's': 5, 'i': 1}, [0, 5, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, data)
+
+    def test_rank_and_around_participant(self):
+        target = self.peserta[3]
+        response = self.client.get(self.url, {'participant': target.pk})
+        self.assertEqual(response.data['data'][0]['rank'], 4)
+
+        response = self.client.get(self.url, {'participant': target.pk, 'around': 2})
+        self.assertEqual([row['id'] for row in response.data['data']], self.expected[1:6])
+        self.assertEqual([row['rank'] for row in response.data['data']], [2, 3, 4, 5, 6])
+
+        unscored = self.peserta[6]
+        response = self.client.get(self.url, {'participant': unscored.pk, 'around': 1})
+        self.assertEqual([row['rank'] for row in response.data['data']], [7, 8])
+
+
+class QueryPlanTest(APITestCase):
+    """
+    EXPLAIN query utama setiap view pada data seed. Seq scan dimatikan
+    sehingga seq scan yang tetap muncul berarti index yang dibutuhkan hilang.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        cls.events = [create_event(cls.admin) for _ in range(3)]
+        for ev in cls.events:
+            populate_event(ev, 3, 3, 300)
+        cls.ev = cls.events[1]
+        cls.jury = cls.ev.juri.order_by('pk').first()
+        cls.committee = cls.ev.panitia.order_by('pk').first()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def plan(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            return queryset.explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+
+    def test_hot_queries_use_indexes(self):
+        board = leaderboard.event_participants(self.ev.pk)
+        top = board.order_by(*leaderboard.ORDERING).first()
+        queries = {
+            'leaderboard': board.order_by(*leaderboard.ORDERING)[:50],
+            'leaderboard-next': leaderboard.after(board, leaderboard.score_of(top), top.pk).order_by(*leaderboard.ORDERING)[:50],
+            'rank': leaderboard.before(board, leaderboard.score_of(top), top.pk),
+            'jury-worklist': Participants.objects.filter(event__pk=self.ev.pk, jury__pk=self.jury.pk),
+            'event-from-jury': Event.objects.filter(juri__pk=self.jury.pk),
+            'event-from-committee': Event.objects.filter(panitia__pk=self.committee.pk),
+            'jury-list': Jury.objects.filter(event__pk=self.ev.pk),
+            'committee-list': Committee.objects.filter(event__pk=self.ev.pk),
+        }
+        for name, queryset in queries.items():
+            with self.subTest(name):
+                plan = self.plan(queryset)
+                self.assertNotIn('Seq Scan', plan, '%s\n%s' % (name, plan))
+
+        # urutan leaderboard dibaca dari event_leaderboard_idx tanpa Sort
+        plan = self.plan(queries['leaderboard'])
+        self.assertIn('event_leaderboard_idx', plan, plan)
+        self.assertNotIn('Sort', plan, plan)
+
+
+class ScoreTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 0, 2, 2)
+        self.juri = list(self.ev.juri.order_by('pk'))
+
+    def submit(self, jury, participant, score_field, **extra):
+        self.client.force_authenticate(jury.user)
+        url = '/api/v1/event/%s/jury/%s/participants/%s/' % (self.ev.pk, jury.pk, participant.pk)
+        return self.client.patch(url, dict(score_field=score_field, **extra), format='json')
+
+    def test_total_score_is_aggregated_from_normalized_scores(self):
+        p = self.peserta[0]
+        response = self.submit(self.juri[0], p, {'vokal': 80, 'gaya': {'kostum': 5, 'catatan': 'rapi'}},
+                               total_score=1000)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['score_field'],
+                         {'vokal': 80, 'gaya': {'kostum': 5, 'catatan': 'rapi'}})
+        self.assertEqual(response.data['data']['total_score'], 85)
+        self.assertEqual(set(Score.objects.values_list('criterion', 'value')),
+                         {('vokal', 80), ('gaya.kostum', 5)})
+
+        scores.save_scores(p, self.juri[1].pk, {'vokal': 70})
+        self.submit(self.juri[0], p, {'vokal': 90})
+        p.refresh_from_db()
+        self.assertEqual(p.total_score, 160)
+        self.assertEqual(Score.objects.filter(participant=p).count(), 2)
+
+    def test_rejects_non_object_score_field(self):
+        response = self.submit(self.juri[0], self.peserta[0], [1, 2, 3])
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_jury_outside_event_or_assignment(self):
+        other = create_event(self.admin)
+        foreign = Jury.objects.create(user=User.objects.create(username='juri-lain', is_jury=True))
+        other.juri.add(foreign)
+        foreign.participants.add(self.peserta[0])
+        self.client.force_authenticate(self.admin)
+        for jid in (99999, foreign.pk, self.juri[1].pk):
+            url = '/api/v1/event/%s/jury/%s/participants/%s/' % (self.ev.pk, jid, self.peserta[0].pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(url, {'score_field': {'vokal': 80}}, format='json')
+            self.assertEqual(response.status_code, 400, jid)
+        self.assertFalse(Score.objects.exists())
+
+        response = self.submit(self.juri[0], self.peserta[0], {'vokal': 80})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Score.objects.values_list('jury_id', flat=True)), [self.juri[0].pk])
+
+
+class PermissionTest(APITestCase):
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 0, 2, 2)
+        self.juri = list(self.ev.juri.order_by('pk'))
+        # peserta pertama dinilai oleh dua jury
+        self.juri[1].participants.add(self.peserta[0])
+
+    def submit(self, user, jury, participant):
+        self.client.force_authenticate(user)
+        url = '/api/v1/event/%s/jury/%s/participants/%s/' % (self.ev.pk, jury.pk, participant.pk)
+        return self.client.patch(url, {'score_field': {'a': 1}}, format='json')
+
+    def assignment_queries(self, ctx):
+        return [q for q in ctx.captured_queries if 'event_jury_participants' in q['sql'] and '"event_jury"' in q['sql']]
+
+    def test_assignments_are_resolved_once_and_cached(self):
+        jury = self.juri[1]
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.submit(jury.user, jury, self.peserta[0]).status_code, 200)
+        self.assertEqual(len(self.assignment_queries(ctx)), 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.submit(jury.user, jury, self.peserta[1]).status_code, 200)
+        self.assertEqual(self.assignment_queries(ctx), [])
+        self.assertEqual(self.submit(self.juri[0].user, self.juri[0], self.peserta[1]).status_code, 403)
+        # admin/committee juga hanya boleh menilai atas nama jury yang diassign
+        self.assertEqual(self.submit(self.admin, self.juri[0], self.peserta[1]).status_code, 400)
+        self.assertEqual(self.submit(self.admin, self.juri[1], self.peserta[1]).status_code, 200)
+
+    def test_new_assignment_invalidates_cached_access(self):
+        jury = self.juri[0]
+        self.assertEqual(self.submit(jury.user, jury, self.peserta[0]).status_code, 200)
+
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/event/%s/jury/%s/participants/' % (self.ev.pk, jury.pk),
+                                        {'code': 'baru', 'full_name': 'Baru', 'institute': 'Univ'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        created = Participants.objects.get(code='baru')
+        self.assertEqual(self.submit(jury.user, jury, created).status_code, 200)
+
+
+class BulkScoreTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 0, 2, 6)
+        clear_totals()
+        self.jury = self.ev.juri.order_by('pk').first()
+        self.mine = list(self.jury.participants.order_by('pk'))
+        self.url = '/api/v1/event/%s/jury/%s/participants/' % (self.ev.pk, self.jury.pk)
+        self.client.force_authenticate(self.jury.user)
+
+    def test_bulk_submission_reports_per_item(self):
+        other = next(p for p in self.peserta if p not in self.mine)
+        payload = [{'id': p.pk, 'score_field': {'a': i + 1, 'b': 10}} for i, p in enumerate(self.mine)]
+        payload += [{'id': other.pk, 'score_field': {'a': 1}}, {'id': self.mine[0].pk, 'score_field': {'a': 5}},
+                    {'score_field': {'a': 1}}, {'id': self.mine[1].pk, 'score_field': 'x'}]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(self.url, payload, format='json')
+        self.assertLess(len(ctx.captured_queries), 15)
+
+        results = response.data['data']
+        self.assertFalse(response.data['status'])
+        self.assertEqual([r['status'] for r in results], [True] * len(self.mine) + [False] * 4)
+        self.assertEqual([r['total_score'] for r in results[:len(self.mine)]],
+                         [float(i + 11) for i in range(len(self.mine))])
+        self.assertEqual(Score.objects.filter(participant=other).count(), 0)
+        self.mine[0].refresh_from_db()
+        self.assertEqual(self.mine[0].score_field, {'a': 1, 'b': 10})
+
+    def test_list_and_create_share_url(self):
+        self.assertEqual(len(self.client.get(self.url).data['data']['results']), len(self.mine))
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(self.url, {'code': 'baru', 'full_name': 'Baru', 'institute': 'U'})
+        self.assertEqual(response.status_code, 201)
+
+
+@override_settings(CACHES=NO_RESPONSE_CACHE)
+class DashboardTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin, title='Final')
+        self.peserta = populate_event(self.ev, 1, 2, 10)
+        self.committee = self.ev.panitia.get()
+        self.jury = self.ev.juri.order_by('pk').first()
+        unscored = [p.pk for p in self.peserta[:2]]
+        EventParticipant.objects.filter(event=self.ev, participants_id__in=unscored).update(total_score=None)
+
+    def dashboard(self, url, user):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data['data'], len(ctx.captured_queries)
+
+    def test_committee_dashboard_counts_progress_and_leaders(self):
+        url = '/api/v1/event/committee/%s/dashboard/' % self.committee.pk
+        data, queries = self.dashboard(url, self.committee.user)
+        self.assertEqual(len(data), 1)
+        row = data[0]
+        self.assertEqual((row['participants_count'], row['jury_count'], row['committee_count']), (10, 2, 1))
+        self.assertEqual((row['scored'], row['unscored'], row['progress']), (8, 2, 80.0))
+        expected = list(leaderboard.event_participants(self.ev.pk).order_by(*leaderboard.ORDERING)[:3])
+        self.assertEqual([(l['rank'], l['id'], l['total_score']) for l in row['leaders']],
+                         [(i + 1, p.pk, leaderboard.score_of(p)) for i, p in enumerate(expected)])
+
+        for i in range(3):
+            other = create_event(self.admin, title='Babak %s' % i)
+            populate_event(other, 0, 1, 4, prefix='b%s' % i)
+            other.panitia.add(self.committee)
+            counters.increment_events('committee', [other.pk])
+        data, more_queries = self.dashboard(url, self.committee.user)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(more_queries, queries)
+        self.assertTrue(all(len(row['leaders']) == 3 for row in data))
+
+        stranger = User.objects.create(username='lain', is_committee=True)
+        self.assertEqual(self.dashboard(url, stranger)[0], [])
+        self.assertEqual(len(self.dashboard(url, User.objects.create(username='staf', is_staff=True,
+                                                                      is_committee=True))[0]), 4)
+
+    def test_jury_dashboard_reports_own_progress(self):
+        assigned = list(self.jury.participants.order_by('pk'))
+        for participant in assigned[:2]:
+            Score.objects.create(participant=participant, jury=self.jury, criterion='teknik', value=1)
+        data, queries = self.dashboard('/api/v1/event/jury/%s/dashboard/' % self.jury.pk, self.jury.user)
+        self.assertLess(queries, 4)
+        row = data[0]
+        self.assertEqual((row['assigned'], row['assigned_scored'], row['assigned_unscored']), (5, 2, 3))
+        self.assertEqual(row['scored'], 8)
+
+        self.client.force_authenticate(self.committee.user)
+        self.assertEqual(self.client.get('/api/v1/event/jury/%s/dashboard/' % self.jury.pk).status_code, 403)
+
+
+class ImportTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.ev = create_event(self.admin, max_participants=5)
+        populate_event(self.ev, 0, 1, 1)
+        self.jury = self.ev.juri.get()
+
+    def upload(self, name, content, **data):
+        upload = io.BytesIO(content if isinstance(content, bytes) else content.encode('utf-8'))
+        upload.name = name
+        return self.client.post('/api/v1/event/%s/participants/import/' % self.ev.pk,
+                                dict(file=upload, **data), format='multipart')
+
+    def test_csv_import_validates_rows_and_capacity(self):
+        content = 'code,full_name,age,institute\n' + ''.join([
+            'a1,Satu,20,U\n', 'a2,Dua,,U\n', 'a3,Tiga,abc,U\n', 'a1,Satu Lagi,20,U\n',
+            'p-%s-0,Lama,,U\n' % self.ev.pk, 'a4,Empat,,U\n', 'a5,Lima,,U\n', 'a6,Enam,,U\n',
+        ])
+        response = self.upload('peserta.csv', content, jury=self.jury.pk)
+        summary = response.data['data']
+        self.assertEqual(summary['created'], 4)
+        self.assertEqual([e['line'] for e in summary['errors']], [4, 5, 6, 9])
+        self.assertEqual(self.ev.peserta.count(), 5)
+        self.assertEqual(self.jury.participants.count(), 5)
+        self.assertEqual(counters.get_event_counts(self.ev.pk)['participants'], 5)
+
+    def test_invalid_jury_is_rejected(self):
+        response = self.upload('peserta.csv', 'code,full_name,institute\nz1,Z,U\n', jury='abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Participants.objects.filter(code='z1').exists())
+
+    def test_unreadable_file_is_reported_as_row_error(self):
+        oversized = 'code,full_name,institute\nz1,Z,U\nz2,%s,U\n' % ('x' * (csv.field_size_limit() + 1))
+        for content, message in ((b'\xff\xfecode,full_name\n', 'File harus berupa teks UTF-8'),
+                                 (oversized, 'Format CSV tidak valid')):
+            response = self.upload('peserta.csv', content)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.data['status'])
+            self.assertEqual(response.data['data']['failed'], 1, response.data)
+            self.assertTrue(response.data['data']['errors'][0]['message'].startswith(message))
+
+    def test_ndjson_import_with_constant_queries_per_chunk(self):
+        self.ev.max_participants = 1000
+        self.ev.save()
+        counters.rebuild()
+
+        def run(n, prefix):
+            content = ''.join(json.dumps({'code': '%s%s' % (prefix, i), 'full_name': 'P', 'institute': 'U'}) + '\n'
+                              for i in range(n))
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.upload('peserta.ndjson', content)
+            self.assertEqual(response.data["data"]["created"], n)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(10, 'x'), run(300, 'y'))
+
+    def test_management_command(self):
+        path = os.path.join(tempfile.mkdtemp(), 'peserta.csv')
+        with open(path, 'w') as f:
+            f.write('code,full_name,institute\nc1,Satu,U\nc2,Dua,U\n')
+        call_command('import_participants', self.ev.pk, path, stdout=io.StringIO())
+        self.assertEqual(self.ev.peserta.filter(code__in=['c1', 'c2']).count(), 2)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+                   EVENT_ONBOARDING_WORKERS=2, EVENT_ONBOARDING_POOL_THRESHOLD=2)
+class OnboardingTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.ev = create_event(self.admin, num_jury=4)
+        populate_event(self.ev, 1, 1, 0)
+        self.url = '/api/v1/event/%s/jury/bulk/' % self.ev.pk
+
+    def account(self, name, **kwargs):
+        data = {'username': name, 'email': '%s@mail.com' % name, 'password': 'Sandi-rahasia-%s' % name}
+        data.update(kwargs)
+        return data
+
+    def test_creates_accounts_in_bulk_and_reports_failed_rows(self):
+        User.objects.create(username='lama', email='lama@mail.com')
+        rows = [
+            self.account('juri1', institute='ITB'),
+            self.account('juri2'),
+            self.account('juri1'),
+            self.account('juri3', password='123'),
+            self.account('juri4', email='lama@mail.com'),
+            self.account('lama'),
+            self.account('juri5'),
+            self.account('juri6'),
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, rows, format='json')
+        self.assertLess(len(ctx.captured_queries), 20)
+        summary = response.data['data']
+        self.assertFalse(response.data['status'])
+        self.assertEqual((summary['created'], summary['linked']), (3, 0))
+        self.assertEqual([e['line'] for e in summary['errors']], [3, 4, 5, 6, 8])
+        self.assertEqual(summary['errors'][-1]['message'], 'Jumlah juri sudah penuh')
+
+        user = User.objects.get(username='juri1')
+        self.assertTrue(user.is_jury)
+        self.assertTrue(user.check_password('Sandi-rahasia-juri1'))
+        self.assertEqual(user.jury.institute, 'ITB')
+        self.assertEqual(self.ev.juri.count(), 4)
+        self.assertEqual(counters.get_event_counts(self.ev.pk)['jury'], 4)
+        self.assertEqual({a['username'] for a in summary['accounts']}, {'juri1', 'juri2', 'juri5'})
+
+    def test_reuses_one_pool_and_checks_email_against_existing_users(self):
+        User.objects.create(username='lama', email='Lama@Mail.com')
+        with mock.patch.object(onboarding, 'ProcessPoolExecutor', wraps=onboarding.ProcessPoolExecutor) as pool_class:
+            onboarding.reset_pool()
+            for batch in ('a', 'b'):
+                rows = [(i + 1, self.account('%s%s' % (batch, i))) for i in range(2)]
+                self.assertEqual(onboarding.Onboarding(self.ev.pk, 'committee').run(rows)['created'], 2)
+        self.assertEqual(pool_class.call_count, 1)
+        onboarding.reset_pool()
+
+        rows = enumerate([self.account('baru1', email='lama@mail.com'), self.account('baru2', email='BARU@mail.com'),
+                          self.account('baru3', email='baru@MAIL.com')], start=1)
+        summary = onboarding.Onboarding(self.ev.pk, 'committee').run(rows)
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual([(e['line'], e['message']) for e in summary['errors']],
+                         [(1, 'Email sudah terdaftar'), (3, 'Email sudah terdaftar')])
+
+    def test_confirm_links_existing_accounts(self):
+        other = create_event(self.admin)
+        populate_event(other, 1, 1, 0, prefix='x')
+        existing = other.juri.get()
+        url = '/api/v1/event/%s/committee/bulk/' % self.ev.pk
+        response = self.client.post(url, [self.account(existing.user.username)], format='json')
+        self.assertEqual(response.data['data']['errors'][0]['message'], 'Username sudah terdaftar')
+
+        response = self.client.post(self.url + '?confirm=1', [self.account(existing.user.username)], format='json')
+        self.assertEqual(response.data['data']['linked'], 1)
+        self.assertTrue(self.ev.juri.filter(pk=existing.pk).exists())
+        response = self.client.post(self.url + '?confirm=1', [self.account(existing.user.username)], format='json')
+        self.assertEqual(response.data['data']['errors'][0]['message'], 'Akun sudah terdaftar pada event ini')
+
+        response = self.client.post(url, [self.account('panitia1')], format='json')
+        self.assertEqual(response.data['data']['created'], 1)
+        self.assertTrue(self.ev.panitia.filter(user__username='panitia1', user__is_committee=True).exists())
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, 400)
+        self.client.force_authenticate(User.objects.get(username='panitia1'))
+        self.assertEqual(self.client.post(url, [self.account('panitia2')], format='json').status_code, 403)
+
+    def test_management_command(self):
+        path = os.path.join(tempfile.mkdtemp(), 'juri.csv')
+        with open(path, 'w') as f:
+            f.write('username,email,password,institute\nc1,c1@mail.com,Sandi-rahasia-1,ITB\nc2,c2@mail.com,Sandi-rahasia-2,\n')
+        out = io.StringIO()
+        call_command('onboard_users', self.ev.pk, 'jury', path, stdout=out, stderr=io.StringIO())
+        self.assertIn('2 akun dibuat', out.getvalue())
+        self.assertTrue(User.objects.get(username='c2').check_password('Sandi-rahasia-2'))
+
+
+class ExportTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 0, 2, 4)
+        clear_totals()
+        self.juri = list(self.ev.juri.order_by('pk'))
+        scores.save_scores(self.peserta[1], self.juri[0].pk, {'a': 10})
+        scores.save_scores(self.peserta[1], self.juri[1].pk, {'a': 5})
+        scores.save_scores(self.peserta[2], self.juri[0].pk, {'a': 7})
+        self.url = '/api/v1/event/%s/participants/export/' % self.ev.pk
+
+    def test_csv_in_leaderboard_order_with_jury_columns(self):
+        response = self.client.get(self.url, {'scores': 1})
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][-2:], ['jury_%s' % self.juri[0].pk, 'jury_%s' % self.juri[1].pk])
+        self.assertEqual([row[2] for row in rows[1:3]], [self.peserta[1].code, self.peserta[2].code])
+        self.assertEqual(rows[1][0], '1')
+        self.assertEqual(rows[1][-2:], ['10.0', '5.0'])
+
+    def test_ndjson(self):
+        response = self.client.get(self.url, {'output': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row['rank'] for row in rows], [1, 2, 3, 4])
+        self.assertEqual(rows[0]['total_score'], 15)
+
+
+class PaginationTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.ev = create_event(self.admin)
+        populate_event(self.ev, 5, 1, 3)
+
+    def test_list_endpoints_use_cursor_envelope(self):
+        url, ids = '/api/v1/event/%s/committee/?limit=2' % self.ev.pk, []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(set(response.data), {'message', 'data', 'status', 'status_code'})
+            ids += [row['id'] for row in response.data['data']['results']]
+            url = response.data['data']['next']
+        self.assertEqual(ids, list(self.ev.panitia.order_by('pk').values_list('pk', flat=True)))
+
+        data = self.client.get('/api/v1/event/').data['data']
+        self.assertEqual(set(data), {'statistic', 'list_event', 'next', 'previous'})
+
+    @override_settings(EVENT_NESTED_LIST_LIMIT=2)
+    def test_nested_participants_are_capped(self):
+        peserta = list(self.ev.peserta.order_by('pk'))
+        other = Jury.objects.create(user=User.objects.create(username='jury-other', is_jury=True))
+        other.participants.add(*peserta[1:])
+        self.ev.juri.add(other)
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get('/api/v1/event/%s/' % self.ev.pk).data
+        self.assertEqual([p['id'] for p in data['peserta']], [p.pk for p in peserta[:2]])
+        nested = {jury['id']: [p['id'] for p in jury['participants']] for jury in data['juri']}
+        self.assertEqual(nested[self.ev.juri.order_by('pk')[0].pk], [p.pk for p in peserta[:2]])
+        self.assertEqual(nested[other.pk], [p.pk for p in peserta[1:3]])
+        self.assertTrue(any('LIMIT 2' in q['sql'] and 'event_jury_participants' in q['sql'] for q in ctx.captured_queries))
+
+        data = self.client.get('/api/v1/event/%s/jury/%s/' % (self.ev.pk, other.pk)).data['data']
+        self.assertEqual([p['id'] for p in data['participants']], [p.pk for p in peserta[1:3]])
+
+
+class RecordingBroker(LocalBroker):
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def has_subscribers(self, channel):
+        return True
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return super().publish(channel, message)
+
+
+class LiveLeaderboardTest(APITestCase):
+
+    def test_score_update_publishes_rank_delta_after_commit(self):
+        admin = User.objects.create(username='admin', is_staff=True)
+        ev = create_event(admin)
+        peserta = populate_event(ev, 0, 1, 3)
+        jury = ev.juri.get()
+        self.client.force_authenticate(jury.user)
+        broker = RecordingBroker()
+        with mock.patch('event.live.get_broker', return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch('/api/v1/event/%s/jury/%s/participants/%s/' % (ev.pk, jury.pk, peserta[0].pk),
+                                  {'score_field': {'a': 50}}, format='json')
+        self.assertEqual(broker.published, [(live.channel_name(ev.pk), {
+            'type': 'score', 'event': ev.pk, 'participants': [{'id': peserta[0].pk, 'total_score': 50.0, 'rank': 1}],
+        })])
+
+    def test_sse_stream_fans_out_published_messages(self):
+        broker = LocalBroker()
+        token = str(AccessToken.for_user(User(id=1)))
+        message = {'type': 'score', 'event': 7, 'participants': [{'id': 1, 'total_score': 9.0, 'rank': 1}]}
+
+        async def scenario():
+            async def django_app(scope, receive, send):
+                raise AssertionError('harus ditangani oleh LiveLeaderboardApp')
+
+            app = LiveLeaderboardApp(django_app, heartbeat=0.05)
+            scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/event/7/live/',
+                     'headers': [(b'authorization', ('Bearer %s' % token).encode())]}
+            viewers = []
+            for _ in range(3):
+                inbox, sent = asyncio.Queue(), asyncio.Queue()
+                task = asyncio.ensure_future(app(scope, inbox.get, sent.put))
+                viewers.append((inbox, sent, task))
+            for _, sent, _ in viewers:
+                self.assertEqual((await sent.get())['status'], 200)
+                self.assertIn(b'event: ready', (await sent.get())['body'])
+
+            await asyncio.get_running_loop().run_in_executor(None, broker.publish, live.channel_name(7), message)
+            for inbox, sent, task in viewers:
+                body = (await sent.get())['body']
+                while body.startswith(b': ping'):
+                    body = (await sent.get())['body']
+                self.assertEqual(body, ('event: score\ndata: %s\n\n' % json.dumps(message)).encode())
+                await inbox.put({'type': 'http.disconnect'})
+                await task
+            self.assertFalse(broker.has_subscribers(live.channel_name(7)))
+
+            sent = asyncio.Queue()
+            await app(dict(scope, headers=[]), asyncio.Queue().get, sent.put)
+            self.assertEqual((await sent.get())['status'], 401)
+
+        response_cache.get_cache().set(authentication.REVOKED_CACHE_KEY, frozenset())
+        with mock.patch('event.live.get_broker', return_value=broker):
+            asyncio.run(scenario())
+
+    def test_sse_stream_rejects_revoked_token(self):
+        token = AccessToken.for_user(User(id=1))
+        response_cache.get_cache().set(authentication.REVOKED_CACHE_KEY, frozenset([token['jti']]))
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/v1/event/7/live/',
+                 'headers': [(b'authorization', ('Bearer %s' % token).encode())]}
+
+        async def scenario():
+            async def django_app(scope, receive, send):
+                raise AssertionError('harus ditangani oleh LiveLeaderboardApp')
+
+            sent = asyncio.Queue()
+            await LiveLeaderboardApp(django_app)(scope, asyncio.Queue().get, sent.put)
+            return await sent.get()
+
+        self.assertEqual(asyncio.run(scenario())['status'], 401)
+
+
+class ResponseCacheTest(APITestCase):
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 1, 1, 3)
+        self.jury = self.ev.juri.get()
+        self.client.force_authenticate(self.admin)
+
+    def test_reads_are_cached_until_a_write_bumps_the_generation(self):
+        for url in ('/api/v1/event/%s/' % self.ev.pk, '/api/v1/event/%s/participants/' % self.ev.pk,
+                    '/api/v1/event/%s/jury/%s/' % (self.ev.pk, self.jury.pk)):
+            first = self.client.get(url)
+            etag = first['ETag']
+            with CaptureQueriesContext(connection) as ctx:
+                second = self.client.get(url)
+            self.assertEqual(len(ctx.captured_queries), 0)
+            self.assertEqual(second.data, first.data)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            self.client.force_authenticate(self.jury.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch('/api/v1/event/%s/jury/%s/participants/%s/' % (self.ev.pk, self.jury.pk, self.peserta[0].pk),
+                                  {'score_field': {'a': len(url)}}, format='json')
+            self.client.force_authenticate(self.admin)
+
+            third = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(third.status_code, 200)
+            self.assertNotEqual(third['ETag'], etag)
+            self.assertIn('"total_score":%s.0' % len(url), third.content.decode())
+
+    def test_jury_detail_is_only_served_under_its_own_event(self):
+        other = create_event(self.admin)
+        url = '/api/v1/event/%s/jury/%s/' % (other.pk, self.jury.pk)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.patch(url, {'institute': 'ITB'}, format='json').status_code, 404)
+
+        other.juri.add(self.jury)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/v1/event/%s/jury/%s/' % (self.ev.pk, self.jury.pk), {'institute': 'ITB'}, format='json')
+        self.assertEqual(self.client.get(url).data['data']['institute'], 'ITB')
+
+
+@override_settings(CACHES=NO_RESPONSE_CACHE)
+class InstrumentationTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        populate_event(self.ev, 1, 1, 5)
+        self.client.force_authenticate(self.admin)
+
+    def timings(self, response):
+        timings = {}
+        for part in response['Server-Timing'].split(', '):
+            name, *params = part.split(';')
+            timings[name] = dict(param.split('=', 1) for param in params)
+        return timings
+
+    def test_server_timing_log_and_metrics(self):
+        url = '/api/v1/event/%s/participants/' % self.ev.pk
+        with CaptureQueriesContext(connection) as ctx, \
+                self.assertLogs('event.performance', level='INFO') as logs:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {'db', 'serialize', 'render', 'total'})
+        self.assertEqual(timings['db']['desc'], '"%d queries"' % len(ctx.captured_queries))
+        self.assertGreater(float(timings['serialize']['dur']), 0)
+        self.assertGreater(float(timings['render']['dur']), 0)
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'participants-list')
+        self.assertEqual(record['queries'], len(ctx.captured_queries))
+        self.assertEqual(record['bytes'], len(response.content))
+
+        with override_settings(EVENT_SLOW_REQUEST_MS=0), \
+                self.assertLogs('event.performance', level='WARNING'):
+            self.client.get(url)
+
+        metrics = self.client.get('/api/v1/metrics/').data['data']['views']
+        self.assertGreaterEqual(metrics['participants-list']['count'], 2)
+        self.assertEqual(sum(metrics['participants-list']['histogram'].values()),
+                         metrics['participants-list']['count'])
+
+        jury = User.objects.create(username='juri', is_jury=True)
+        self.client.force_authenticate(jury)
+        self.assertEqual(self.client.get('/api/v1/metrics/').status_code, 403)
+
+    def test_detail_view_measures_serialization(self):
+        response = self.client.get('/api/v1/event/%s/' % self.ev.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(float(self.timings(response)['serialize']['dur']), 0)
+
+    def test_histogram_window_expires_old_slots(self):
+        histogram = instrumentation.RollingHistogram(window=120, resolution=60)
+        histogram.observe('a', 7, 2, {'db': 1.0}, 10, now=0)
+        histogram.observe('a', 300, 4, {'db': 3.0}, 30, now=61)
+        snapshot = histogram.snapshot(now=61)['a']
+        self.assertEqual(snapshot['count'], 2)
+        self.assertEqual(snapshot['p50_ms'], 10)
+        self.assertEqual(snapshot['p99_ms'], 500)
+        self.assertEqual(snapshot['mean_queries'], 3)
+        self.assertEqual(histogram.snapshot(now=150)['a']['count'], 1)
+        self.assertEqual(histogram.snapshot(now=250), {})
+
+
+@override_settings(CACHES=NO_RESPONSE_CACHE)
+class SparseFieldsTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        populate_event(self.ev, 2, 2, 6)
+        self.jury = self.ev.juri.order_by('pk').first()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, [q['sql'] for q in ctx.captured_queries]
+
+    def test_event_list_is_lean_by_default(self):
+        data, queries = self.get('/api/v1/event/')
+        event = data['data']['list_event'][0]
+        self.assertFalse({'panitia', 'juri', 'peserta'} & set(event))
+        self.assertEqual(event['title'], 'Lomba')
+        self.assertFalse([q for q in queries if 'JOIN "event_event_' in q])
+
+        data, queries = self.get('/api/v1/event/?fields=id,title')
+        self.assertEqual(set(data['data']['list_event'][0]), {'id', 'title'})
+
+    def test_expand_nested_relations(self):
+        data, queries = self.get('/api/v1/event/?expand=juri')
+        juri = data['data']['list_event'][0]['juri']
+        self.assertEqual(len(juri), 2)
+        self.assertNotIn('participants', juri[0])
+        self.assertNotIn('peserta', data['data']['list_event'][0])
+        self.assertFalse([q for q in queries if 'JOIN "event_jury_participants"' in q or 'JOIN "event_event_peserta"' in q])
+
+        data, _ = self.get('/api/v1/event/?fields=id,juri.id,juri.participants.code&expand=juri.participants')
+        event = data['data']['list_event'][0]
+        self.assertEqual(set(event), {'id', 'juri'})
+        self.assertEqual(set(event['juri'][0]), {'id', 'participants'})
+        self.assertEqual(set(event['juri'][0]['participants'][0]), {'code'})
+
+    def test_detail_and_jury_endpoints(self):
+        data, queries = self.get('/api/v1/event/%s/' % self.ev.pk)
+        self.assertEqual(len(data['juri'][0]['participants']), 3)
+        self.assertTrue([q for q in queries if 'JOIN "event_event_peserta"' in q])
+        data, queries = self.get('/api/v1/event/%s/?expand=' % self.ev.pk)
+        self.assertFalse({'panitia', 'juri', 'peserta'} & set(data))
+        self.assertFalse([q for q in queries if 'JOIN "event_event_' in q])
+
+        data, _ = self.get('/api/v1/event/%s/jury/' % self.ev.pk)
+        self.assertNotIn('participants', data['data']['results'][0])
+        data, _ = self.get('/api/v1/event/%s/jury/?expand=participants&fields=id,participants.full_name' % self.ev.pk)
+        self.assertEqual(set(data['data']['results'][0]), {'id', 'participants'})
+        data, _ = self.get('/api/v1/event/%s/jury/%s/?fields=id,user.username' % (self.ev.pk, self.jury.pk))
+        self.assertEqual(data['data'], {'id': self.jury.pk, 'user': {'username': self.jury.user.username}})
+        data, _ = self.get('/api/v1/event/%s/committee/?fields=id' % self.ev.pk)
+        self.assertIn('id', data['data']['results'][0])
+        self.assertNotIn('created_at', data['data']['results'][0])
+
+
+@override_settings(CACHES=NO_RESPONSE_CACHE)
+class ValuesSerializerTest(APITestCase):
+
+    def setUp(self):
+        from .serializers import EventParticipantsSerializer, ParticipantsValuesSerializer
+        self.model_serializer, self.values_serializer = EventParticipantsSerializer, ParticipantsValuesSerializer
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 1, 1, 12)
+        Participants.objects.filter(pk=self.peserta[0].pk).update(
+            age=None, email=None, photo_url=None, total_score=None, full_name='Peserta ñ \u2028',
+            score_field={'teknik': 80, 'gaya': {'kostum': 8.5}, 'catatan': 'rapi'},
+            created_at=datetime.datetime(2021, 8, 1, 0, 0, 0, 0, tzinfo=datetime.timezone.utc),
+        )
+        Participants.objects.filter(pk=self.peserta[1].pk).update(age=21, photo_url='https://example.com/p.png',
+                                                                    total_score=87.25)
+        scores.sync_event_scores([p.pk for p in self.peserta])
+        self.client.force_authenticate(self.admin)
+
+    def test_output_matches_model_serializer(self):
+        queryset = leaderboard.event_participants(self.ev.pk).order_by(*leaderboard.ORDERING)
+        expected = self.model_serializer(list(queryset), many=True).data
+        with self.assertNumQueries(1):
+            actual = self.values_serializer(queryset, many=True).data
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+        self.assertTrue(any(row['created_at'].endswith('+07:00') for row in actual))
+
+        out = io.StringIO()
+        call_command('benchmark_serializers', self.ev.pk, repeat=1, stdout=out)
+        self.assertIn('12 peserta', out.getvalue())
+
+    def test_endpoints_match_model_serializer_output(self):
+        from .views import ParticipantsList, ParticipantsJuryList
+        jury = self.ev.juri.get()
+        for view, url in ((ParticipantsList, '/api/v1/event/%s/participants/?limit=5' % self.ev.pk),
+                          (ParticipantsJuryList, '/api/v1/event/%s/jury/%s/participants/?limit=5' % (self.ev.pk, jury.pk)),
+                          (ParticipantsList, '/api/v1/event/%s/participants/?fields=id,created_at' % self.ev.pk)):
+            pages = {}
+            for mode in ('values', 'model'):
+                read_serializer = self.values_serializer if mode == 'values' else self.model_serializer
+                pages[mode], next_url = [], url
+                with mock.patch.object(view, 'read_serializer_class', read_serializer):
+                    while next_url:
+                        response = self.client.get(next_url)
+                        self.assertEqual(response.status_code, 200)
+                        pages[mode].append(response.content)
+                        next_url = json.loads(response.content)['data']['next']
+            self.assertEqual(pages['values'], pages['model'], url)
+            self.assertGreater(len(pages['values']), 1 if 'limit' in url else 0)
+
+
+class JuryAssignmentTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 0, 3, 30)
+        Jury.participants.through.objects.all().delete()
+        self.juries = list(self.ev.juri.order_by('pk'))
+        for jury, institute in zip(self.juries, ('Univ', ' itb ', '')):
+            jury.institute = institute
+            jury.save()
+        self.itb = {p.pk for p in self.peserta[::3]}
+        Participants.objects.filter(pk__in=self.itb).update(institute='ITB')
+        self.url = '/api/v1/event/%s/jury/assign/' % self.ev.pk
+        self.client.force_authenticate(self.admin)
+
+    def pairs(self):
+        return set(Jury.participants.through.objects.values_list('jury_id', 'participants_id'))
+
+    def test_assigns_k_juries_without_conflicts_in_constant_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {'per_participant': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(ctx.captured_queries), 12)
+        self.assertEqual(response.data['data']['created'], 60)
+        self.assertEqual(response.data['data']['incomplete'], 0)
+
+        univ, itb, free = (j.pk for j in self.juries)
+        pairs = self.pairs()
+        self.assertFalse({(univ, pid) for pid in set(p.pk for p in self.peserta) - self.itb} & pairs)
+        self.assertFalse({(itb, pid) for pid in self.itb} & pairs)
+        self.assertEqual(response.data['data']['loads'], {univ: 10, itb: 20, free: 30})
+        self.assertEqual(self.juries[1].participants.count(), 20)
+
+        again = self.client.post(self.url, {'per_participant': 2}, format='json')
+        self.assertEqual(again.data['data']['created'], 0)
+
+    def test_load_limits_dry_run_and_replace(self):
+        univ, itb, free = (j.pk for j in self.juries)
+        response = self.client.post(self.url, {'max_load': 25, 'limits': {str(free): 4}, 'per_participant': 2,
+                                               'dry_run': True}, format='json')
+        self.assertEqual(response.data['data']['loads'][free], 4)
+        self.assertEqual(response.data['data']['incomplete'], 26)
+        self.assertFalse(response.data['status'])
+        self.assertEqual(self.pairs(), set())
+
+        self.client.post(self.url, {}, format='json')
+        loads = self.client.post(self.url, {'dry_run': True}, format='json').data['data']['loads']
+        self.assertEqual(sum(loads.values()), 30)
+        self.assertLessEqual(max(loads.values()) - min(loads.values()), 10)
+
+        scored = Jury.participants.through.objects.filter(jury_id=free).first()
+        Score.objects.create(participant_id=scored.participants_id, jury_id=free, criterion='teknik', value=1)
+        response = self.client.post(self.url, {'replace': True, 'max_load': 0, 'limits': {str(free): 1}}, format='json')
+        self.assertEqual(response.data['data']['removed'], 29)
+        self.assertEqual(self.pairs(), {(free, scored.participants_id)})
+
+        self.assertEqual(self.client.post(self.url, {'per_participant': 0}, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/v1/event/0/jury/assign/', {}, format='json').status_code, 404)
+        self.client.force_authenticate(self.juries[0].user)
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, 403)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('assign_juries', self.ev.pk, per_participant=2, stdout=out, stderr=io.StringIO())
+        self.assertIn('60 assignment dibuat', out.getvalue())
+
+
+class LedgerTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        self.peserta = populate_event(self.ev, 0, 2, 4)
+        clear_totals()
+        self.juries = list(self.ev.juri.order_by('pk'))
+
+    def submit(self, jury, participant, score_field):
+        self.client.force_authenticate(jury.user)
+        url = '/api/v1/event/%s/jury/%s/participants/%s/' % (self.ev.pk, jury.pk, participant.pk)
+        response = self.client.patch(url, {'score_field': score_field}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def event_totals(self):
+        return dict(EventParticipant.objects.filter(event=self.ev).values_list('participants_id', 'total_score'))
+
+    def backdate(self, when):
+        ScoreEntry.objects.filter(created_at__gt=when).update(created_at=when)
+
+    def test_writes_append_deltas_and_totals_follow_ledger(self):
+        first, second = self.juries[0].participants.order_by('pk')[:2]
+        self.submit(self.juries[0], first, {'teknik': 80, 'gaya': {'kostum': 8}})
+        self.submit(self.juries[0], first, {'teknik': 70, 'catatan': 'rapi'})
+        self.submit(self.juries[0], second, {'teknik': 0})
+        self.assertCountEqual(
+            ScoreEntry.objects.filter(participant=first).values_list('criterion', 'delta', 'count'),
+            [('teknik', 80.0, 1), ('gaya.kostum', 8.0, 1), ('teknik', -10.0, 0), ('gaya.kostum', -8.0, -1)],
+        )
+        totals = self.event_totals()
+        self.assertEqual((totals[first.pk], totals[second.pk]), (70.0, 0.0))
+        self.assertEqual(ledger.totals(self.ev.pk), {first.pk: 70.0, second.pk: 0.0})
+
+        self.submit(self.juries[0], second, {})
+        self.assertIsNone(self.event_totals()[second.pk])
+        self.assertNotIn(second.pk, ledger.totals(self.ev.pk))
+
+        other_jury = self.juries[1]
+        third = other_jury.participants.order_by('pk').first()
+        self.submit(other_jury, third, {'teknik': 50})
+        self.client.force_authenticate(self.admin)
+        response = self.client.delete('/api/v1/event/%s/jury/%s/' % (self.ev.pk, other_jury.pk))
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(self.event_totals()[third.pk])
+        self.assertEqual(ScoreEntry.objects.filter(participant=third).aggregate(total=models.Sum('delta'))['total'], 0)
+
+    @override_settings(CACHES=NO_RESPONSE_CACHE)
+    def test_displayed_scores_follow_weighted_ranking(self):
+        first = self.juries[0].participants.order_by('pk').first()
+        second = self.juries[1].participants.order_by('pk').first()
+        self.submit(self.juries[0], first, {'teknik': 20})
+        self.submit(self.juries[1], second, {'vokal': 45})
+        self.client.force_authenticate(self.admin)
+        self.client.put('/api/v1/event/%s/rubric/' % self.ev.pk, {'teknik': 3}, format='json')
+
+        def scored(rows):
+            return [(row['id'], row['total_score']) for row in rows if row['total_score'] is not None]
+
+        expected = [(first.pk, 60.0), (second.pk, 45.0)]
+        base = '/api/v1/event/%s/participants/' % self.ev.pk
+        self.assertEqual(scored(self.client.get(base + 'leaderboard/').data['data']['results']), expected)
+        self.assertEqual(scored(self.client.get(base).data['data']['results']), expected)
+        export = self.client.get(base + 'export/?output=ndjson')
+        rows = [json.loads(line) for line in b''.join(export.streaming_content).decode().splitlines()]
+        self.assertEqual(scored(rows), expected)
+        jury_rows = self.client.get('/api/v1/event/%s/jury/%s/participants/' % (self.ev.pk, self.juries[0].pk))
+        self.assertIn((first.pk, 60.0), scored(jury_rows.data['data']['results']))
+
+        self.client.force_authenticate(self.juries[0].user)
+        response = self.client.patch('/api/v1/event/%s/jury/%s/participants/' % (self.ev.pk, self.juries[0].pk),
+                                     [{'id': first.pk, 'score_field': {'teknik': 20, 'vokal': 1}}], format='json')
+        self.assertEqual(response.data['data'][0]['total_score'], 61.0)
+
+    def test_rubric_snapshot_as_of_and_compaction(self):
+        first = self.juries[0].participants.order_by('pk').first()
+        second = self.juries[1].participants.order_by('pk').first()
+        before = timezone.now() - datetime.timedelta(hours=2)
+        self.submit(self.juries[0], first, {'teknik': 80, 'gaya': {'kostum': 8, 'ekspresi': 6}})
+        self.submit(self.juries[1], second, {'teknik': 90})
+        self.backdate(before)
+        ledger.take_snapshot(self.ev.pk, lag=0)
+        self.submit(self.juries[1], second, {'teknik': 60})
+
+        self.client.force_authenticate(self.admin)
+        url = '/api/v1/event/%s/participants/leaderboard/' % self.ev.pk
+        old = self.client.get(url, {'as_of': (before + datetime.timedelta(minutes=1)).isoformat()}).data['data']
+        self.assertEqual([(row['id'], row['total_score']) for row in old], [(first.pk, 94.0), (second.pk, 90.0)])
+        now = self.client.get(url, {'as_of': timezone.now().isoformat()}).data['data']
+        self.assertEqual([(row['rank'], row['id'], row['total_score']) for row in now], [(1, first.pk, 94.0), (2, second.pk, 60.0)])
+
+        response = self.client.put('/api/v1/event/%s/rubric/' % self.ev.pk, {'teknik': 2, 'gaya': 0.5}, format='json')
+        self.assertEqual(response.status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            ledger.recompute(self.ev.pk)
+        self.assertLess(len(ctx.captured_queries), 6)
+        self.assertEqual(self.event_totals()[first.pk], 167.0)
+        self.assertEqual(self.event_totals()[second.pk], 120.0)
+        self.assertEqual(self.client.get('/api/v1/event/%s/rubric/' % self.ev.pk).data['data'], {'teknik': 2, 'gaya': 0.5})
+        self.assertEqual(self.client.put('/api/v1/event/%s/rubric/' % self.ev.pk, {'teknik': 'x'}, format='json').status_code, 400)
+
+        self.submit(self.juries[0], first, {'teknik': 10, 'gaya': {'kostum': 8, 'ekspresi': 6}})
+        self.assertEqual(self.event_totals()[first.pk], 27.0)
+
+        self.backdate(timezone.now() - datetime.timedelta(minutes=5))
+        call_command('compact_ledger', event=[self.ev.pk], keep=1, lag=0, stdout=io.StringIO())
+        self.assertEqual(ScoreEntry.objects.filter(event=self.ev).count(), 0)
+        self.assertEqual(ScoreSnapshot.objects.filter(event=self.ev).count(), 1)
+        self.assertEqual(ledger.totals(self.ev.pk), {first.pk: 27.0, second.pk: 120.0})
+        self.submit(self.juries[1], second, {'teknik': 61})
+        self.assertEqual(ledger.totals(self.ev.pk), {first.pk: 27.0, second.pk: 122.0})
+        self.assertEqual(self.event_totals()[second.pk], 122.0)
+        response = self.client.get(url, {'as_of': before.isoformat()})
+        self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_is_not_used_before_its_folded_entries(self):
+        first, second = self.juries[0].participants.order_by('pk')[:2]
+        self.submit(self.juries[0], first, {'teknik': 80})
+        self.submit(self.juries[0], second, {'teknik': 40})
+        before = timezone.now() - datetime.timedelta(hours=2)
+        ScoreEntry.objects.filter(participant=second).update(created_at=before)
+        snapshot = ledger.take_snapshot(self.ev.pk, lag=60)
+        self.assertEqual(snapshot.ledger_id, ScoreEntry.objects.get(participant=second).pk)
+        self.assertGreaterEqual(snapshot.taken_at, ScoreEntry.objects.get(participant=first).created_at)
+        as_of = before + datetime.timedelta(minutes=1)
+        self.assertEqual(ledger.totals(self.ev.pk, as_of=as_of), {second.pk: 40.0})
+        self.assertEqual(ledger.totals(self.ev.pk, as_of=timezone.now()), {first.pk: 80.0, second.pk: 40.0})
+
+
+class RendererTest(APITestCase):
+
+    def payload(self):
+        from .exception_handler import get_response
+        return get_response(message="Success", status=True, data={
+            'waktu': datetime.datetime(2021, 8, 1, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'tanggal': datetime.date(2021, 8, 1), 'jam': datetime.time(8, 0),
+            'nilai': decimal.Decimal('87.50'), 'nama': 'Peserta \u2028 ñ', 'skor': {1: 2.5, 'gaya': [None, True]},
+        })
+
+    def test_output_matches_drf_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+        data = self.payload()
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_api_uses_fast_renderer_and_parser(self):
+        admin = User.objects.create(username='admin', is_staff=True)
+        ev = create_event(admin)
+        populate_event(ev, 1, 1, 3)
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/v1/event/%s/participants/' % ev.pk)
+        self.assertIsInstance(response.accepted_renderer, renderers.FastJSONRenderer)
+        self.assertEqual(len(json.loads(response.content)['data']['results']), 3)
+
+        jury = ev.juri.get()
+        pid = jury.participants.first().pk
+        url = '/api/v1/event/%s/jury/%s/participants/%s/' % (ev.pk, jury.pk, pid)
+        self.client.force_authenticate(jury.user)
+        response = self.client.patch(url, '{"score_field": {"teknik": 80}}', content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Participants.objects.get(pk=pid).total_score, 80)
+        self.assertEqual(self.client.patch(url, '{"score_field": ', content_type='application/json').status_code, 400)
+
+        out = io.StringIO()
+        call_command('benchmark_json', ev.pk, repeat=2, stdout=out)
+        self.assertEqual(out.getvalue().count('fast'), 4)
+
+
+class ClaimsAuthenticationTest(APITestCase):
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        populate_event(self.ev, 0, 1, 2)
+        self.jury = self.ev.juri.get()
+        self.jury.user.set_password('rahasia123')
+        self.jury.user.save()
+        self.url = '/api/v1/event/jury/%s/' % self.jury.pk
+
+    def user_queries(self, ctx):
+        # hanya query yang memuat satu User, bukan daftar stale_claims yang di-cache
+        return [q for q in ctx.captured_queries if 'FROM "event_user" WHERE "event_user"."id"' in q['sql']]
+
+    def test_login_token_carries_roles_and_reads_skip_user_query(self):
+        response = self.client.post('/api/v1/dj-rest-auth/login/',
+                                    {'username': self.jury.user.username, 'password': 'rahasia123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        token = AccessToken(response.data['access_token'])
+        self.assertTrue(token['is_jury'])
+        self.assertFalse(token['is_staff'])
+        self.assertNotIn('jury_ids', token)
+
+        self.client.cookies.clear()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % token)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.user_queries(ctx), [])
+
+    def test_token_without_role_claims_loads_user(self):
+        token = RefreshToken.for_user(self.jury.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % token)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(len(self.user_queries(ctx)), 1)
+
+    def test_revoked_token_is_rejected(self):
+        token = TokenClaimsSerializer.get_token(self.jury.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % token)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post('/api/v1/auth/revoke/').status_code, 200)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(RevokedToken.objects.get().jti, token['jti'])
+
+    def test_token_issued_before_role_change_loads_user(self):
+        token = TokenClaimsSerializer.get_token(self.jury.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % token)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        user = self.jury.user
+        user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=['is_active'])
+        self.assertIsNotNone(User.objects.get(pk=user.pk).claims_changed_at)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        user.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(len(self.user_queries(ctx)), 1)
+
+        fresh = TokenClaimsSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % fresh)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.user_queries(ctx), [])
+
+    def test_refresh_reads_roles_again_after_long_rotation(self):
+        refresh = TokenClaimsSerializer.get_token(self.jury.user)
+        user = self.jury.user
+        user.is_jury = False
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        # role dicabut lebih dari REFRESH_TOKEN_LIFETIME lalu, token lama terus dirotasi
+        long_ago = timezone.now() - datetime.timedelta(days=21)
+        User.objects.filter(pk=user.pk).update(claims_changed_at=long_ago)
+        response_cache.get_cache().delete(authentication.STALE_CACHE_KEY)
+        old = refresh.access_token
+        old[authentication.ISSUED_CLAIM] = long_ago.timestamp() - 60
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % old)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        refresh[authentication.ISSUED_CLAIM] = long_ago.timestamp() - 60
+        response = self.client.post('/api/v1/dj-rest-auth/token/refresh/', {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        access, rotated = AccessToken(response.data['access']), RefreshToken(response.data['refresh'])
+        self.assertFalse(access['is_jury'])
+        self.assertFalse(rotated['is_jury'])
+        self.assertGreater(rotated[authentication.ISSUED_CLAIM], long_ago.timestamp())
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % access)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.user_queries(ctx), [])
+
+        user.is_active = False
+        user.save()
+        self.client.credentials()
+        response = self.client.post('/api/v1/dj-rest-auth/token/refresh/', {'refresh': str(rotated)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(EVENT_READ_DATABASES=['replica'], CACHES=NO_RESPONSE_CACHE)
+class ReadReplicaTest(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        populate_event(self.ev, 1, 1, 5)
+        self.jury = self.ev.juri.get()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, path):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(primary.captured_queries), len(replica.captured_queries)
+
+    def test_safe_requests_read_from_replica_until_client_writes(self):
+        leaderboard_url = '/api/v1/event/%s/participants/leaderboard/' % self.ev.pk
+        primary, replica = self.get(leaderboard_url)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+        self.assertEqual(self.get('/api/v1/event/%s/jury/' % self.ev.pk)[0], 0)
+
+        participant = self.jury.participants.first()
+        self.client.force_authenticate(self.jury.user)
+        response = self.client.patch('/api/v1/event/%s/jury/%s/participants/' % (self.ev.pk, self.jury.pk),
+                                     [{'id': participant.pk, 'score_field': {'teknik': 99}}], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(replicas.STICKY_COOKIE, response.cookies)
+
+        primary, replica = self.get(leaderboard_url)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        self.client.cookies[replicas.STICKY_COOKIE] = '0'
+        self.assertEqual(self.get(leaderboard_url)[0], 0)
+
+    def test_per_view_opt_out_and_transactions_use_primary(self):
+        self.assertEqual(self.get('/api/v1/event/%s/participants/' % self.ev.pk)[1], 0)
+        with mock.patch.object(ParticipantsLeaderboard, 'read_replica', False, create=True):
+            self.assertEqual(self.get('/api/v1/event/%s/participants/leaderboard/' % self.ev.pk)[1], 0)
+
+        router = replicas.ReadReplicaRouter()
+        self.assertIsNone(router.db_for_read(Event))
+        token = replicas._read_alias.set('replica')
+        try:
+            self.assertEqual(router.db_for_read(Event), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Event), 'default')
+            event = Event.objects.get(pk=self.ev.pk)
+            self.assertEqual(event._state.db, 'replica')
+            self.assertEqual(router.db_for_write(Event, instance=event), 'default')
+        finally:
+            replicas._read_alias.reset(token)
+
+
+class AsyncReadTest(TransactionTestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.ev = create_event(self.admin)
+        populate_event(self.ev, 1, 1, 30)
+        self.token = str(TokenClaimsSerializer.get_token(self.admin).access_token)
+
+    async def asgi_get(self, app, path):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'authorization', ('Bearer %s' % self.token).encode())],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+        }
+        inbox = asyncio.Queue()
+        await inbox.put({'type': 'http.request', 'body': b''})
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await app(scope, inbox.get, send)
+        return messages[0]['status'], b''.join(m.get('body', b'') for m in messages[1:])
+
+    def test_reads_run_concurrently_under_asgi_and_match_sync_views(self):
+        from config.asgi import application
+
+        path = '/api/v1/event/%s/participants/leaderboard/' % self.ev.pk
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer %s' % self.token)
+        expected = client.get(path).content
+
+        async def scenario():
+            return await asyncio.gather(*(self.asgi_get(application, path) for _ in range(10)))
+
+        threads = set()
+        list_view = ParticipantsLeaderboard.get
+
+        def record(view, *args, **kwargs):
+            threads.add(threading.get_ident())
+            return list_view(view, *args, **kwargs)
+
+        with mock.patch.object(ParticipantsLeaderboard, 'get', record):
+            results = asyncio.run(scenario())
+        connections.close_all()
+        self.assertEqual(results, [(200, expected)] * 10)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_reads_overlap_through_the_middleware_stack(self):
+        from config.asgi import application
+
+        path = '/api/v1/event/%s/participants/leaderboard/' % self.ev.pk
+        # request pertama menunggu request kedua di dalam view: gagal jika diserialkan
+        barrier = threading.Barrier(2, timeout=5)
+        list_view = ParticipantsLeaderboard.get
+
+        def wait_for_peer(view, *args, **kwargs):
+            barrier.wait()
+            return list_view(view, *args, **kwargs)
+
+        async def scenario():
+            return await asyncio.gather(*(self.asgi_get(application, path) for _ in range(2)))
+
+        with mock.patch.object(ParticipantsLeaderboard, 'get', wait_for_peer):
+            results = asyncio.run(scenario())
+        connections.close_all()
+        self.assertEqual([status for status, _ in results], [200, 200])
+
+        async def get_response(request):
+            return None
+
+        for middleware in (instrumentation.PerformanceMiddleware, replicas.ReadReplicaMiddleware, ExceptionMiddleware):
+            self.assertTrue(asyncio.iscoroutinefunction(middleware(get_response)), middleware)
+
+    def test_benchmark_runs_through_asgi_handler(self):
+        out = io.StringIO()
+        call_command('benchmark_reads', self.ev.pk, requests=4, concurrency=2, host='testserver', stdout=out)
+        rows = [line.split() for line in out.getvalue().splitlines() if line.startswith(('sync', 'async'))]
+        self.assertEqual(len(rows), 8)
+        self.assertEqual({row[-1] for row in rows}, {'200'})
+        self.assertIn('event.instrumentation.PerformanceMiddleware', out.getvalue())
+
+
+class SeedAndLoadTestCommandTest(APITestCase):
+
+    def test_seed_is_deterministic_and_loadtest_covers_every_url(self):
+        for prefix in ('a', 'b'):
+            call_command('seed_data', events=3, participants=30, juries=6, committees=3, prefix=prefix,
+                         stdout=io.StringIO())
+        self.assertEqual(Event.objects.count(), 6)
+        self.assertEqual(Participants.objects.count(), 60)
+        totals = {
+            prefix: list(Participants.objects.filter(code__startswith=prefix + '-').order_by('pk')
+                         .values_list('total_score', flat=True))
+            for prefix in ('a', 'b')
+        }
+        self.assertEqual(totals['a'], totals['b'])
+        ev = Event.objects.filter(title__startswith='a event').order_by('pk').first()
+        self.assertEqual(counters.get_event_counts(ev.pk), {'participants': 10, 'jury': 2, 'committee': 1})
+        self.assertEqual(
+            list(ev.peserta.order_by('pk').values_list('total_score', flat=True)),
+            list(EventParticipant.objects.filter(event=ev).order_by('participants_id').values_list('total_score', flat=True)),
+        )
+
+        path = os.path.join(tempfile.mkdtemp(), 'hasil.json')
+        call_command('loadtest', prefix='a', requests=2, writes=True, output=path, stdout=io.StringIO())
+        with open(path) as f:
+            report = json.load(f)
+        from .urls import urlpatterns
+        names = {name.split(':')[0] for name in report['results']} | set(report['skipped'])
+        self.assertEqual(names - {'login'}, {pattern.name for pattern in urlpatterns})
+        self.assertEqual(report['skipped'].keys(), {'participants-import', 'token-revoke', 'jury-bulk-create', 'committee-bulk-create'})
+        for name, result in report['results'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertIsNotNone(result['p99_ms'])
+        self.assertEqual(report['meta']['event'], ev.pk)
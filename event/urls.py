@@ -1,16 +1,28 @@
 from django.urls import path
 from .views import *
+from .async_views import async_read
 
 urlpatterns = [
-    path('event/', EventList.as_view(), name='event-list'),
-    path('event/committee/<int:pk>/', EventListFromCommittee.as_view(), name='event-list-from-committee'),
-    path('event/jury/<int:pk>/', EventListFromJury.as_view(), name='event-list-from-jury'),
-    path('event/<int:pk>/', EventDetail.as_view(), name='event-detail'),
+    path('auth/revoke/', TokenRevoke.as_view(), name='token-revoke'),
+    path('metrics/', PerformanceMetrics.as_view(), name='performance-metrics'),
+    path('event/', async_read(EventList), name='event-list'),
+    path('event/committee/<int:pk>/', async_read(EventListFromCommittee), name='event-list-from-committee'),
+    path('event/committee/<int:pk>/dashboard/', async_read(CommitteeDashboard), name='committee-dashboard'),
+    path('event/jury/<int:pk>/', async_read(EventListFromJury), name='event-list-from-jury'),
+    path('event/jury/<int:pk>/dashboard/', async_read(JuryDashboard), name='jury-dashboard'),
+    path('event/<int:pk>/', async_read(EventDetail), name='event-detail'),
     path('event/<int:eid>/committee/', CommitteeList.as_view(), name='committee-list'),
+    path('event/<int:eid>/committee/bulk/', CommitteeBulkCreate.as_view(), name='committee-bulk-create'),
     path('event/<int:eid>/committee/<int:pk>/', CommitteeDetail().as_view(), name='committee-detail'),
     path('event/<int:eid>/jury/', JuryList.as_view(), name='jury-list'),
+    path('event/<int:eid>/jury/bulk/', JuryBulkCreate.as_view(), name='jury-bulk-create'),
+    path('event/<int:eid>/jury/assign/', JuryAssignment.as_view(), name='jury-assign'),
     path('event/<int:eid>/jury/<int:pk>/', JuryDetail.as_view(), name='jury-detail'),
-    path('event/<int:eid>/participants/', ParticipantsList.as_view(), name='participants-list'),
-    path('event/<int:eid>/jury/<int:jid>/participants/', ParticipantsJuryList.as_view(), name='participants-jury-list'),
+    path('event/<int:eid>/rubric/', EventRubric.as_view(), name='event-rubric'),
+    path('event/<int:eid>/participants/', async_read(ParticipantsList), name='participants-list'),
+    path('event/<int:eid>/participants/import/', ParticipantsImport.as_view(), name='participants-import'),
+    path('event/<int:eid>/participants/export/', ParticipantsExport.as_view(), name='participants-export'),
+    path('event/<int:eid>/participants/leaderboard/', async_read(ParticipantsLeaderboard), name='participants-leaderboard'),
+    path('event/<int:eid>/jury/<int:jid>/participants/', async_read(ParticipantsJuryList), name='participants-jury-list'),
     path('event/<int:eid>/jury/<int:jid>/participants/<int:pk>/', ParticipantsJuryDetail.as_view(), name='participants-jury-detail'),
 ]
@@ -1,38 +1,85 @@
-from rest_framework import generics
+from rest_framework import generics, permissions
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ObjectDoesNotExist
-from .models import Committee, Jury, Event
-from .exception_handler import get_response
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from dj_rest_auth.jwt_auth import get_refresh_view
+from .models import Committee, Jury, Event, EventParticipant
+from .exception_handler import get_response, get_error_message
 from .serializers import *
 from .permissions import *
+from .prefetch import eager_load
+from .pagination import LeaderboardPagination
+from . import leaderboard
+from . import access, assignment, authentication, counters, dashboard, exporter, importer, instrumentation, ledger, live, onboarding, response_cache, scores
+from .access import get_access
+from .response_cache import CachedResponseMixin
+
+class EagerLoadingMixin:
+    """
+    Queryset otomatis di-prefetch sesuai serializer yang dipakai view
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        if isinstance(serializer, ValuesSerializer):
+            return serializer.values(queryset)
+        return eager_load(queryset, serializer)
+
+class SerializeTimingMixin:
+    """
+    retrieve DRF dengan waktu serialisasi dicatat ke fase serialize
+    """
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        return Response(instrumentation.serialize(serializer))
+
+class ValuesReadMixin:
+    """
+    Request GET diserialisasi dengan `read_serializer_class` (ValuesSerializer)
+    langsung dari queryset.values(), request lain tetap memakai serializer_class
+    """
+    read_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.request.method in permissions.SAFE_METHODS and not getattr(self, 'swagger_fake_view', False):
+            return self.read_serializer_class
+        return super().get_serializer_class()
 
-class EventList(generics.ListCreateAPIView):
+class EventList(EagerLoadingMixin, generics.ListCreateAPIView):
     """
     Menampilkan daftar dan membuat event, serta menampilkan statistik dari event.
+    query params:
+    ?fields=id,title,start_date memilih field yang ditampilkan
+    ?expand=panitia,juri,juri.participants,peserta menyertakan relasi (default tidak)
     """
     permission_classes = (IsAdminUser,)
     queryset = Event.objects.all()
     serializer_class = EventBaseSerializer
+    default_expand = ()
 
     def get(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
+        data = {"statistic": counters.get_counts(list(counters.TOTALS))}
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(get_response(message="Success", data={
-            "statistic": {
-                "total_event": Event.objects.all().count(),
-                "total_participants": Participants.objects.all().count(),
-                "total_jury": Jury.objects.all().count(),
-                "total_committee": Committee.objects.all().count()
-            },
-            "list_event": serializer.data
-        }, status=True))
+            data.update({
+                "list_event": instrumentation.serialize(serializer),
+                "next": self.paginator.get_next_link(),
+                "previous": self.paginator.get_previous_link(),
+            })
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            data["list_event"] = instrumentation.serialize(serializer)
+        return Response(get_response(message="Success", data=data, status=True))
 
 
 class EventListFromCommittee(EventList):
@@ -57,15 +104,52 @@ class EventListFromJury(EventList):
         pkjury = self.kwargs.get(self.lookup_field)
         return Event.objects.filter(juri__pk=pkjury)
 
-class EventDetail(generics.RetrieveUpdateDestroyAPIView):
+class CommitteeDashboard(generics.GenericAPIView):
+    """
+    Dashboard committee: setiap event milik committee beserta jumlah
+    peserta/juri/panitia, progres penilaian (scored, unscored, progress %)
+    dan 3 peserta teratas. Dihitung dalam jumlah query yang tetap.
+    """
+    permission_classes = (IsCommittee,)
+
+    def get(self, request, *args, **kwargs):
+        user_id = None if request.user.is_staff else request.user.pk
+        data = dashboard.committee_events(self.kwargs['pk'], user_id)
+        return Response(get_response(message="Success", data=data, status=True))
+
+class JuryDashboard(generics.GenericAPIView):
+    """
+    Dashboard juri: seperti dashboard committee, ditambah progres juri
+    tsb. (assigned, assigned_scored, assigned_unscored) per event
+    """
+    permission_classes = (IsJury,)
+
+    def get(self, request, *args, **kwargs):
+        user_id = None if request.user.is_staff else request.user.pk
+        data = dashboard.jury_events(self.kwargs['pk'], user_id)
+        return Response(get_response(message="Success", data=data, status=True))
+
+class EventDetail(CachedResponseMixin, SerializeTimingMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Menampilkan detai event, update, dan delete event
+    query params: ?fields= dan ?expand= (default semua relasi disertakan)
     """
     permission_classes = (IsAdminOrCommitteeOrReadOnly,)
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    cache_event_kwarg = 'pk'
 
-class CommitteeList(generics.ListCreateAPIView):
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        response_cache.invalidate([serializer.instance.pk])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        response_cache.invalidate([instance.pk])
+        instance.delete()
+        counters.decrement(counters.TOTAL_EVENT)
+
+class CommitteeList(EagerLoadingMixin, generics.ListCreateAPIView):
     """
     Menampilkan daftar dan membuat akun committee
     catatan:
@@ -73,6 +157,7 @@ class CommitteeList(generics.ListCreateAPIView):
     sudah terdaftar pada event lain. Maka, tambahkan jendela konfirmasi
     jika memang committee yg ada mau ditambahkan ke event tsb
     tambahkan query params ?confirm=1 dengan request POST dan body yang sama
+    query params GET: ?fields=
     """
     permission_classes = (IsAdminUser,)
     serializer_class = CommitteeSerializer
@@ -95,10 +180,10 @@ class CommitteeList(generics.ListCreateAPIView):
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(instrumentation.serialize(serializer))
 
         serializer = self.get_serializer(queryset, many=True)
-        return Response(get_response(message="Success", data=serializer.data, status=True))
+        return Response(get_response(message="Success", data=instrumentation.serialize(serializer), status=True))
     
     def post(self, request, *args, **kwargs):
         try:
@@ -117,13 +202,18 @@ class CommitteeList(generics.ListCreateAPIView):
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=201, headers=headers)
+            data = instrumentation.serialize(serializer)
+            headers = self.get_success_headers(data)
+            return Response(data, status=201, headers=headers)
         else:
             com = Committee.objects.get(user__username=request.data["user"]["username"])
             ev = Event.objects.get(pk=self.kwargs["eid"])
-            ev.panitia.add(com)
-            ev.save()
+            with transaction.atomic():
+                if not ev.panitia.filter(pk=com.pk).exists():
+                    if not counters.reserve(ev.pk, 'committee'):
+                        return Response(get_response(message="Jumlah panitia sudah penuh", status=False, status_code=400), status=400)
+                    ev.panitia.add(com)
+                    response_cache.invalidate([ev.pk])
             
             return Response(get_response(message="Success", data={
                 "id": com.id,
@@ -132,15 +222,57 @@ class CommitteeList(generics.ListCreateAPIView):
                 "last_name": com.user.last_name
             }, status=True, status_code=200))
 
-class CommitteeDetail(generics.RetrieveUpdateDestroyAPIView):
+class BulkOnboarding(generics.GenericAPIView):
+    """
+    Membuat banyak akun sekaligus dan menambahkannya ke event.
+    Body berupa list [{"username", "email", "password", "first_name", ...}, ...],
+    untuk jury bisa ditambah "institute". Akun yang username-nya sudah ada
+    ditolak, kecuali dengan ?confirm=1 akun jury/committee tsb. ditambahkan
+    ke event ini. Hasil berisi jumlah akun dibuat/ditambahkan dan error per baris.
+    """
+    role = None
+    max_batch_size = 1000
+
+    def post(self, request, *args, **kwargs):
+        if not isinstance(request.data, list) or not request.data:
+            return Response(get_response(message="Body harus berupa list akun", status=False, status_code=400), status=400)
+        if len(request.data) > self.max_batch_size:
+            return Response(get_response(message="Maksimal %d akun per request" % self.max_batch_size, status=False, status_code=400), status=400)
+
+        job = onboarding.Onboarding(self.kwargs['eid'], self.role, confirm=request.query_params.get('confirm') == '1')
+        try:
+            summary = job.run(enumerate(request.data, start=1))
+        except Event.DoesNotExist:
+            return Response(get_response(message="Event tidak ditemukan", status=False, status_code=404), status=404)
+        return Response(get_response(message="Success" if not summary["failed"] else "Sebagian akun gagal dibuat",
+                                     data=summary, status=not summary["failed"]))
+
+class CommitteeBulkCreate(BulkOnboarding):
+    permission_classes = (IsAdminUser,)
+    role = 'committee'
+
+class CommitteeDetail(SerializeTimingMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Menampilkan detail, update, dan delete committe tertentu
+    query params: ?fields=
     """
     permission_classes = (IsAdminOrCommitteeOrReadOnly,)
     serializer_class = CommitteeDetailSerializer
     queryset = Committee.objects.all()
 
-class JuryList(generics.ListCreateAPIView):
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        response_cache.invalidate_committees([serializer.instance.pk])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        event_ids = list(instance.event.values_list('pk', flat=True))
+        response_cache.invalidate(event_ids)
+        instance.delete()
+        counters.decrement(counters.TOTAL_COMMITTEE)
+        counters.increment_events('committee', event_ids, -1)
+
+class JuryList(EagerLoadingMixin, generics.ListCreateAPIView):
     """
     Menampilkan daftar dan membuat akun jury
     catatan:
@@ -148,10 +280,12 @@ class JuryList(generics.ListCreateAPIView):
     sudah terdaftar pada event lain. Maka, tambahkan jendela konfirmasi
     jika memang jury yg ada mau ditambahkan ke event tsb
     tambahkan query params ?confirm=1 dengan request POST dan body yang sama
+    query params GET: ?fields= dan ?expand=participants (default tidak)
     """
     permission_classes = (IsAdminOrCommitteeOrReadOnly,)
     serializer_class = JurySerializer
     lookup_url_kwarg = 'eid'
+    default_expand = ()
 
     def get_queryset(self):
         eventId = self.kwargs['eid']
@@ -170,10 +304,10 @@ class JuryList(generics.ListCreateAPIView):
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(instrumentation.serialize(serializer))
 
         serializer = self.get_serializer(queryset, many=True)
-        return Response(get_response(message="Success", data=serializer.data, status=True))
+        return Response(get_response(message="Success", data=instrumentation.serialize(serializer), status=True))
     
     def post(self, request, *args, **kwargs):
         try:
@@ -192,13 +326,18 @@ class JuryList(generics.ListCreateAPIView):
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=201, headers=headers)
+            data = instrumentation.serialize(serializer)
+            headers = self.get_success_headers(data)
+            return Response(data, status=201, headers=headers)
         else:
             com = Jury.objects.get(user__username=request.data["user"]["username"])
             ev = Event.objects.get(pk=self.kwargs["eid"])
-            ev.juri.add(com)
-            ev.save()
+            with transaction.atomic():
+                if not ev.juri.filter(pk=com.pk).exists():
+                    if not counters.reserve(ev.pk, 'jury'):
+                        return Response(get_response(message="Jumlah juri sudah penuh", status=False, status_code=400), status=400)
+                    ev.juri.add(com)
+                    response_cache.invalidate([ev.pk])
             
             return Response(get_response(message="Success", data={
                 "id": com.id,
@@ -207,84 +346,263 @@ class JuryList(generics.ListCreateAPIView):
                 "last_name": com.user.last_name
             }, status=True, status_code=200))
 
-class JuryDetail(generics.RetrieveUpdateDestroyAPIView):
+class JuryBulkCreate(BulkOnboarding):
+    permission_classes = (IsAdminOrCommittee,)
+    role = 'jury'
+
+class JuryDetail(CachedResponseMixin, SerializeTimingMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Menampilkan detail, update, dan delete jury tertentu
+    query params: ?fields= dan ?expand=participants (default disertakan)
     """
     permission_classes = (IsAdminOrCommitteeOrReadOnly,)
     serializer_class = JuryDetailSerializer
-    queryset = Jury.objects.all()
 
-class ParticipantsList(generics.ListAPIView):
+    def get_queryset(self):
+        # cache dikunci per eid, jury event lain tidak boleh ikut tersimpan di sana
+        eventId = self.kwargs['eid']
+        return Jury.objects.filter(event__pk=eventId)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        response_cache.invalidate_juries([serializer.instance.pk])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        event_ids = list(instance.event.values_list('pk', flat=True))
+        response_cache.invalidate(event_ids)
+        access.invalidate_users([instance.user_id])
+        scores.remove_jury_scores(instance)
+        counters.decrement(counters.TOTAL_JURY)
+        counters.increment_events('jury', event_ids, -1)
+
+class ParticipantsList(CachedResponseMixin, ValuesReadMixin, EagerLoadingMixin, generics.ListAPIView):
     """
     Menampilkan daftar peserta yang diurutkan berdasarkan total_score. 
     Peserta yang ditampilkan berdasarkan id dari event yang diberikan
     """
     permission_classes = (IsAdminOrCommitteeOrReadOnly,)
-    serializer_class = ParticipantsSerializer
+    serializer_class = EventParticipantsSerializer
+    read_serializer_class = ParticipantsValuesSerializer
+    pagination_class = LeaderboardPagination
     lookup_url_kwarg = 'eid'
 
     def get_queryset(self):
-        eventId = self.kwargs['eid']
-        return Participants.objects.filter(event__pk=eventId).order_by('-total_score')
+        return leaderboard.event_participants(self.kwargs['eid']).order_by(*leaderboard.ORDERING)
     
-    def get(self, request, *args, **kwargs):
+    def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(instrumentation.serialize(serializer))
 
         serializer = self.get_serializer(queryset, many=True)
-        return Response(get_response(message="Success", data=serializer.data, status=True))
+        return Response(get_response(message="Success", data=instrumentation.serialize(serializer), status=True))
 
-class ParticipantsJuryList(generics.ListAPIView):
+class ParticipantsLeaderboard(generics.ListAPIView):
     """
-    Menampilkan daftar participants berdasarkan jury tertentu
+    Menampilkan leaderboard peserta pada event tertentu beserta ranking-nya.
+    Urutan: total_score tertinggi, lalu id terkecil jika nilainya sama.
+    query params:
+    ?cursor= halaman berikutnya/sebelumnya (keyset pada total_score dan id)
+    ?limit= jumlah peserta per halaman
+    ?participant=<id> ranking peserta tertentu
+    ?participant=<id>&around=N menampilkan N peserta di atas dan di bawah peserta tsb.
+    ?as_of=<waktu ISO 8601> leaderboard pada waktu tsb. dari ledger nilai (maks. ?limit peserta)
     """
     permission_classes = (IsAuthenticated,)
-    serializer_class = ParticipantsSerializer
+    serializer_class = LeaderboardSerializer
+    pagination_class = LeaderboardPagination
     lookup_url_kwarg = 'eid'
 
     def get_queryset(self):
-        eventId = self.kwargs['eid']
-        juryId = self.kwargs['jid']
-        return Participants.objects.filter(event__pk=eventId ,jury__pk=juryId)
+        return leaderboard.event_participants(self.kwargs['eid'])
 
-    def get_serializer_context(self):
-        context = super(ParticipantsJuryList, self).get_serializer_context()
-        context.update({
-            'eid': self.kwargs.get(self.lookup_url_kwarg),
-            'jid' : self.kwargs.get('jid')
-        })
-        return context
-    
     def get(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
+        if 'as_of' in request.query_params:
+            return self.as_of(request, request.query_params['as_of'])
+        queryset = self.get_queryset()
+        pid = request.query_params.get('participant')
+        if not pid:
+            page = self.paginate_queryset(queryset)
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(instrumentation.serialize(serializer))
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(get_response(message="Success", data=serializer.data, status=True))
+        try:
+            participant = queryset.get(pk=pid)
+        except (ObjectDoesNotExist, ValueError):
+            return Response(get_response(message="Peserta tidak ditemukan", status=False, status_code=404), status=404)
+
+        try:
+            size = min(int(request.query_params.get('around', 0)), self.pagination_class.max_page_size)
+        except ValueError:
+            size = 0
+        if size > 0:
+            rows = leaderboard.around(queryset, participant, size)
+        else:
+            rows = leaderboard.assign_ranks([participant], leaderboard.rank_of(queryset, participant))
+        serializer = self.get_serializer(rows, many=True)
+        return Response(get_response(message="Success", data=instrumentation.serialize(serializer), status=True))
+
+    def as_of(self, request, value):
+        try:
+            as_of = parse_datetime(value)
+        except ValueError:
+            as_of = None
+        if as_of is None:
+            return Response(get_response(message="Format as_of tidak valid", status=False, status_code=400), status=400)
+        if timezone.is_naive(as_of):
+            as_of = timezone.make_aware(as_of)
+        try:
+            rows = ledger.leaderboard(self.kwargs['eid'], as_of, self.pagination_class().get_page_size(request))
+        except ledger.HistoryCompacted as e:
+            return Response(get_response(message=str(e), status=False, status_code=400), status=400)
+
+        participants = Participants.objects.in_bulk([pid for _, pid, _ in rows])
+        data = [
+            {"rank": rank, "id": pid, "code": participants[pid].code, "full_name": participants[pid].full_name,
+             "institute": participants[pid].institute, "total_score": total}
+            for rank, pid, total in rows if pid in participants
+        ]
+        return Response(get_response(message="Success", data=data, status=True))
+
+class EventRubric(generics.GenericAPIView):
+    """
+    Menampilkan dan mengganti bobot kriteria penilaian event.
+    PUT dengan body {"<kriteria>": <bobot>, ...}, kriteria bersarang memakai
+    titik ("gaya.kostum") atau induknya ("gaya"). Kriteria tanpa bobot bernilai 1.
+    Total peserta dihitung ulang dari snapshot ledger terakhir + delta setelahnya.
+    """
+    permission_classes = (IsAdminOrCommittee,)
+
+    def get(self, request, *args, **kwargs):
+        rubric = Event.objects.filter(pk=self.kwargs['eid']).values_list('rubric', flat=True).first()
+        if rubric is None:
+            return Response(get_response(message="Event tidak ditemukan", status=False, status_code=404), status=404)
+        return Response(get_response(message="Success", data=rubric, status=True))
+
+    def put(self, request, *args, **kwargs):
+        eid = self.kwargs['eid']
+        rubric = request.data
+        if not isinstance(rubric, dict) or not all(
+                isinstance(k, str) and len(k) <= scores.CRITERION_MAX_LENGTH and isinstance(v, (int, float))
+                and not isinstance(v, bool) and v >= 0 for k, v in rubric.items()):
+            return Response(get_response(message="Rubric harus berupa object kriteria dengan bobot angka >= 0", status=False, status_code=400), status=400)
+        if not Event.objects.filter(pk=eid).exists():
+            return Response(get_response(message="Event tidak ditemukan", status=False, status_code=404), status=404)
+        with transaction.atomic():
+            changed = ledger.set_rubric(eid, rubric)
+            response_cache.invalidate([eid])
+        return Response(get_response(message="Success", data={"rubric": rubric, "updated": changed}, status=True))
+
+class JuryAssignment(generics.GenericAPIView):
+    """
+    Membagi seluruh peserta event ke juri event secara otomatis.
+    Body (semua opsional): per_participant (jumlah juri per peserta, default 1),
+    max_load (batas peserta per juri), limits ({"<id jury>": batas} per juri),
+    replace (hapus assignment lama yang belum dinilai), dry_run (hanya menghitung).
+    Juri tidak diassign ke peserta dari institusi yang sama.
+    """
+    permission_classes = (IsAdminOrCommittee,)
+    serializer_class = JuryAssignmentSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(get_response(message=get_error_message(serializer.errors), status=False, status_code=400), status=400)
+        options = dict(serializer.validated_data)
+        dry_run = options.pop('dry_run')
+        try:
+            result = assignment.JuryAssigner(self.kwargs['eid'], **options).run(dry_run=dry_run)
+        except Event.DoesNotExist:
+            return Response(get_response(message="Event tidak ditemukan", status=False, status_code=404), status=404)
+        return Response(get_response(message="Success" if not result["incomplete"] else "Sebagian peserta kekurangan juri",
+                                     data=result, status=not result["incomplete"]))
+
+class ParticipantsImport(generics.GenericAPIView):
+    """
+    Import peserta secara massal dari file CSV atau NDJSON pada field `file`.
+    Kolom: code, full_name, age, email, institute, photo_url.
+    Field opsional `jury` untuk sekaligus mengassign peserta ke jury tsb. dan
+    `file_format` (csv/ndjson) jika tidak bisa ditebak dari nama file.
+    """
+    permission_classes = (IsAdminOrCommittee,)
+    parser_classes = (MultiPartParser,)
+    chunk_size = 500
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(get_response(message="File tidak ditemukan", status=False, status_code=400), status=400)
+        file_format = request.data.get('file_format') or importer.detect_format(upload.name, upload.content_type)
+        if file_format not in importer.FORMATS:
+            return Response(get_response(message="Format file tidak didukung", status=False, status_code=400), status=400)
+        try:
+            jid = int(request.data['jury']) if request.data.get('jury') else None
+        except ValueError:
+            return Response(get_response(message="Jury tidak valid", status=False, status_code=400), status=400)
+
+        job = importer.ParticipantImporter(self.kwargs['eid'], jid, chunk_size=self.chunk_size)
+        try:
+            summary = job.run(importer.iter_rows(upload.file, file_format))
+        except Event.DoesNotExist:
+            return Response(get_response(message="Event tidak ditemukan", status=False, status_code=404), status=404)
+        except Jury.DoesNotExist:
+            return Response(get_response(message="Jury tidak ditemukan pada event ini", status=False, status_code=400), status=400)
+
+        return Response(get_response(message="Success" if not summary["failed"] else "Sebagian peserta gagal diimport",
+                                     data=summary, status=not summary["failed"]))
+
+class ParticipantsExport(generics.GenericAPIView):
+    """
+    Mengunduh hasil akhir peserta dalam urutan leaderboard secara streaming.
+    query params:
+    ?output=csv (default) atau ?output=ndjson
+    ?scores=1 menambahkan kolom total nilai dari setiap jury (jury_<id>)
+    """
+    permission_classes = (IsAdminOrCommittee,)
+    chunk_size = 2000
 
-class ParticipantsJuryList(generics.CreateAPIView):
+    def get(self, request, *args, **kwargs):
+        eid = self.kwargs['eid']
+        output = request.query_params.get('output', 'csv')
+        if output not in exporter.FORMATS:
+            return Response(get_response(message="Format export tidak didukung", status=False, status_code=400), status=400)
+        if not Event.objects.filter(pk=eid).exists():
+            return Response(get_response(message="Event tidak ditemukan", status=False, status_code=404), status=404)
+
+        with_scores = request.query_params.get('scores') in ('1', 'true')
+        response = StreamingHttpResponse(exporter.stream(eid, output, with_scores, chunk_size=self.chunk_size),
+                                         content_type=exporter.FORMATS[output])
+        response['Content-Disposition'] = 'attachment; filename="event-%s-results.%s"' % (eid, output)
+        return response
+
+class ParticipantsJuryList(ValuesReadMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     """
-    Membuat data participants sekaligus mengassign participants tsb ke jury tertentu. 
+    Menampilkan daftar participants berdasarkan jury tertentu dan
+    membuat data participants sekaligus mengassign participants tsb ke jury tertentu.
     Namun, untuk field score_field tidak bisa diisi saat pembuatan,
-    field tsb. hanya bisa diupdate oleh jury yang bersangkutan
+    field tsb. hanya bisa diupdate oleh jury yang bersangkutan.
+    PATCH dengan body berupa list [{"id": <id peserta>, "score_field": {...}}, ...]
+    untuk mengupdate nilai banyak peserta sekaligus
     """
     permission_classes = (IsAuthenticated,)
-    serializer_class = ParticipantsCreateJurySerializer
+    serializer_class = EventParticipantsSerializer
+    read_serializer_class = ParticipantsValuesSerializer
     lookup_url_kwarg = 'eid'
+    max_batch_size = 1000
 
     def get_queryset(self):
         eventId = self.kwargs['eid']
         juryId = self.kwargs['jid']
-        return Participants.objects.filter(event__pk=eventId ,jury__pk=juryId)
+        return leaderboard.event_participants(eventId).filter(jury__pk=juryId)
+
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return ParticipantsCreateJurySerializer
+        return super().get_serializer_class()
 
     def get_serializer_context(self):
         context = super(ParticipantsJuryList, self).get_serializer_context()
@@ -293,8 +611,70 @@ class ParticipantsJuryList(generics.CreateAPIView):
             'jid' : self.kwargs.get('jid')
         })
         return context
+    
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
 
-class ParticipantsJuryDetail(generics.RetrieveUpdateDestroyAPIView):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(instrumentation.serialize(serializer))
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(get_response(message="Success", data=instrumentation.serialize(serializer), status=True))
+
+    def patch(self, request, *args, **kwargs):
+        if not isinstance(request.data, list) or not request.data:
+            return Response(get_response(message="Body harus berupa list nilai peserta", status=False, status_code=400), status=400)
+        if len(request.data) > self.max_batch_size:
+            return Response(get_response(message="Maksimal %d peserta per request" % self.max_batch_size, status=False, status_code=400), status=400)
+
+        results = []
+        submitted = {}
+        for item in request.data:
+            serializer = ScoreSubmissionSerializer(data=item)
+            if not serializer.is_valid():
+                results.append({"id": item.get("id") if isinstance(item, dict) else None, "status": False,
+                                "message": get_error_message(serializer.errors)})
+                continue
+            pid = serializer.validated_data["id"]
+            if pid in submitted:
+                results.append({"id": pid, "status": False, "message": "Peserta dikirim lebih dari sekali"})
+                continue
+            submitted[pid] = serializer.validated_data["score_field"]
+            results.append({"id": pid})
+
+        # penugasan jury dicek di memori, keanggotaan event dengan satu query
+        caller = get_access(request)
+        if not caller.is_admin_or_committee:
+            submitted = {pid: field for pid, field in submitted.items() if caller.can_score(pid, self.kwargs['jid'])}
+        owned = {'pk__in': submitted, 'event__pk': self.kwargs['eid'], 'jury__pk': self.kwargs['jid']}
+        allowed = set(Participants.objects.filter(**owned).values_list('pk', flat=True)) if submitted else set()
+        submitted = {pid: field for pid, field in submitted.items() if pid in allowed}
+
+        with transaction.atomic():
+            now = timezone.now()
+            rows = [Participants(pk=pid, score_field=field, updated_at=now) for pid, field in submitted.items()]
+            Participants.objects.bulk_update(rows, ['score_field', 'updated_at'], batch_size=500)
+            scores.replace_scores(self.kwargs['jid'], submitted)
+            live.publish_scores(submitted)
+            response_cache.invalidate_participants(submitted)
+            totals = dict(EventParticipant.objects.filter(event_id=self.kwargs['eid'], participants_id__in=submitted)
+                          .values_list('participants_id', 'total_score'))
+
+        for result in results:
+            if "status" in result:
+                continue
+            if result["id"] in submitted:
+                result.update(status=True, message="Success", total_score=totals[result["id"]])
+            else:
+                result.update(status=False, message="Peserta tidak ditemukan atau bukan milik jury ini")
+
+        success = all(result["status"] for result in results)
+        return Response(get_response(message="Success" if success else "Sebagian nilai gagal disimpan",
+                                     data=results, status=success))
+
+class ParticipantsJuryDetail(SerializeTimingMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Mengupdate, menampilkan detail, dan menghapus participants.
     Hal ini hanya bisa dilakukan oleh jury yang sudah diassgin sebelumnya
@@ -302,3 +682,51 @@ class ParticipantsJuryDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = (IsSameJuryAndParticipantsOrReadOnly,)
     serializer_class = ParticipantsJurySerializer
     queryset = Participants.objects.all()
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        response_cache.invalidate_participants([serializer.instance.pk])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        event_ids = list(instance.event.values_list('pk', flat=True))
+        response_cache.invalidate(event_ids)
+        instance.delete()
+        counters.decrement(counters.TOTAL_PARTICIPANTS)
+        counters.increment_events('participants', event_ids, -1)
+
+class TokenRevoke(generics.GenericAPIView):
+    """
+    Mencabut access token yang sedang dipakai (logout).
+    Token tidak bisa dipakai lagi meskipun belum kedaluwarsa
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs):
+        if request.auth is None:
+            return Response(get_response(message="Request tidak memakai access token", status=False, status_code=400), status=400)
+        authentication.revoke(request.auth)
+        return Response(get_response(message="Token berhasil dicabut", status=True))
+
+
+class TokenRefresh(get_refresh_view()):
+    """
+    Refresh token dj-rest-auth yang membaca ulang role user dari DB
+    """
+    serializer_class = authentication.TokenClaimsRefreshSerializer
+
+
+class PerformanceMetrics(generics.GenericAPIView):
+    """
+    Histogram latency, jumlah query, waktu serialisasi/render dan ukuran
+    response per view selama 15 menit terakhir (per proses)
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        data = {
+            "window_seconds": instrumentation.histograms.window,
+            "buckets_ms": list(instrumentation.BUCKETS),
+            "views": instrumentation.histograms.snapshot(),
+        }
+        return Response(get_response(message="Success", data=data, status=True))